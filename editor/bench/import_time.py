@@ -0,0 +1,135 @@
+"""
+Eos Lighting Metadata Editor - Import Time Benchmark
+
+Measures how long importing the editor takes with ``python -X importtime``
+and checks that modules only some commands need are not imported at startup.
+
+    python bench/import_time.py [--runs 5] [--budget 100]
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse, os, statistics, subprocess, sys
+
+EDITOR_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# modules that should only be imported by the commands that use them
+DEFERRED_MODULES = [
+    "menu",
+    "snapshot",
+    "search",
+    "preview",
+    "bulk",
+    "lint",
+    "questionary",
+    "prompt_toolkit",
+    "pygments",
+    "requests",
+    "urllib3",
+    "yaml",
+]
+
+
+def measure(module):
+    """Imports ``module`` in a new interpreter.
+
+    Returns the cumulative import time of ``module`` in milliseconds and a
+    dict of the self time of every module imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import {}".format(module)],
+        cwd=EDITOR_PATH,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    total = None
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(self_time) / 1000.0
+        if name.strip() == module:
+            total = int(cumulative) / 1000.0
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="editor", help="module to import")
+    parser.add_argument("--runs", type=int, default=5, help="number of imports")
+    parser.add_argument(
+        "--budget", type=float, default=100, help="maximum median time in ms"
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="number of slowest modules to show"
+    )
+    args = parser.parse_args()
+
+    totals = []
+    modules = {}
+    for run in range(args.runs):
+        total, modules = measure(args.module)
+        totals.append(total)
+    median = statistics.median(totals)
+
+    print(
+        "Import '{module}': median {median:.1f}ms, min {min:.1f}ms, max {max:.1f}ms "
+        "over {runs} runs".format(
+            module=args.module,
+            median=median,
+            min=min(totals),
+            max=max(totals),
+            runs=args.runs,
+        )
+    )
+    print("Slowest modules (self time):")
+    for name in sorted(modules, key=modules.get, reverse=True)[: args.top]:
+        print("  {time:8.1f}ms  {name}".format(time=modules[name], name=name))
+
+    failed = False
+    loaded = [
+        name
+        for name in DEFERRED_MODULES
+        if name != args.module and name in modules
+    ]
+    if loaded:
+        print("FAIL: imported at startup: {}".format(", ".join(loaded)))
+        failed = True
+    if median > args.budget:
+        print(
+            "FAIL: {median:.1f}ms is over the {budget:.0f}ms budget".format(
+                median=median, budget=args.budget
+            )
+        )
+        failed = True
+    if not failed:
+        print("OK: within the {budget:.0f}ms budget".format(budget=args.budget))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
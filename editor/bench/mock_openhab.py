@@ -0,0 +1,499 @@
+"""
+Eos Lighting Metadata Editor - Mock openHAB Server
+
+Serves the parts of the openHAB REST API that the editor uses from items kept
+in memory, so the editor can be tried and benchmarked without openHAB. Items
+come from a generated Eos group tree or a snapshot written by ``export``.
+
+    python bench/mock_openhab.py [--port 8080] [--latency 0.05]
+        [--groups 4 --depth 2 --lights 10 | --snapshot eos.json]
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse, copy, gzip, hashlib, json, queue, random, re, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+DEFAULT_PORT = 8080
+MASTER_GROUP = "gEos"
+SCENE_SUFFIX = "_Scene"
+LEVEL_SOURCE = "Eos_Lux"
+SCENES = ["morning", "day", "evening", "night"]
+LIGHT_TYPES = ["Switch", "Dimmer", "Color"]
+ITEM_KEYS = ["name", "type", "label", "category", "tags", "groupNames", "state"]
+# seconds between keep alive comments sent to event stream clients
+EVENT_KEEPALIVE = 5
+
+_lock = threading.Lock()
+_items = {}
+_members = {}
+_event_queues = []
+_request_counts = {}
+_latency = 0
+_use_etags = True
+_use_gzip = True
+
+
+def generate(groups=4, depth=2, lights=10, seed=0):
+    """Builds an Eos group tree under ``MASTER_GROUP`` with ``groups`` child
+    groups in every group down to ``depth`` levels and ``lights`` lights in
+    every child group.
+
+    Returns a list of items like the REST API returns them with their Eos
+    metadata. The same arguments always build the same tree.
+    """
+    rand = random.Random(seed)
+    items = [
+        {"name": LEVEL_SOURCE, "type": "Number", "groupNames": [], "state": "120"},
+    ]
+
+    def _add_group(name, parent, level):
+        config = {}
+        if level == 1:
+            config["dimmer"] = {"evening": {"state": 60}, "night": {"state": 10}}
+        items.append(
+            {
+                "name": name,
+                "type": "Group",
+                "label": name[1:].replace("_", " "),
+                "groupNames": [parent] if parent else [],
+                "metadata": {"eos": {"value": "", "config": config}},
+            }
+        )
+        items.append(
+            {
+                "name": name + SCENE_SUFFIX,
+                "type": "String",
+                "groupNames": [name],
+                "state": rand.choice(SCENES),
+            }
+        )
+        if parent:
+            for index in range(lights):
+                items.append(_get_light("{}_Light{}".format(name[1:], index), name))
+        if level < depth:
+            for index in range(groups):
+                _add_group("{}_{}".format(name, index), name, level + 1)
+
+    def _get_light(name, group_name):
+        light_type = rand.choice(LIGHT_TYPES)
+        on = "ON" if light_type == "Switch" else 100
+        off = "OFF" if light_type == "Switch" else 0
+        config = {"day": {"state": on}, "night": {"state": off}}
+        if rand.random() < 0.2:
+            config["evening"] = {
+                "scene_type": "threshold",
+                "level_source": LEVEL_SOURCE,
+                "level_threshold": 100,
+                "state_above": off,
+                "state_below": on,
+            }
+        if rand.random() < 0.1:
+            config["morning"] = {"alias_scene": "day"}
+        return {
+            "name": name,
+            "type": light_type,
+            "label": name.replace("_", " "),
+            "groupNames": [group_name],
+            "state": "OFF" if light_type == "Switch" else "0",
+            "metadata": {"eos": {"value": "True", "config": config}},
+        }
+
+    _add_group(MASTER_GROUP, None, 0)
+    return items
+
+
+def read_snapshot(path):
+    """Reads a snapshot written by the editor's ``export`` command, YAML
+    files need PyYAML."""
+    with open(path) as file:
+        if path.lower().endswith((".yaml", ".yml")):
+            import yaml
+
+            data = yaml.safe_load(file)
+        else:
+            data = json.load(file)
+    return data
+
+
+def load(items):
+    """Replaces the items served with a copy of ``items``."""
+    with _lock:
+        _items.clear()
+        for item in copy.deepcopy(items):
+            for key, default in [("tags", []), ("groupNames", []), ("state", "NULL")]:
+                item.setdefault(key, default)
+            _items[item["name"]] = item
+        _rebuild_members()
+
+
+def _rebuild_members():
+    _members.clear()
+    for name in sorted(_items):
+        for group_name in _items[name]["groupNames"]:
+            _members.setdefault(group_name, []).append(name)
+
+
+def get_items():
+    """Returns a copy of the items served, with their metadata."""
+    with _lock:
+        return copy.deepcopy(list(_items.values()))
+
+
+def get_request_counts():
+    """Returns the number of requests and bytes sent for every endpoint,
+    like ``{"GET /rest/items/{name}": {"count": 3, "bytes": 1234}}``."""
+    with _lock:
+        return copy.deepcopy(_request_counts)
+
+
+def reset_request_counts():
+    with _lock:
+        _request_counts.clear()
+
+
+def _get_item_dto(item, namespaces=None, members=False):
+    """Returns ``item`` like the REST API does, with metadata in the
+    namespaces matching the ``namespaces`` patterns and group members."""
+    dto = {key: item[key] for key in ITEM_KEYS if key in item}
+    dto["editable"] = True
+    if namespaces:
+        metadata = {
+            namespace: item["metadata"][namespace]
+            for namespace in item.get("metadata", {})
+            if any(re.fullmatch(pattern, namespace) for pattern in namespaces)
+        }
+        if metadata:
+            dto["metadata"] = metadata
+    if members and item["type"] == "Group":
+        dto["members"] = [
+            _get_item_dto(_items[name]) for name in _members.get(item["name"], [])
+        ]
+    return dto
+
+
+def _send_event(topic, event_type, payload):
+    event = {"topic": topic, "type": event_type, "payload": json.dumps(payload)}
+    for event_queue in list(_event_queues):
+        event_queue.put(event)
+
+
+def _get_metadata_event(namespace, item_name, metadata):
+    return {
+        "key": {"namespace": namespace, "itemName": item_name},
+        "value": metadata.get("value", ""),
+        "configuration": metadata.get("config", {}),
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Handles a request for the REST API"""
+
+    protocol_version = "HTTP/1.1"
+    verbose = False
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def _send(self, endpoint, code, body=None):
+        """Sends ``body`` as JSON, compressed and with an ETag if enabled"""
+        if _latency:
+            time.sleep(_latency)
+        headers = {}
+        data = b""
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+            if _use_etags and code == 200 and self.command == "GET":
+                etag = '"{}"'.format(hashlib.md5(data).hexdigest())
+                headers["ETag"] = etag
+                if self.headers.get("If-None-Match", None) == etag:
+                    code = 304
+                    data = b""
+            if data and _use_gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+                data = gzip.compress(data, 6)
+                headers["Content-Encoding"] = "gzip"
+        with _lock:
+            counts = _request_counts.setdefault(
+                "{} {}".format(self.command, endpoint), {"count": 0, "bytes": 0}
+            )
+            counts["count"] += 1
+            counts["bytes"] += len(data)
+        self.send_response(code)
+        for key in headers:
+            self.send_header(key, headers[key])
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length).decode("utf-8")) if length else None
+
+    def _route(self):
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        query = {key: value[-1] for key, value in parse_qs(url.query).items()}
+        if not parts or parts[0] != "rest":
+            return None, parts[1:], query
+        return "/".join(parts[1:2]), parts[1:], query
+
+    def do_GET(self):
+        resource, parts, query = self._route()
+        namespaces = [
+            pattern for pattern in query.get("metadata", "").split(",") if pattern
+        ]
+        if resource == "":
+            self._send("/rest/", 200, {"version": "4", "links": []})
+        elif resource == "events":
+            self._stream_events()
+        elif resource == "items" and len(parts) == 1:
+            recursive = query.get("recursive", "false").lower() == "true"
+            with _lock:
+                body = [
+                    _get_item_dto(item, namespaces, recursive)
+                    for item in _items.values()
+                ]
+            self._send("/rest/items", 200, body)
+        elif resource == "items" and len(parts) == 2:
+            with _lock:
+                item = _items.get(parts[1], None)
+                body = _get_item_dto(item, namespaces, True) if item else None
+            if body is None:
+                self._send("/rest/items/{name}", 404, {"error": "Item not found"})
+            else:
+                self._send("/rest/items/{name}", 200, body)
+        else:
+            self._send(_get_endpoint(parts), 404, {"error": "Not found"})
+
+    def do_PUT(self):
+        resource, parts, query = self._route()
+        body = self._read_body()
+        if resource == "items" and len(parts) == 2 and isinstance(body, dict):
+            with _lock:
+                old = _items.get(parts[1], None)
+                item = {key: body[key] for key in ITEM_KEYS if key in body}
+                item["name"] = parts[1]
+                item.setdefault("groupNames", [])
+                item.setdefault("tags", [])
+                item["state"] = old["state"] if old else "NULL"
+                if old and "metadata" in old:
+                    item["metadata"] = old["metadata"]
+                _items[item["name"]] = item
+                _rebuild_members()
+                dto = _get_item_dto(item)
+                if old:
+                    _send_event(
+                        "openhab/items/{}/updated".format(item["name"]),
+                        "ItemUpdatedEvent",
+                        [dto, _get_item_dto(old)],
+                    )
+                else:
+                    _send_event(
+                        "openhab/items/{}/added".format(item["name"]),
+                        "ItemAddedEvent",
+                        dto,
+                    )
+            self._send("/rest/items/{name}", 200 if old else 201, dto)
+        elif resource == "items" and len(parts) == 4 and parts[2] == "metadata":
+            endpoint = "/rest/items/{name}/metadata/{namespace}"
+            item_name, namespace = parts[1], parts[3]
+            with _lock:
+                item = _items.get(item_name, None)
+                if item is not None:
+                    metadata = {
+                        "value": (body or {}).get("value", None) or "",
+                        "config": (body or {}).get("config", None) or {},
+                    }
+                    old = item.setdefault("metadata", {}).get(namespace, None)
+                    item["metadata"][namespace] = metadata
+                    new_event = _get_metadata_event(namespace, item_name, metadata)
+                    _send_event(
+                        "openhab/metadata/{}:{}/{}".format(
+                            namespace, item_name, "updated" if old else "added"
+                        ),
+                        "MetadataUpdatedEvent" if old else "MetadataAddedEvent",
+                        [new_event, _get_metadata_event(namespace, item_name, old)]
+                        if old
+                        else new_event,
+                    )
+            if item is None:
+                self._send(endpoint, 404, {"error": "Item not found"})
+            else:
+                self._send(endpoint, 200 if old else 201, None)
+        else:
+            self._send(_get_endpoint(parts), 404, {"error": "Not found"})
+
+    def do_DELETE(self):
+        resource, parts, query = self._route()
+        if resource == "items" and len(parts) == 4 and parts[2] == "metadata":
+            endpoint = "/rest/items/{name}/metadata/{namespace}"
+            item_name, namespace = parts[1], parts[3]
+            with _lock:
+                item = _items.get(item_name, None)
+                old = None
+                if item is not None:
+                    old = item.get("metadata", {}).pop(namespace, None)
+                if old is not None:
+                    _send_event(
+                        "openhab/metadata/{}:{}/removed".format(namespace, item_name),
+                        "MetadataRemovedEvent",
+                        _get_metadata_event(namespace, item_name, old),
+                    )
+            if old is None:
+                self._send(endpoint, 404, {"error": "Metadata not found"})
+            else:
+                self._send(endpoint, 200, None)
+        else:
+            self._send(_get_endpoint(parts), 404, {"error": "Not found"})
+
+    def _stream_events(self):
+        """Sends item and metadata events until the client disconnects"""
+        event_queue = queue.Queue()
+        with _lock:
+            _event_queues.append(event_queue)
+            counts = _request_counts.setdefault(
+                "GET /rest/events", {"count": 0, "bytes": 0}
+            )
+            counts["count"] += 1
+        self.close_connection = True
+        try:
+            # openHAB sends events in chunks, clients read each one as it arrives
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.flush()
+            while not getattr(self.server, "stopping", False):
+                try:
+                    event = event_queue.get(timeout=EVENT_KEEPALIVE)
+                    data = "event: message\ndata: {}\n\n".format(json.dumps(event))
+                except queue.Empty:
+                    data = ": keep alive\n\n"
+                data = data.encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with _lock:
+                _event_queues.remove(event_queue)
+
+
+def _get_endpoint(parts):
+    return "/" + "/".join(["rest"] + parts)
+
+
+def configure(latency=None, etags=None, compress=None):
+    """Changes how responses are sent, arguments that are ``None`` are left
+    unchanged. ``latency`` is the number of seconds to wait before every
+    response."""
+    global _latency, _use_etags, _use_gzip
+    if latency is not None:
+        _latency = max(0, latency)
+    if etags is not None:
+        _use_etags = etags
+    if compress is not None:
+        _use_gzip = compress
+
+
+def start(port=0, bind="127.0.0.1"):
+    """Starts serving in a background thread, ``port`` 0 picks a free port.
+
+    Returns the server, its address is ``server.server_address``.
+    """
+    server = ThreadingHTTPServer((bind, port), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="mock-openhab")
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def stop(server):
+    """Stops a server started with ``start``, event streams are closed."""
+    server.stopping = True
+    server.shutdown()
+    server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port")
+    parser.add_argument("--bind", default="127.0.0.1", help="address to listen on")
+    parser.add_argument(
+        "--latency", type=float, default=0, help="seconds to wait before responding"
+    )
+    parser.add_argument("--snapshot", help="serve the items in an exported snapshot")
+    parser.add_argument("--groups", type=int, default=4, help="child groups per group")
+    parser.add_argument("--depth", type=int, default=2, help="levels of groups")
+    parser.add_argument("--lights", type=int, default=10, help="lights per group")
+    parser.add_argument("--no-etag", action="store_true", help="don't send ETags")
+    parser.add_argument("--no-gzip", action="store_true", help="don't compress")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log requests")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        load(read_snapshot(args.snapshot)["items"])
+    else:
+        load(generate(args.groups, args.depth, args.lights))
+    configure(latency=args.latency, etags=not args.no_etag, compress=not args.no_gzip)
+    Handler.verbose = args.verbose
+    server = ThreadingHTTPServer((args.bind, args.port), Handler)
+    server.daemon_threads = True
+    print(
+        "Serving {count} items on http://{bind}:{port}/rest/, "
+        "press Ctrl+C to stop".format(
+            count=len(_items), bind=args.bind, port=server.server_address[1]
+        )
+    )
+    if not args.snapshot:
+        print(
+            "Use eos_master_group = '{group}' and eos_scene_item_suffix = "
+            "'{suffix}' in configuration.py".format(
+                group=MASTER_GROUP, suffix=SCENE_SUFFIX
+            )
+        )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.stopping = True
+    server.server_close()
+    counts = get_request_counts()
+    for endpoint in sorted(counts):
+        print(
+            "  {count:6d}  {bytes:10d} bytes  {endpoint}".format(
+                endpoint=endpoint, **counts[endpoint]
+            )
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Eos Lighting Metadata Editor - REST Flow Benchmark
+
+Runs common editor flows against the mock openHAB server in
+``bench/mock_openhab.py`` and shows how long they take, how many requests
+the editor sent and how many bytes openHAB returned.
+
+    python bench/rest_flows.py [--latency 0.02] [--runs 3]
+        [--groups 4 --depth 2 --lights 10 | --snapshot eos.json]
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse, os, shutil, statistics, sys, tempfile, time
+
+BENCH_PATH = os.path.dirname(os.path.realpath(__file__))
+EDITOR_PATH = os.path.dirname(BENCH_PATH)
+sys.path.insert(0, EDITOR_PATH)
+sys.path.insert(0, BENCH_PATH)
+
+import mock_openhab
+import utils
+from constants import *
+from rest import index
+from rest.utils import (
+    configure as configure_http,
+    clear_cache,
+    get_call_counts,
+    reset_call_counts,
+    map_concurrent,
+)
+from rest.metadata import set_metadata
+
+# number of lights changed by the 'save lights' flow
+SAVE_COUNT = 20
+
+
+def walk_menus(master_group_name, host):
+    """Builds the navigation menu of every group in the Eos group tree, like
+    opening every menu in the editor."""
+    import menu
+
+    group_names = [master_group_name]
+    while group_names:
+        model = menu.get_menu_model(group_names.pop(0), host, quiet=True)
+        group_names.extend([group["name"] for group in model["eos_groups"]])
+
+
+def load_index(host):
+    index.load(host, META_NAME_EOS, quiet=True)
+
+
+def get_flows(master_group_name):
+    """Returns a list of ``(name, setup, run)`` flows, ``setup`` and ``run``
+    are called with the host and only ``run`` is measured."""
+    import menu, snapshot, lint
+
+    def _navigate(host):
+        walk_menus(master_group_name, host)
+
+    def _navigate_again_setup(host):
+        walk_menus(master_group_name, host)
+        menu.clear_menu_models()
+
+    def _navigate_prefetched(host):
+        load_index(host)
+        walk_menus(master_group_name, host)
+
+    def _export(host):
+        snapshot.collect(master_group_name, host)
+
+    def _lint(host):
+        load_index(host)
+        tasks, problems = lint.collect(master_group_name, host)
+        item_names = set([item["name"] for item in index.get_item_fields(["name"])])
+        lint.run(tasks, item_names, 1)
+
+    def _save(host):
+        names = [
+            item["name"]
+            for item in index.get_item_fields(["name", "type", "metadata"])
+            if item["type"] in itemtypesLight
+            and META_NAME_EOS in (item.get("metadata", None) or {})
+        ][:SAVE_COUNT]
+        map_concurrent(
+            lambda name: set_metadata(
+                name,
+                META_NAME_EOS,
+                host,
+                configuration={"day": {"state": 50}},
+                value="True",
+                overwrite=True,
+            ),
+            names,
+        )
+
+    return [
+        ("load items", None, load_index),
+        ("navigate all menus", None, _navigate),
+        ("navigate again, cached responses", _navigate_again_setup, _navigate),
+        ("navigate all menus, prefetched", None, _navigate_prefetched),
+        ("export", None, _export),
+        ("lint", None, _lint),
+        ("save {} lights".format(SAVE_COUNT), load_index, _save),
+    ]
+
+
+def run_flow(items, setup, run, host):
+    """Runs a flow once with an empty cache and fresh items.
+
+    Returns the seconds ``run`` took, the number of requests the editor sent
+    and the request counts of the mock server.
+    """
+    import menu
+
+    mock_openhab.load(items)
+    index.clear()
+    menu.clear_menu_models()
+    clear_cache()
+    if setup is not None:
+        setup(host)
+    reset_call_counts()
+    mock_openhab.reset_request_counts()
+    start = time.perf_counter()
+    run(host)
+    elapsed = time.perf_counter() - start
+    return (
+        elapsed,
+        sum(get_call_counts().values()),
+        mock_openhab.get_request_counts(),
+    )
+
+
+def write_configuration(path, master_group_name, prefix, suffix):
+    with open(path, "w") as file:
+        file.write(
+            "eos_master_group = {master}\n"
+            "eos_scene_item_prefix = {prefix}\n"
+            "eos_scene_item_suffix = {suffix}\n".format(
+                master=repr(master_group_name),
+                prefix=repr(prefix),
+                suffix=repr(suffix),
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="seconds the server waits"
+    )
+    parser.add_argument("--runs", type=int, default=3, help="runs of every flow")
+    parser.add_argument("--snapshot", help="use the items in an exported snapshot")
+    parser.add_argument("--master-group", help="master group of the snapshot")
+    parser.add_argument("--scene-prefix", default="", help="scene item prefix")
+    parser.add_argument(
+        "--scene-suffix", default=mock_openhab.SCENE_SUFFIX, help="scene item suffix"
+    )
+    parser.add_argument("--groups", type=int, default=4, help="child groups per group")
+    parser.add_argument("--depth", type=int, default=2, help="levels of groups")
+    parser.add_argument("--lights", type=int, default=10, help="lights per group")
+    parser.add_argument(
+        "--max-requests", type=int, help="requests the editor sends at the same time"
+    )
+    parser.add_argument("--no-etag", action="store_true", help="server sends no ETag")
+    parser.add_argument(
+        "--no-gzip", action="store_true", help="server doesn't compress"
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="show requests by endpoint"
+    )
+    args = parser.parse_args()
+
+    if args.snapshot:
+        data = mock_openhab.read_snapshot(args.snapshot)
+        master_group_name = args.master_group or data.get("master_group", None)
+        items = data["items"]
+        if not master_group_name:
+            parser.error("--master-group is required for this snapshot")
+    else:
+        master_group_name = mock_openhab.MASTER_GROUP
+        items = mock_openhab.generate(args.groups, args.depth, args.lights)
+
+    conf_dir = tempfile.mkdtemp()
+    utils.conf_path = os.path.join(conf_dir, "configuration.py")
+    write_configuration(
+        utils.conf_path, master_group_name, args.scene_prefix, args.scene_suffix
+    )
+    configure_http(max_workers=args.max_requests)
+    mock_openhab.configure(
+        latency=args.latency, etags=not args.no_etag, compress=not args.no_gzip
+    )
+    server = mock_openhab.start()
+    host = "{}:{}".format(*server.server_address)
+
+    print(
+        "{count} items, {latency:.0f}ms latency, median of {runs} runs".format(
+            count=len(items), latency=args.latency * 1000, runs=args.runs
+        )
+    )
+    print(
+        "{flow:34s} {time:>10s} {requests:>9s} {bytes:>11s}".format(
+            flow="Flow", time="Time", requests="Requests", bytes="Received"
+        )
+    )
+    try:
+        for name, setup, run in get_flows(master_group_name):
+            results = [run_flow(items, setup, run, host) for index in range(args.runs)]
+            counts = results[-1][2]
+            print(
+                "{flow:34s} {time:8.1f}ms {requests:9d} {bytes:>11s}".format(
+                    flow=name,
+                    time=statistics.median([result[0] for result in results]) * 1000,
+                    requests=results[-1][1],
+                    bytes="{:,}".format(
+                        sum([counts[endpoint]["bytes"] for endpoint in counts])
+                    ),
+                )
+            )
+            if args.verbose:
+                for endpoint in sorted(counts):
+                    print(
+                        "    {count:6d} {bytes:>11s}  {endpoint}".format(
+                            count=counts[endpoint]["count"],
+                            bytes="{:,}".format(counts[endpoint]["bytes"]),
+                            endpoint=endpoint,
+                        )
+                    )
+    finally:
+        mock_openhab.stop(server)
+        shutil.rmtree(conf_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
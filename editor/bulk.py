@@ -0,0 +1,156 @@
+"""
+Eos Lighting Metadata Editor - Bulk Settings Copy
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import copy
+
+from constants import *
+from rest import pending
+from rest.metadata import get_metadata, get_metadata_many, set_metadata
+from rest.utils import map_concurrent
+
+__all__ = ["get_setting_paths", "copy_settings", "diff_settings", "plan", "apply"]
+
+
+def get_setting_paths(config):
+    """Returns the settings in an Eos metadata ``config`` that can be copied,
+    as tuples of keys. Scenes are copied whole, scenes under a light type
+    key are listed separately, and settings that aren't scenes are copied
+    by themselves."""
+    paths = []
+    for key in sorted(config):
+        if key in LIGHT_TYPE_LIST and isinstance(config[key], dict):
+            paths.extend([(key, scene) for scene in sorted(config[key])])
+        else:
+            paths.append((key,))
+    return paths
+
+
+def copy_settings(source, target, paths):
+    """Returns a copy of ``target`` with the settings at ``paths`` replaced
+    by the ones in ``source``. Settings missing from ``source`` are removed
+    from the copy."""
+    result = copy.deepcopy(target)
+    for path in paths:
+        value = source
+        for key in path:
+            value = value.get(key, None) if isinstance(value, dict) else None
+        parent = result
+        for key in path[:-1]:
+            if not isinstance(parent.get(key, None), dict):
+                parent[key] = {}
+            parent = parent[key]
+        if value is None:
+            parent.pop(path[-1], None)
+        else:
+            parent[path[-1]] = copy.deepcopy(value)
+        if len(path) > 1 and not result[path[0]]:
+            result.pop(path[0])
+    return result
+
+
+def _flatten(config, prefix=()):
+    settings = {}
+    for key in config:
+        if isinstance(config[key], dict) and config[key]:
+            settings.update(_flatten(config[key], prefix + (key,)))
+        else:
+            settings[prefix + (key,)] = config[key]
+    return settings
+
+
+def diff_settings(old, new):
+    """Compares two Eos metadata configs.
+
+    Returns a list of ``(path, old value, new value)`` for every setting
+    that differs, values are ``None`` for settings that don't exist.
+    """
+    old = _flatten(old)
+    new = _flatten(new)
+    return [
+        (path, old.get(path, None), new.get(path, None))
+        for path in sorted(
+            set(old) | set(new), key=lambda path: [str(key) for key in path]
+        )
+        if old.get(path, None) != new.get(path, None)
+    ]
+
+
+def plan(source_name, paths, target_names, host):
+    """Works out the Eos metadata of every item in ``target_names`` after
+    copying the settings at ``paths`` from ``source_name``.
+
+    Returns a list of ``(item name, metadata value, new config, changes)``
+    for the items that would change, where ``changes`` is a list from
+    ``diff_settings``.
+    """
+    source = get_metadata(source_name, META_NAME_EOS, host).get("config", {})
+    target_names = list(target_names)
+    results = []
+    for name, metadata in zip(
+        target_names, get_metadata_many(target_names, META_NAME_EOS, host)
+    ):
+        current = metadata.get("config", {})
+        config = copy_settings(source, current, paths)
+        changes = diff_settings(current, config)
+        if changes:
+            results.append((name, metadata.get("value", None), config, changes))
+    return results
+
+
+def apply(changes, host):
+    """Saves the configs from ``plan`` to openHAB concurrently, or queues
+    them in batch mode.
+
+    Returns a list of the names of items that failed.
+    """
+
+    def _write(name, value, config):
+        # metadata values are parsed when read, openHAB needs a string
+        value = None if value is None else str(value)
+        if pending.is_enabled():
+            pending.queue_metadata(
+                name, META_NAME_EOS, host, configuration=config, value=value
+            )
+            return True
+        try:
+            return set_metadata(
+                name,
+                META_NAME_EOS,
+                host,
+                configuration=config,
+                value=value,
+                overwrite=True,
+            )
+        except Exception:
+            return None
+
+    results = map_concurrent(
+        _write,
+        [change[0] for change in changes],
+        [change[1] for change in changes],
+        [change[2] for change in changes],
+    )
+    return [change[0] for change, result in zip(changes, results) if not result]
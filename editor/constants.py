@@ -45,6 +45,9 @@ META_KEY_MOTION_SOURCE = "motion_source"
 META_KEY_MOTION_ACTIVE = "motion_active"
 META_KEY_MOTION_STATE = "motion_state"
 META_KEY_MOTION_SCENE = "motion_scene"
+META_KEY_SCALED_MIN_DELTA = "scaled_min_delta"
+META_KEY_SCALED_MIN_INTERVAL = "scaled_min_interval"
+META_KEY_TRANSITION_TIME = "transition_time"
 META_KEY_DEPTH_MAP = {
     META_KEY_ALIAS_SCENE: [1, 2, 3, 4, 5],
     META_KEY_LEVEL_SOURCE: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
@@ -60,6 +63,9 @@ META_KEY_DEPTH_MAP = {
     META_KEY_MOTION_ACTIVE: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
     META_KEY_MOTION_STATE: [1, 2, 4, 6, 7, 9],
     META_KEY_MOTION_SCENE: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    META_KEY_SCALED_MIN_DELTA: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    META_KEY_SCALED_MIN_INTERVAL: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    META_KEY_TRANSITION_TIME: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
 }
 
 LIGHT_TYPE_SWITCH = "switch"
@@ -130,6 +136,9 @@ __all__ = [
     "META_KEY_MOTION_ACTIVE",
     "META_KEY_MOTION_STATE",
     "META_KEY_MOTION_SCENE",
+    "META_KEY_SCALED_MIN_DELTA",
+    "META_KEY_SCALED_MIN_INTERVAL",
+    "META_KEY_TRANSITION_TIME",
     "META_KEY_DEPTH_MAP",
     "LIGHT_TYPE_SWITCH",
     "LIGHT_TYPE_DIMMER",
@@ -172,6 +181,9 @@ META_KEY_LIST = [
     META_KEY_MOTION_ACTIVE,
     META_KEY_MOTION_STATE,
     META_KEY_MOTION_SCENE,
+    META_KEY_SCALED_MIN_DELTA,
+    META_KEY_SCALED_MIN_INTERVAL,
+    META_KEY_TRANSITION_TIME,
 ]
 META_KEY_OPTION_LIST = [META_KEY_FOLLOW_PARENT]
 
@@ -31,23 +31,59 @@ if sys.version_info[0] < 3:  # Python 2.x
 else:  # Python 3.x
     pass
 
-import os, json
-import requests as http
+import os
 import click
 from click import echo, clear
 
+# Only modules that every command needs are imported here. menu (which loads
+# prompt_toolkit), snapshot and lint are imported by the commands that use them,
+# and requests is only imported when the first request is sent. Run
+# bench/import_time.py to check the startup time after changing imports.
 from constants import *
-import menu
 import utils
-from rest.utils import validate_hostname, validate_item, update_item
-from rest.metadata import get_value
+from rest.utils import (
+    validate_hostname,
+    validate_item,
+    configure as configure_http,
+    get_call_counts,
+)
+from rest.metadata import get_saved_requests
+from rest import index, events, pending
 
 master_group_name = ""
 reinit_item_name = ""
+prefetch = True
+watch = False
+offline_snapshot = None
+offline_changeset = None
+
+OFFLINE_HOST = "offline"
+
+
+class HostOption(click.Option):
+    """openHAB host option that is not prompted for or validated when working
+    offline from a snapshot"""
+
+    def handle_parse_result(self, ctx, opts, args):
+        if offline_snapshot:
+            ctx.params[self.name] = OFFLINE_HOST
+            return OFFLINE_HOST, args
+        return super(HostOption, self).handle_parse_result(ctx, opts, args)
+
 
+def set_offline(ctx, param, value):
+    """Enables offline mode before any other option is processed
 
-def load_config(openhab_host):
+    Use only as a Click option callback."""
+    global offline_snapshot
+    offline_snapshot = value
+    return value
+
+
+def load_config(openhab_host, quiet=False):
     """Load Eos settings from ``{$OH_CONF}/automation/lib/python/configuration.py``
+
+    Progress messages are not shown if ``quiet`` is ``True``.
     """
     global master_group_name
     master_group_name = utils.get_conf_value(CONF_KEY_MASTER_GROUP, str)
@@ -71,6 +107,48 @@ def load_config(openhab_host):
         )
         exit(1)
 
+    if offline_snapshot:
+        import snapshot
+
+        try:
+            data = snapshot.read(offline_snapshot)
+        except (RuntimeError, ValueError, IOError) as ex:
+            echo("ERROR: {}".format(ex), err=True)
+            exit(1)
+        missing = snapshot.get_missing_sources(data)
+        index.load_items(data["items"], META_NAME_EOS)
+        pending.enable()
+        pending.set_changeset(
+            offline_changeset
+            or "{}.changes.json".format(os.path.splitext(offline_snapshot)[0])
+        )
+        if not quiet:
+            echo(
+                "Working offline from '{file}', {count} items loaded".format(
+                    file=offline_snapshot, count=len(data["items"])
+                )
+            )
+        if missing:
+            echo(
+                "WARNING: Source items used by Eos are not in the snapshot and will "
+                "be reported as missing, export it again to include them: "
+                "{names}".format(names=", ".join(missing)),
+                err=True,
+            )
+    elif prefetch:
+        index.load(openhab_host, META_NAME_EOS, quiet=quiet)
+
+    if watch and offline_snapshot:
+        echo("WARNING: '--watch' is ignored when working offline", err=True)
+    elif watch and index.is_loaded():
+        events.start(openhab_host)
+    elif watch:
+        echo(
+            "WARNING: Changes made outside the editor will not be shown, "
+            "'--watch' requires items to be prefetched",
+            err=True,
+        )
+
     global reinit_item_name
     reinit_item_name = utils.get_conf_value(CONF_KEY_REINIT_ITEM)
     if reinit_item_name and validate_item(reinit_item_name, openhab_host) is None:
@@ -117,18 +195,153 @@ def conf_file_exists(ctx, param, value):
         )
 
 
+def show_call_counts():
+    """Shows the number of requests sent to openHAB"""
+    counts = get_call_counts()
+    echo(
+        "{total} requests sent to openHAB{details}, {saved} saved".format(
+            total=sum(counts.values()),
+            saved=get_saved_requests(),
+            details=" ({})".format(
+                ", ".join(
+                    [
+                        "{method}: {count}".format(method=method, count=counts[method])
+                        for method in sorted(counts)
+                    ]
+                )
+            )
+            if counts
+            else "",
+        )
+    )
+
+
+def flush_pending():
+    """Saves changes queued in batch or offline mode"""
+    if pending.is_enabled():
+        pending.flush()
+
+
 @click.group(invoke_without_command=True)
 @click.pass_context
 @click.option("-s", "--openhab-host", "opt_openhab_host")
 @click.option("-c", "--configuration", "opt_conf_path")
-def eos_editor(ctx, opt_openhab_host, opt_conf_path):
+@click.option(
+    "--connect-timeout",
+    "opt_connect_timeout",
+    type=float,
+    help="Seconds to wait for a connection to openHAB",
+)
+@click.option(
+    "--read-timeout",
+    "opt_read_timeout",
+    type=float,
+    help="Seconds to wait for a response from openHAB",
+)
+@click.option(
+    "--show-requests",
+    "opt_show_requests",
+    is_flag=True,
+    help="Show the number of requests sent to openHAB when exiting",
+)
+@click.option(
+    "--profile",
+    "opt_profile",
+    is_flag=True,
+    help="Show the time spent in requests and reading settings when exiting",
+)
+@click.option(
+    "--profile-output",
+    "opt_profile_output",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Also profile all calls and write the cProfile stats to this file",
+)
+@click.option(
+    "--max-requests",
+    "opt_max_requests",
+    type=click.IntRange(min=1),
+    help="Maximum number of requests to send to openHAB at the same time",
+)
+@click.option(
+    "--prefetch/--no-prefetch",
+    "opt_prefetch",
+    default=True,
+    help="Load all items from openHAB at startup instead of as needed",
+)
+@click.option(
+    "--batch",
+    "opt_batch",
+    is_flag=True,
+    help="Keep changes until choosing to save them or exiting",
+)
+@click.option(
+    "--watch",
+    "opt_watch",
+    is_flag=True,
+    help="Listen for changes made outside the editor while it is running",
+)
+@click.option(
+    "--offline",
+    "opt_offline",
+    type=click.Path(exists=True, dir_okay=False),
+    is_eager=True,
+    callback=set_offline,
+    help="Edit an exported snapshot instead of connecting to openHAB",
+)
+@click.option(
+    "--changeset",
+    "opt_changeset",
+    type=click.Path(dir_okay=False),
+    help="File to save offline changes to, "
+    "defaults to the snapshot name ending in '.changes.json'",
+)
+def eos_editor(
+    ctx,
+    opt_openhab_host,
+    opt_conf_path,
+    opt_connect_timeout,
+    opt_read_timeout,
+    opt_show_requests,
+    opt_profile,
+    opt_profile_output,
+    opt_max_requests,
+    opt_prefetch,
+    opt_batch,
+    opt_watch,
+    opt_offline,
+    opt_changeset,
+):
     """
     Eos Item Metadata Editor
 
     If called with no command it will start in interactive mode.
     """
+    global prefetch, watch, offline_changeset
+    if opt_profile or opt_profile_output:
+        import atexit, profiler
+
+        # report after everything else is done, including saving changes
+        profiler.enable(opt_profile_output)
+        atexit.register(profiler.report)
+    prefetch = opt_prefetch
+    watch = opt_watch
+    offline_changeset = opt_changeset
+    pending.enable(opt_batch)
+    ctx.call_on_close(events.stop)
+    ctx.call_on_close(flush_pending)
+    configure_http(
+        connect_timeout=opt_connect_timeout,
+        read_timeout=opt_read_timeout,
+        max_workers=opt_max_requests,
+    )
+    if opt_show_requests:
+        ctx.call_on_close(show_call_counts)
     if ctx.invoked_subcommand is None:
-        live()
+        # only pass on the options 'live' knows about
+        live(
+            args=(["-s", opt_openhab_host] if opt_openhab_host else [])
+            + (["-c", opt_conf_path] if opt_conf_path else [])
+        )
 
 
 @eos_editor.command()
@@ -136,6 +349,7 @@ def eos_editor(ctx, opt_openhab_host, opt_conf_path):
     "-s",
     "--openhab-host",
     "opt_openhab_host",
+    cls=HostOption,
     prompt="Enter your openHAB server address",
     default="localhost:8080",
     callback=validate_hostname,
@@ -152,6 +366,8 @@ def eos_editor(ctx, opt_openhab_host, opt_conf_path):
 )
 def live(opt_openhab_host, opt_conf_path):
     """Interactive editing of all lights in Eos"""
+    import menu
+
     sys.modules[utils.__name__].conf_path = opt_conf_path
     load_config(opt_openhab_host)
     menu.menu_navigate(master_group_name, opt_openhab_host)
@@ -162,6 +378,7 @@ def live(opt_openhab_host, opt_conf_path):
     "-s",
     "--openhab-host",
     "opt_openhab_host",
+    cls=HostOption,
     prompt="Enter your openHAB server address",
     default="localhost:8080",
     callback=validate_hostname,
@@ -179,6 +396,8 @@ def live(opt_openhab_host, opt_conf_path):
 @click.argument("arg_item_name")
 def edit(opt_openhab_host, opt_conf_path, arg_item_name):
     """Edit a single light"""
+    import menu
+
     sys.modules[utils.__name__].conf_path = opt_conf_path
     load_config(opt_openhab_host)
 
@@ -195,11 +414,235 @@ def edit(opt_openhab_host, opt_conf_path, arg_item_name):
         if not menu.save_metadata(item, opt_openhab_host, data):
             pass  # TODO something went wrong
         if item.get("editable", False):
-            update_item(item, opt_openhab_host)
+            menu.save_item(item, opt_openhab_host)
     del item, data
 
     clear()
 
 
+@eos_editor.command()
+@click.option(
+    "-s",
+    "--openhab-host",
+    "opt_openhab_host",
+    cls=HostOption,
+    prompt="Enter your openHAB server address",
+    default="localhost:8080",
+    callback=validate_hostname,
+    help="openHAB server address",
+)
+@click.option(
+    "-c",
+    "--configuration",
+    "opt_conf_path",
+    prompt="Path to 'configuration.py'",
+    default=utils.conf_path,
+    callback=conf_file_exists,
+    help="Helper Library 'configuration.py'",
+)
+@click.argument("arg_file", type=click.Path(dir_okay=False, writable=True))
+def export(opt_openhab_host, opt_conf_path, arg_file):
+    """Export Eos metadata to a JSON or YAML file
+
+    Exports all items in the Eos group tree with their Eos metadata. The file
+    is written as YAML if it ends in '.yaml' or '.yml', this requires PyYAML.
+    """
+    import snapshot
+
+    sys.modules[utils.__name__].conf_path = opt_conf_path
+    load_config(opt_openhab_host)
+    data = snapshot.collect(master_group_name, opt_openhab_host)
+    try:
+        snapshot.write(data, arg_file)
+    except (RuntimeError, IOError) as ex:
+        echo("ERROR: {}".format(ex), err=True)
+        exit(1)
+    echo(
+        "Exported {count} items to '{file}'".format(
+            count=len(data["items"]), file=arg_file
+        )
+    )
+
+
+@eos_editor.command(name="import")
+@click.option(
+    "-s",
+    "--openhab-host",
+    "opt_openhab_host",
+    cls=HostOption,
+    prompt="Enter your openHAB server address",
+    default="localhost:8080",
+    callback=validate_hostname,
+    help="openHAB server address",
+)
+@click.option(
+    "-c",
+    "--configuration",
+    "opt_conf_path",
+    prompt="Path to 'configuration.py'",
+    default=utils.conf_path,
+    callback=conf_file_exists,
+    help="Helper Library 'configuration.py'",
+)
+@click.option(
+    "--dry-run",
+    "opt_dry_run",
+    is_flag=True,
+    help="Show the changes without saving them",
+)
+@click.argument("arg_file", type=click.Path(exists=True, dir_okay=False))
+def import_(opt_openhab_host, opt_conf_path, opt_dry_run, arg_file):
+    """Import Eos metadata from a JSON or YAML file
+
+    Only items with Eos metadata that is different in openHAB are saved.
+    """
+    import snapshot
+
+    if offline_snapshot:
+        echo("ERROR: Cannot import when working offline", err=True)
+        exit(1)
+    sys.modules[utils.__name__].conf_path = opt_conf_path
+    try:
+        data = snapshot.read(arg_file)
+    except (RuntimeError, ValueError, IOError) as ex:
+        echo("ERROR: {}".format(ex), err=True)
+        exit(1)
+    load_config(opt_openhab_host)
+    changes, missing = snapshot.diff(data, opt_openhab_host)
+    for name in missing:
+        echo(
+            "WARNING: Skipping '{name}', item does not exist".format(name=name),
+            err=True,
+        )
+    for name, metadata in changes:
+        echo(snapshot.describe(name, metadata, opt_openhab_host))
+    if not changes:
+        echo("No changes to import")
+        return
+    elif opt_dry_run:
+        echo("Dry run, {count} items not saved".format(count=len(changes)))
+        return
+    echo("Saving {count} items...".format(count=len(changes)), nl=False)
+    failed = snapshot.apply(changes, opt_openhab_host)
+    echo("Failed" if failed else "OK")
+    for name in failed:
+        echo("ERROR: Failed to save '{name}'".format(name=name), err=True)
+    if failed:
+        exit(1)
+
+
+@eos_editor.command()
+@click.option(
+    "-s",
+    "--openhab-host",
+    "opt_openhab_host",
+    prompt="Enter your openHAB server address",
+    default="localhost:8080",
+    callback=validate_hostname,
+    help="openHAB server address",
+)
+@click.option(
+    "-c",
+    "--configuration",
+    "opt_conf_path",
+    prompt="Path to 'configuration.py'",
+    default=utils.conf_path,
+    callback=conf_file_exists,
+    help="Helper Library 'configuration.py'",
+)
+@click.argument("arg_file", type=click.Path(exists=True, dir_okay=False))
+def push(opt_openhab_host, opt_conf_path, arg_file):
+    """Save changes made offline to openHAB"""
+    if offline_snapshot:
+        echo("ERROR: Cannot push changes when working offline", err=True)
+        exit(1)
+    sys.modules[utils.__name__].conf_path = opt_conf_path
+    load_config(opt_openhab_host)
+    try:
+        count = pending.read_changeset(arg_file, opt_openhab_host)
+    except (ValueError, IOError) as ex:
+        echo("ERROR: {}".format(ex), err=True)
+        exit(1)
+    if not count:
+        echo("No changes to push")
+        return
+    if pending.flush(opt_openhab_host):
+        exit(1)
+    echo("Pushed changes for {count} items".format(count=count))
+
+
+@eos_editor.command()
+@click.option(
+    "-s",
+    "--openhab-host",
+    "opt_openhab_host",
+    cls=HostOption,
+    prompt="Enter your openHAB server address",
+    default="localhost:8080",
+    callback=validate_hostname,
+    help="openHAB server address",
+)
+@click.option(
+    "-c",
+    "--configuration",
+    "opt_conf_path",
+    prompt="Path to 'configuration.py'",
+    default=utils.conf_path,
+    callback=conf_file_exists,
+    help="Helper Library 'configuration.py'",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "opt_jobs",
+    type=click.IntRange(min=1),
+    help="Number of worker processes, defaults to the number of CPUs",
+)
+@click.option(
+    "-o",
+    "--output",
+    "opt_output",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the report to a file instead of the console",
+)
+def lint(opt_openhab_host, opt_conf_path, opt_jobs, opt_output):
+    """Check the Eos configuration of all lights
+
+    Checks every scene of every light in the Eos group tree and every Eos
+    group, and writes a JSON report of the problems found. Exits with status
+    1 if there are any.
+    """
+    import lint as linter
+
+    sys.modules[utils.__name__].conf_path = opt_conf_path
+    load_config(opt_openhab_host, quiet=True)
+    if not index.is_loaded(META_NAME_EOS) and not index.load(
+        opt_openhab_host, META_NAME_EOS, quiet=True
+    ):
+        echo("ERROR: Failed to load items", err=True)
+        exit(1)
+    tasks, problems = linter.collect(master_group_name, opt_openhab_host)
+    item_names = set([item["name"] for item in index.get_item_fields(["name"])])
+    count, scene_problems = linter.run(tasks, item_names, opt_jobs)
+    problems.extend(scene_problems)
+    linter.write(
+        {
+            "version": linter.REPORT_VERSION,
+            "lights": len(tasks),
+            "scenes": count,
+            "problems": problems,
+        },
+        opt_output,
+    )
+    echo(
+        "Checked {scenes} scenes for {lights} lights, found {count} problems".format(
+            scenes=count, lights=len(tasks), count=len(problems)
+        ),
+        err=True,
+    )
+    if problems:
+        exit(1)
+
+
 if __name__ == "__main__":
     eos_editor()
@@ -0,0 +1,366 @@
+"""
+Eos Lighting Metadata Editor - Lint
+"""
+
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import sys
+
+if sys.version_info[0] < 3:  # Python 2.x
+    str = basestring
+else:  # Python 3.x
+    pass
+
+import os, json
+
+from constants import *
+from utils import (
+    build_scene_data,
+    get_conf_value,
+    get_global_settings,
+    get_scene_setting,
+    get_scene_type,
+    resolve_type,
+    validate_item_name,
+)
+from rest.metadata import get_metadata_many
+from rest.utils import validate_item
+
+__all__ = ["REPORT_VERSION", "collect", "check_light", "check_scene", "run", "write"]
+
+REPORT_VERSION = 1
+LINT_BATCH_SIZE = 250
+HSV_KEYS = [
+    META_KEY_STATE,
+    META_KEY_STATE_ABOVE,
+    META_KEY_STATE_BELOW,
+    META_KEY_STATE_HIGH,
+    META_KEY_STATE_LOW,
+    META_KEY_MOTION_STATE,
+]
+
+# names of all items, set in each worker so it is only sent to them once
+_item_names = set()
+
+
+def _init_worker(item_names):
+    global _item_names
+    _item_names = item_names
+
+
+def _problem(item_name, scene, problem):
+    return {"item": item_name, "scene": scene, "problem": problem}
+
+
+def _get_declared_scenes(data, light_type):
+    # names of all scenes with settings for a light of ``light_type``
+    scenes = set()
+    for source in [data["item"], data["group"], data["global"]]:
+        for key in source:
+            if not isinstance(source[key], dict):
+                continue
+            elif key in LIGHT_TYPE_MAP.values():
+                if key != light_type:
+                    continue
+                scenes.update(
+                    [
+                        scene
+                        for scene in source[key]
+                        if isinstance(source[key][scene], dict)
+                    ]
+                )
+            else:
+                scenes.add(key)
+    return scenes
+
+
+def _check_hsv(key, value):
+    if not isinstance(value, list):
+        return None
+    elif len(value) != 3:
+        return "'{key}' must be a list of 3 HSV values".format(key=key)
+    elif not all([isinstance(part, (int, float)) for part in value]):
+        return "'{key}' HSV values must be numbers".format(key=key)
+    elif not 0 <= value[0] <= 360:
+        return "'{key}' hue must be between 0 and 360".format(key=key)
+    elif not (0 <= value[1] <= 100 and 0 <= value[2] <= 100):
+        return "'{key}' saturation and brightness must be between 0 and 100".format(
+            key=key
+        )
+    return None
+
+
+def check_scene(item, scene, data, item_names):
+    """Checks that ``scene`` can be evaluated for ``item`` without looking at
+    any item states, like the check Eos does when it loads.
+
+    Returns a description of the problem or ``None`` if the scene is valid.
+    """
+    light_type = LIGHT_TYPE_MAP.get(item["type"].lower(), None)
+    if light_type is None:
+        return "couldn't get light type"
+
+    settings = {}
+
+    def _setting(key):
+        if (scene, key) not in settings:
+            settings[(scene, key)] = get_scene_setting(scene, light_type, key, data)
+        return settings[(scene, key)]
+
+    def _missing(key):
+        return "{type} type scenes require '{key}' setting".format(
+            type=scene_type.capitalize(), key=key
+        )
+
+    aliases = [scene]
+    while _setting(META_KEY_ALIAS_SCENE) is not None:
+        scene = _setting(META_KEY_ALIAS_SCENE)
+        if scene in aliases:
+            return "alias cycle '{}'".format("' > '".join(aliases + [scene]))
+        aliases.append(scene)
+    if len(aliases) > 2:
+        return "alias scene '{}' is also an alias".format(aliases[1])
+
+    for key in HSV_KEYS:
+        problem = _check_hsv(key, _setting(key))
+        if problem:
+            return problem
+
+    motion_source = _setting(META_KEY_MOTION_SOURCE)
+    if motion_source is not None and motion_source not in item_names:
+        return "motion source '{name}' does not exist".format(name=motion_source)
+
+    scene_type = get_scene_type(scene, light_type, data)
+    if scene_type not in [SCENE_TYPE_FIXED, SCENE_TYPE_THRESHOLD, SCENE_TYPE_SCALED]:
+        return "couldn't get scene type"
+    elif motion_source is not None:
+        # an active motion state can replace the rest of the scene settings
+        return None
+
+    if scene_type == SCENE_TYPE_FIXED:
+        state = _setting(META_KEY_STATE)
+        if state is None:
+            return _missing(META_KEY_STATE)
+        elif light_type == LIGHT_TYPE_SWITCH and not (
+            isinstance(state, str) and state.upper() in ["ON", "OFF"]
+        ):
+            return "state '{state}' is not valid for a Switch light".format(state=state)
+        elif light_type == LIGHT_TYPE_DIMMER and not isinstance(state, (int, float)):
+            return "state '{state}' is not valid for a Dimmer light".format(state=state)
+        elif light_type == LIGHT_TYPE_COLOR and not isinstance(
+            state, (int, float, list)
+        ):
+            return "state '{state}' is not valid for a Color light".format(state=state)
+
+    elif scene_type == SCENE_TYPE_THRESHOLD:
+        for key in [
+            META_KEY_LEVEL_SOURCE,
+            META_KEY_LEVEL_THRESHOLD,
+            META_KEY_STATE_ABOVE,
+            META_KEY_STATE_BELOW,
+        ]:
+            if _setting(key) is None:
+                return _missing(key)
+        if _setting(META_KEY_LEVEL_SOURCE) not in item_names:
+            return "level source '{name}' does not exist".format(
+                name=_setting(META_KEY_LEVEL_SOURCE)
+            )
+
+    elif scene_type == SCENE_TYPE_SCALED:
+        if light_type not in [LIGHT_TYPE_DIMMER, LIGHT_TYPE_COLOR]:
+            return "Scaled scenes are not valid for Switch lights"
+        for key in [
+            META_KEY_LEVEL_SOURCE,
+            META_KEY_LEVEL_HIGH,
+            META_KEY_STATE_HIGH,
+            META_KEY_STATE_LOW,
+        ]:
+            if _setting(key) is None:
+                return _missing(key)
+        if _setting(META_KEY_LEVEL_SOURCE) not in item_names:
+            return "level source '{name}' does not exist".format(
+                name=_setting(META_KEY_LEVEL_SOURCE)
+            )
+        for key in [META_KEY_STATE_HIGH, META_KEY_STATE_LOW]:
+            if not isinstance(_setting(key), (int, float, list)):
+                return "'{key}' must be a number or a list of 3 HSV values".format(
+                    key=key
+                )
+
+    return None
+
+
+def check_light(task):
+    """Checks every scene declared for a light. ``task`` is a tuple of the
+    light and its scene data, as returned by ``collect``.
+
+    Returns a tuple of the number of scenes checked and a list of problems.
+    """
+    item, data = task
+    light_type = LIGHT_TYPE_MAP.get(item["type"].lower(), None)
+    scenes = sorted(_get_declared_scenes(data, light_type))
+    problems = []
+    for scene in scenes:
+        try:
+            problem = check_scene(item, scene, data, _item_names)
+        except Exception as ex:
+            problem = "error while checking: {}".format(ex)
+        if problem is not None:
+            problems.append(_problem(item["name"], scene, problem))
+    return len(scenes), problems
+
+
+def _check_batch(tasks):
+    results = [check_light(task) for task in tasks]
+    return (
+        sum([count for count, problems in results]),
+        [problem for count, problems in results for problem in problems],
+    )
+
+
+def collect(master_group_name, host):
+    """Walks the Eos group tree under ``master_group_name``.
+
+    Returns a list of ``(light, data)`` tasks for ``check_light`` and a list
+    of problems found with the groups. All metadata is fetched in one batch.
+    """
+    prefix = get_conf_value(CONF_KEY_SCENE_PREFIX, default="")
+    suffix = get_conf_value(CONF_KEY_SCENE_SUFFIX, default="")
+    reinit_item_name = get_conf_value(CONF_KEY_REINIT_ITEM, str)
+    lights = []
+    problems = []
+    visited = set()
+
+    def _walk(group, chain):
+        if group["name"] in visited:
+            return
+        visited.add(group["name"])
+        members = group.get("members", [])
+        scene_items = [
+            item for item in members if validate_item_name(item["name"], prefix, suffix)
+        ]
+        if not scene_items:
+            return
+        elif len(scene_items) > 1:
+            problems.append(
+                _problem(
+                    group["name"],
+                    None,
+                    "group has {count} scene items: {names}".format(
+                        count=len(scene_items),
+                        names=", ".join([item["name"] for item in scene_items]),
+                    ),
+                )
+            )
+            return
+        elif scene_items[0]["type"] not in itemtypesScene:
+            problems.append(
+                _problem(
+                    group["name"],
+                    None,
+                    "scene item '{name}' is not a String item".format(
+                        name=scene_items[0]["name"]
+                    ),
+                )
+            )
+            return
+        chain = chain + [group["name"]]
+        for item in members:
+            if item["type"] in itemtypesGroup:
+                _walk(validate_item(item["name"], host), chain)
+            elif item["type"] in itemtypesLight and item["name"] not in [
+                scene_items[0]["name"],
+                reinit_item_name,
+            ]:
+                lights.append((item, chain))
+
+    _walk(validate_item(master_group_name, host), [])
+
+    names = sorted(set([light["name"] for light, chain in lights] + list(visited)))
+    metadata = dict(zip(names, get_metadata_many(names, META_NAME_EOS, host)))
+    global_settings = get_global_settings()
+    group_data = {}
+    tasks = []
+    for light, chain in lights:
+        value = resolve_type(metadata[light["name"]].get("value", None))
+        if value is None or str(value).lower() in META_STRING_FALSE:
+            # not an Eos light, or disabled
+            continue
+        if tuple(chain) not in group_data:
+            # lights in the same group share their group settings
+            group_data[tuple(chain)] = build_scene_data(
+                {},
+                [metadata[name].get("config", {}) for name in chain],
+                global_settings,
+            )
+        tasks.append(
+            (
+                {"name": light["name"], "type": light["type"]},
+                dict(
+                    group_data[tuple(chain)],
+                    item=metadata[light["name"]].get("config", {}),
+                ),
+            )
+        )
+    return tasks, problems
+
+
+def run(tasks, item_names, jobs=None):
+    """Checks all ``tasks``, spread over ``jobs`` worker processes.
+
+    Returns a tuple of the number of scenes checked and a list of problems.
+    Small trees are checked in this process.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    batches = [
+        tasks[start : start + LINT_BATCH_SIZE]
+        for start in range(0, len(tasks), LINT_BATCH_SIZE)
+    ]
+    if jobs == 1 or len(batches) < 2:
+        _init_worker(item_names)
+        results = [_check_batch(batch) for batch in batches]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(batches)),
+            initializer=_init_worker,
+            initargs=(item_names,),
+        ) as executor:
+            results = list(executor.map(_check_batch, batches))
+    return (
+        sum([count for count, problems in results]),
+        [problem for count, problems in results for problem in problems],
+    )
+
+
+def write(report, path=None):
+    """Writes ``report`` as JSON to ``path``, or to stdout if it is
+    ``None``."""
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if path is None:
+        sys.stdout.write(text + "\n")
+    else:
+        with open(path, "w") as report_file:
+            report_file.write(text + "\n")
@@ -31,10 +31,10 @@ if sys.version_info[0] < 3:  # Python 2.x
 else:  # Python 3.x
     pass
 
-import copy, six
+import copy, six, shutil, threading
 from ast import literal_eval
 from click import echo, clear
-from questionary import select, Choice, Separator, text, confirm
+from questionary import select, checkbox, Choice, Separator, text, confirm
 from prompt_toolkit.styles import Style
 from pygments import lex
 import pygments.lexers.html
@@ -44,7 +44,8 @@ HtmlLexer = pygments.lexers.html.HtmlLexer()
 from constants import *
 from utils import *
 from rest.utils import validate_item, update_item
-from rest.metadata import get_metadata, set_metadata
+from rest.metadata import get_metadata, get_metadata_many, set_metadata
+from rest import index, pending
 
 eos_style = Style(
     [
@@ -74,6 +75,241 @@ col_left_width = 17
 col_right_width = 25
 
 
+# Navigation menu models by group name, see ``get_menu_model``. Models for the
+# child groups of the current menu are built by ``_prefetch_worker`` while it
+# is shown, each model is only built by one thread at a time. Items edited
+# while a model is in use are added to its ``edited`` set under
+# ``_edited_lock``.
+MENU_SECTIONS = ["eos_lights", "eos_groups", "other_items"]
+_menu_models = {}
+_menu_locks = {}
+_menu_locks_lock = threading.Lock()
+_edited_lock = threading.Lock()
+_prefetch_names = []
+_prefetch_condition = threading.Condition()
+_prefetch_thread = None
+
+
+def get_menu_height():
+    """
+    Number of choices that fit in the terminal below the menu message
+    """
+    return max(5, shutil.get_terminal_size().lines - 3)
+
+
+def _get_item_choice(item, disabled=False):
+    """
+    Builds the navigation menu choice for an item
+    """
+    return Choice(
+        title=[
+            ("class:itemtype", "{}".format(item["type"])),
+            ("class:itemname", " {}".format(item["name"])),
+            (
+                "class:itemlabel",
+                "{}".format(' "{}"'.format(item["label"]) if "label" in item else ""),
+            ),
+            (
+                "class:valuerequired",
+                " (unsaved)" if pending.is_pending(item["name"]) else "",
+            ),
+        ],
+        disabled=disabled,
+        value=item["name"],
+    )
+
+
+def _get_changed_items(group_name, model):
+    """
+    Returns the names of the items in a menu model that changed since it was
+    built, or ``None`` if it must be built again
+    """
+    with _edited_lock:
+        changed, model["edited"] = model["edited"], set()
+    if not index.is_loaded():
+        # without the index there is no way to tell what changed in openHAB
+        return None
+    indexed = index.get_changed_items(model["generation"])
+    if indexed is None:
+        return None
+    changed.update(
+        [
+            name
+            for name in indexed
+            if name == group_name
+            or name in model["choices"]
+            or group_name in index.get_group_names(name)
+        ]
+    )
+    return changed
+
+
+def _build_menu_model(group_name, host, quiet=False):
+    """
+    Builds the navigation menu model for a group
+    """
+    if not quiet:
+        echo("Building Menu...")
+    group = validate_item(group_name, host)
+    return {
+        "group": group,
+        "eos_lights": get_light_items(group, host),
+        "eos_groups": get_group_items(group),
+        "other_items": get_other_items(group, host),
+        "item_eos_group": get_item_eos_group(group, host),
+        "choices": {},
+        "pending": {},
+        "edited": set(),
+    }
+
+
+def _patch_menu_model(model, names, host):
+    """
+    Sorts the changed items in a navigation menu model into the menu sections
+    again, without fetching the whole group
+
+    Returns ``False`` if the model must be built again instead
+    """
+    group = model["group"]
+    scene_item = get_scene_item(group)
+    if scene_item is None:
+        return False
+    updated = {}
+    for name in names:
+        if name == scene_item["name"]:
+            continue
+        item = validate_item(name, host)
+        if item is not None and group["name"] in item.get("groupNames", []):
+            updated[name] = {key: item[key] for key in item if key != "members"}
+
+    # members keep their place in the group, new members are added at the end
+    members = [
+        updated.get(member["name"], member)
+        for member in group["members"]
+        if member["name"] not in names or member["name"] in updated
+    ]
+    members.extend(
+        [
+            updated[name]
+            for name in updated
+            if name not in [member["name"] for member in group["members"]]
+        ]
+    )
+    group["members"] = members
+    order = {member["name"]: position for position, member in enumerate(members)}
+
+    changed_group = dict(group, members=list(updated.values()) + [scene_item])
+    changed_items = {
+        "eos_lights": get_light_items(changed_group, host),
+        "eos_groups": get_group_items(changed_group),
+        "other_items": get_other_items(changed_group, host),
+    }
+    for section in MENU_SECTIONS:
+        model[section] = sorted(
+            [item for item in model[section] if item["name"] not in names]
+            + changed_items[section],
+            key=lambda item: order[item["name"]],
+        )
+    for name in names:
+        model["choices"].pop(name, None)
+    return True
+
+
+def _get_menu_lock(group_name):
+    with _menu_locks_lock:
+        return _menu_locks.setdefault(group_name, threading.Lock())
+
+
+def get_menu_model(group_name, host, quiet=False):
+    """
+    Returns the navigation menu model for a group. Models are kept between
+    menus and only the items that changed are updated.
+    """
+    with _get_menu_lock(group_name):
+        return _get_menu_model(group_name, host, quiet)
+
+
+def _get_menu_model(group_name, host, quiet):
+    model = _menu_models.get(group_name, None)
+    changed = _get_changed_items(group_name, model) if model else None
+    if (
+        changed
+        and group_name not in changed
+        and not _patch_menu_model(model, changed, host)
+    ):
+        changed = None
+    if changed is None or group_name in changed:
+        model = _build_menu_model(group_name, host, quiet)
+        _menu_models[group_name] = model
+    model["generation"] = index.get_generation()
+
+    # build choices that are new or changed, and those whose unsaved marker
+    # changed in batch mode
+    for section in MENU_SECTIONS:
+        for item in model[section]:
+            is_pending = pending.is_pending(item["name"])
+            if (
+                item["name"] not in model["choices"]
+                or model["pending"].get(item["name"], False) != is_pending
+            ):
+                model["choices"][item["name"]] = _get_item_choice(
+                    item,
+                    disabled="not implemented yet"  # TODO implement group adding
+                    if section == "other_items" and item["type"] == "Group"
+                    else False,
+                )
+                model["pending"][item["name"]] = is_pending
+    return model
+
+
+def clear_menu_models():
+    """
+    Forgets all navigation menu models, they are built again when shown
+    """
+    for group_name in list(_menu_models):
+        with _get_menu_lock(group_name):
+            _menu_models.pop(group_name, None)
+
+
+def menu_item_changed(item_name):
+    """
+    Marks an item as changed in every navigation menu model
+    """
+    with _edited_lock:
+        for model in list(_menu_models.values()):
+            model["edited"].add(item_name)
+
+
+def prefetch_menu_models(group_names, host):
+    """
+    Builds the navigation menu models for groups in the background, replacing
+    any groups still waiting from the previous menu
+    """
+    global _prefetch_thread
+    with _prefetch_condition:
+        _prefetch_names[:] = [(group_name, host) for group_name in group_names]
+        if _prefetch_thread is None:
+            _prefetch_thread = threading.Thread(target=_prefetch_worker)
+            _prefetch_thread.daemon = True
+            _prefetch_thread.start()
+        _prefetch_condition.notify()
+
+
+def _prefetch_worker():
+    while True:
+        with _prefetch_condition:
+            while not _prefetch_names:
+                _prefetch_condition.wait()
+            group_name, host = _prefetch_names.pop(0)
+        try:
+            get_menu_model(group_name, host, quiet=True)
+        except Exception:
+            # drop any partly updated model, the menu builds it again when the
+            # group is opened and shows the error then
+            with _get_menu_lock(group_name):
+                _menu_models.pop(group_name, None)
+
+
 def menu_navigate(root_group_name, host, back_group=None):
     """
     Display the Navigation menu
@@ -83,13 +319,12 @@ def menu_navigate(root_group_name, host, back_group=None):
     pointed_at = None
     exit_loop = False
     while not exit_loop:
-        echo("Building Menu...")
-
-        root_group = validate_item(root_group_name, host)
-        eos_lights = get_light_items(root_group, host)
-        eos_groups = get_group_items(root_group)
-        other_items = get_other_items(root_group, host)
-        item_eos_group = get_item_eos_group(root_group, host)
+        model = get_menu_model(root_group_name, host)
+        root_group = model["group"]
+        eos_lights = model["eos_lights"]
+        eos_groups = model["eos_groups"]
+        other_items = model["other_items"]
+        item_eos_group = model["item_eos_group"]
 
         menu_choices = []
         menu_choices.append(Separator(line=" "))
@@ -106,6 +341,10 @@ def menu_navigate(root_group_name, host, back_group=None):
                             else ""
                         ),
                     ),
+                    (
+                        "class:valuerequired",
+                        " (unsaved)" if pending.is_pending(root_group["name"]) else "",
+                    ),
                 ],
                 disabled=True,
             )
@@ -130,79 +369,31 @@ def menu_navigate(root_group_name, host, back_group=None):
                 )
             )
         menu_choices.append(Separator(line=" "))
-        if eos_lights:
-            menu_choices.append(Separator(line="    Eos Lights"))
-            for item in eos_lights:
+        for title, items in [
+            ("Eos Lights", eos_lights),
+            ("Eos Groups", eos_groups),
+            ("Non Eos Items", other_items),
+        ]:
+            if not items:
+                continue
+            menu_choices.append(Separator(line="    {}".format(title)))
+            for item in items:
                 if answer == item["name"]:
                     pointed_at = len(menu_choices)
-                menu_choices.append(
-                    Choice(
-                        title=[
-                            ("class:itemtype", "{}".format(item["type"])),
-                            ("class:itemname", " {}".format(item["name"])),
-                            (
-                                "class:itemlabel",
-                                "{}".format(
-                                    ' "{}"'.format(item["label"])
-                                    if "label" in item
-                                    else ""
-                                ),
-                            ),
-                        ],
-                        value=item["name"],
-                    )
-                )
-            menu_choices.append(Separator(line=" "))
-        if eos_groups:
-            menu_choices.append(Separator(line="    Eos Groups"))
-            for item in eos_groups:
-                if answer == item["name"]:
-                    pointed_at = len(menu_choices)
-                menu_choices.append(
-                    Choice(
-                        title=[
-                            ("class:itemtype", "{}".format(item["type"])),
-                            ("class:itemname", " {}".format(item["name"])),
-                            (
-                                "class:itemlabel",
-                                "{}".format(
-                                    ' "{}"'.format(item["label"])
-                                    if "label" in item
-                                    else ""
-                                ),
-                            ),
-                        ],
-                        value=item["name"],
-                    )
-                )
-            menu_choices.append(Separator(line=" "))
-        if other_items:
-            menu_choices.append(Separator(line="    Non Eos Items"))
-            for item in other_items:
-                if answer == item["name"]:
-                    pointed_at = len(menu_choices)
-                menu_choices.append(
-                    Choice(
-                        title=[
-                            ("class:itemtype", "{}".format(item["type"])),
-                            ("class:itemname", " {}".format(item["name"])),
-                            (
-                                "class:itemlabel",
-                                "{}".format(
-                                    ' "{}"'.format(item["label"])
-                                    if "label" in item
-                                    else ""
-                                ),
-                            ),
-                        ],
-                        disabled="not implemented yet"
-                        if item["type"] == "Group"
-                        else False,  # TODO implement group adding
-                        value=item["name"],
-                    )
-                )
+                menu_choices.append(model["choices"][item["name"]])
             menu_choices.append(Separator(line=" "))
         menu_choices.append(Separator(line="    Options"))
+        if index.is_loaded():
+            if answer == "eos_menu_search":
+                pointed_at = len(menu_choices)
+            menu_choices.append(Choice(title="Search items", value="eos_menu_search"))
+            if answer == "eos_menu_preview":
+                pointed_at = len(menu_choices)
+            menu_choices.append(Choice(title="Preview scene", value="eos_menu_preview"))
+        if eos_lights or eos_groups:
+            if answer == "eos_menu_copy":
+                pointed_at = len(menu_choices)
+            menu_choices.append(Choice(title="Copy settings", value="eos_menu_copy"))
         if answer == "eos_menu_configure":
             pointed_at = len(menu_choices)
         menu_choices.append(Choice(title="Configure Group", value="eos_menu_configure"))
@@ -233,6 +424,21 @@ def menu_navigate(root_group_name, host, back_group=None):
                 disabled="not implemented yet",
             )
         )
+        if pending.count():
+            if answer == "eos_menu_save":
+                pointed_at = len(menu_choices)
+            menu_choices.append(
+                Choice(
+                    title=[
+                        ("class:text", "Save changes"),
+                        (
+                            "class:valuerequired",
+                            "  ({} unsaved)".format(pending.count()),
+                        ),
+                    ],
+                    value="eos_menu_save",
+                )
+            )
         menu_choices.append(Separator(line=" "))
         if back_group:
             menu_choices.append(
@@ -254,6 +460,7 @@ def menu_navigate(root_group_name, host, back_group=None):
             )
         )
 
+        prefetch_menu_models([item["name"] for item in eos_groups], host)
         clear()
         answer = select(
             message=menu_message,
@@ -261,6 +468,8 @@ def menu_navigate(root_group_name, host, back_group=None):
             style=eos_style,
             qmark="",
             pointed_at=pointed_at,
+            max_height=get_menu_height(),
+            use_search=True,
         ).ask()
 
         if not answer:
@@ -270,7 +479,16 @@ def menu_navigate(root_group_name, host, back_group=None):
         if answer == "eos_menu_exit":
             # "Exit"
             clear()
-            exit(0)
+            failed = pending.flush()
+            # saved here for the exit status, nothing is left for the editor to
+            # save when it closes
+            pending.enable(False)
+            exit(1 if failed else 0)
+        elif answer == "eos_menu_save":
+            # save queued changes
+            clear()
+            if pending.flush():
+                prompt_text("Press enter to continue")
         elif answer == "eos_menu_back":
             # back to previous group
             exit_loop = True
@@ -286,35 +504,32 @@ def menu_navigate(root_group_name, host, back_group=None):
                 if not save_metadata(item, host, data):
                     pass  # TODO something went wrong
                 if item.get("editable", False):
-                    update_item(item, host)
+                    save_item(item, host)
             del item, data
         elif [item for item in eos_groups if item["name"] == answer]:
             # selected an eos group
             menu_navigate(
-                [item for item in eos_groups if item["name"] == answer][0],
+                [item for item in eos_groups if item["name"] == answer][0]["name"],
                 host,
                 back_group=root_group["name"],
             )
         elif [item for item in other_items if item["name"] == answer]:
             # selected a non-eos item
-            item = validate_item(
+            menu_edit_item(
                 [item for item in other_items if item["name"] == answer][0]["name"],
                 host,
             )
-            item, data = menu_eos(
-                item,
-                build_data(item, host),
-                host,
-                8 if item["type"] in itemtypesGroup else 6,
-                is_light=True if item["type"] in itemtypesLight else False,
-                is_group=True if item["type"] in itemtypesGroup else False,
-            ) or (None, None)
-            if data:
-                if not save_metadata(item, host, data):
-                    pass  # TODO something went wrong
-                if item.get("editable", False):
-                    update_item(item, host)
-            del item, data
+        elif answer == "eos_menu_search":
+            # search all items
+            item_name = prompt_search_item()
+            if item_name:
+                menu_edit_item(item_name, host)
+        elif answer == "eos_menu_preview":
+            # show computed light states for a scene
+            menu_preview(root_group, host)
+        elif answer == "eos_menu_copy":
+            # copy settings to many lights at once
+            menu_copy_settings(root_group, host)
         elif answer == "eos_menu_configure":
             # edit Eos metadata
             item, data = menu_eos(
@@ -324,7 +539,7 @@ def menu_navigate(root_group_name, host, back_group=None):
                 if not save_metadata(item, host, data):
                     pass  # TODO something went wrong
                 if item.get("editable", False):
-                    update_item(item, host)
+                    save_item(item, host)
             del item, data
         elif answer == "eos_menu_add_existing":
             # add an existing item not in this group
@@ -342,6 +557,180 @@ def menu_navigate(root_group_name, host, back_group=None):
     clear()
 
 
+def menu_edit_item(item_name, host):
+    """
+    Edit the Eos metadata for any item
+    """
+    item = validate_item(item_name, host)
+    item, data = menu_eos(
+        item,
+        build_data(item, host),
+        host,
+        8 if item["type"] in itemtypesGroup else 6,
+        is_light=True if item["type"] in itemtypesLight else False,
+        is_group=True if item["type"] in itemtypesGroup else False,
+    ) or (None, None)
+    if data:
+        if not save_metadata(item, host, data):
+            pass  # TODO something went wrong
+        if item.get("editable", False):
+            save_item(item, host)
+    del item, data
+
+
+def menu_preview(group, host):
+    """
+    Show the state each light in a group would be set to for a scene
+    """
+    import preview
+
+    scene = (get_scene_item(group) or {}).get("state", "")
+    scene = prompt_scene_name(
+        "Scene to preview",
+        instructions=["States are computed from the current item states"],
+        default="" if scene in ["NULL", "UNDEF"] else scene,
+    )
+    if not scene:
+        return
+    results = preview.preview_group(group, scene, host)
+    prompt_text(
+        "Press enter to continue",
+        pre_lines=["Preview of scene '{}' for '{}'".format(scene, group["name"]), ""]
+        + (preview.describe(results) or ["No lights found"])
+        + [""],
+    )
+
+
+def _get_group_lights(group_name, host):
+    """
+    Returns a list of ``(group, Eos lights)`` for a group and all Eos groups
+    under it
+    """
+    results = []
+    group_names = [group_name]
+    while group_names:
+        model = get_menu_model(group_names.pop(0), host, quiet=True)
+        results.append((model["group"], model["eos_lights"]))
+        group_names.extend(
+            [
+                item["name"]
+                for item in model["eos_groups"]
+                if item["name"] not in [result[0]["name"] for result in results]
+            ]
+        )
+    return results
+
+
+def _format_setting(value):
+    if value is None:
+        return "not set"
+    return '"{}"'.format(value) if isinstance(value, str) else str(value)
+
+
+def menu_copy_settings(group, host):
+    """
+    Copy settings from a light to many lights, or from a group to many groups
+    """
+    import bulk
+
+    def _continue(lines):
+        prompt_text("Press enter to continue", pre_lines=lines + [""])
+
+    def _get_choices(groups=True, lights=True, exclude=None):
+        choices = []
+        sections = []
+        if groups:
+            sections.append(("Groups", [group_item for group_item, _ in tree]))
+        if lights:
+            sections.extend([(item["name"], items) for item, items in tree])
+        for title, items in sections:
+            items = [item for item in items if item["name"] != exclude]
+            if items:
+                if lights:
+                    choices.append(Separator(line="    {}".format(title)))
+                choices.extend([_get_item_choice(item) for item in items])
+        return choices
+
+    # the settings of a group apply to every light in it, so they are only
+    # copied to other groups
+    tree = _get_group_lights(group["name"], host)
+    clear()
+    source_name = select(
+        message="Eos Editor > Copy settings from",
+        choices=_get_choices(),
+        style=eos_style,
+        qmark="",
+        max_height=get_menu_height(),
+        use_search=True,
+    ).ask()
+    if not source_name:
+        return
+    is_group = source_name in [group_item["name"] for group_item, _ in tree]
+    kind = "groups" if is_group else "lights"
+
+    paths = bulk.get_setting_paths(
+        get_metadata(source_name, META_NAME_EOS, host).get("config", {})
+    )
+    if not paths:
+        _continue(["'{}' has no settings to copy".format(source_name)])
+        return
+    clear()
+    paths = checkbox(
+        message="Settings to copy from '{}'".format(source_name),
+        choices=[Choice(title=" > ".join(path), value=path) for path in paths],
+        style=eos_style,
+        qmark="",
+        max_height=get_menu_height(),
+    ).ask()
+    if not paths:
+        return
+
+    choices = _get_choices(groups=is_group, lights=not is_group, exclude=source_name)
+    if not choices:
+        _continue(["No {} to copy settings to".format(kind)])
+        return
+    clear()
+    target_names = checkbox(
+        message="{} to copy the settings to".format(kind.capitalize()),
+        choices=choices,
+        style=eos_style,
+        qmark="",
+        max_height=get_menu_height(),
+    ).ask()
+    if not target_names:
+        return
+
+    changes = bulk.plan(source_name, paths, target_names, host)
+    if not changes:
+        _continue(["The selected {} already have these settings".format(kind)])
+        return
+    clear()
+    for name, value, config, settings in changes:
+        echo(name)
+        for path, old_value, new_value in settings:
+            echo(
+                "    {path}: {old} -> {new}".format(
+                    path=" > ".join([str(key) for key in path]),
+                    old=_format_setting(old_value),
+                    new=_format_setting(new_value),
+                )
+            )
+    echo("")
+    if not confirm(
+        message="Save changes to {count} {kind}?".format(
+            count=len(changes), kind=kind if len(changes) > 1 else kind[:-1]
+        ),
+        style=eos_style,
+        qmark="",
+    ).ask():
+        return
+    for change in changes:
+        menu_item_changed(change[0])
+    failed = bulk.apply(changes, host)
+    if failed:
+        _continue(["Failed to save changes to: {}".format(", ".join(failed))])
+
+
 def save_metadata(item, host, data):
     """
     Saves metadata to openHAB
@@ -367,6 +756,13 @@ def save_metadata(item, host, data):
         ][0]
 
     purge_empty(configuration)
+    menu_item_changed(item["name"])
+
+    if pending.is_enabled():
+        pending.queue_metadata(
+            item["name"], META_NAME_EOS, host, configuration=configuration, value=value
+        )
+        return True
 
     return set_metadata(
         item["name"],
@@ -378,25 +774,31 @@ def save_metadata(item, host, data):
     )
 
 
+def save_item(item, host):
+    """
+    Saves item to openHAB
+    """
+    menu_item_changed(item["name"])
+    if pending.is_enabled():
+        pending.queue_item(item, host)
+        return True
+    return update_item(item, host)
+
+
 def build_data(item, host):
     """
     Builds data structure for the eos menu
     """
 
-    def _get_group_data(group):
+    def _get_groups(group):
         """
-        Get all group ancestor's data, top level group settings are lowest priority
+        Get all group ancestors, top level group settings are lowest priority
         """
-        data["raw_groups"].append(
-            {
-                "name": group["name"],
-                "data": get_metadata(group["name"], META_NAME_EOS, host).get(
-                    "config", {}
-                ),
-            }
-        )
-        if get_item_eos_group(group, host):
-            _get_group_data(get_item_eos_group(group, host))
+        groups = []
+        while group:
+            groups.append(group)
+            group = get_item_eos_group(group, host)
+        return groups
 
     clear()
     echo("Loading Data...")
@@ -406,15 +808,25 @@ def build_data(item, host):
     is_light = item["type"] in itemtypesLight
     is_group = item["type"] in itemtypesGroup
 
-    item_metadata = get_metadata(item["name"], META_NAME_EOS, host)
+    groups = []
+    if is_light:
+        groups = _get_groups(get_item_eos_group(item, host))
+    elif is_group:
+        groups = _get_groups(item)
+
+    # fetch the item and all ancestor groups at once
+    metadata = get_metadata_many(
+        [item["name"]] + [group["name"] for group in groups], META_NAME_EOS, host
+    )
+    item_metadata = metadata[0]
+    data["raw_groups"] = [
+        {"name": group["name"], "data": group_metadata.get("config", {})}
+        for group, group_metadata in zip(groups, metadata[1:])
+    ]
 
     if is_light:
         data["item"] = item_metadata.get("config", {})
         data["light_type"] = LIGHT_TYPE_MAP.get(item.get("type", "").lower(), None)
-        _get_group_data(get_item_eos_group(item, host))
-
-    if is_group:
-        _get_group_data(item)
 
     # get enabled option
     data["enabled"] = item_metadata.get("value", True)
@@ -511,12 +923,13 @@ def menu_eos(
 
         property_map = {
             SCENE_TYPE_ALIAS: [META_KEY_ALIAS_SCENE],
-            SCENE_TYPE_FIXED: [META_KEY_STATE],
+            SCENE_TYPE_FIXED: [META_KEY_STATE, META_KEY_TRANSITION_TIME],
             SCENE_TYPE_THRESHOLD: [
                 META_KEY_LEVEL_SOURCE,
                 META_KEY_LEVEL_THRESHOLD,
                 META_KEY_STATE_ABOVE,
                 META_KEY_STATE_BELOW,
+                META_KEY_TRANSITION_TIME,
             ],
             SCENE_TYPE_SCALED: [
                 META_KEY_LEVEL_SOURCE,
@@ -526,6 +939,9 @@ def menu_eos(
                 META_KEY_STATE_LOW,
                 META_KEY_STATE_ABOVE,
                 META_KEY_STATE_BELOW,
+                META_KEY_SCALED_MIN_DELTA,
+                META_KEY_SCALED_MIN_INTERVAL,
+                META_KEY_TRANSITION_TIME,
             ],
         }
         if (
@@ -1238,6 +1654,29 @@ def prompt_text(message, pre_lines=[], default=""):
     return text(message=message, default=default, style=eos_style, qmark="").ask()
 
 
+def prompt_search_item():
+    """
+    Prompt for an item name, completing it with the best search matches
+    """
+    import search
+
+    def _validate(name):
+        if name and search.get_entry(name) is None:
+            return "No item named '{}'".format(name)
+        return True
+
+    clear()
+    echo("Type part of an item name, label or group, leave blank to cancel")
+    return text(
+        message="Search items",
+        style=eos_style,
+        qmark="",
+        completer=search.ItemCompleter(),
+        complete_while_typing=True,
+        validate=_validate,
+    ).ask()
+
+
 def prompt_select_group(item, host):
     """
     Prompt to select an Eos group
@@ -1392,7 +1831,14 @@ def prompt_edit_setting(message, key, host, instructions=[], default=""):
             valid = True if validate_item(answer, host) else False
             if not valid:
                 err_msg = "Value of {key} must be an item that exists!".format(key=key)
-        elif key in [META_KEY_LEVEL_HIGH, META_KEY_LEVEL_LOW, META_KEY_LEVEL_THRESHOLD]:
+        elif key in [
+            META_KEY_LEVEL_HIGH,
+            META_KEY_LEVEL_LOW,
+            META_KEY_LEVEL_THRESHOLD,
+            META_KEY_SCALED_MIN_DELTA,
+            META_KEY_SCALED_MIN_INTERVAL,
+            META_KEY_TRANSITION_TIME,
+        ]:
             answer = resolve_type(answer)
             valid = True if isinstance(answer, (int, float)) else False
             if not valid:
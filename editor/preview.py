@@ -0,0 +1,296 @@
+"""
+Eos Lighting Metadata Editor - Scene Preview
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import sys
+
+if sys.version_info[0] < 3:  # Python 2.x
+    str = basestring
+else:  # Python 3.x
+    pass
+
+from constants import *
+from utils import (
+    build_scene_data,
+    get_global_settings,
+    get_group_items,
+    get_item_eos_group,
+    get_light_items,
+    get_scene_setting,
+    get_scene_type,
+    resolve_type,
+)
+from rest import index
+from rest.metadata import get_metadata_many
+from rest.utils import validate_item
+
+__all__ = ["get_state_for_scene", "preview_group", "describe"]
+
+
+def _constrain(value, min, max):
+    return max if value > max else min if value < min else value
+
+
+def get_state_for_scene(item, scene, data, states):
+    """Computes the state ``item`` would be sent for ``scene``.
+
+    This mirrors ``get_state_for_scene`` in the Eos runtime, using ``data``
+    built like the runtime does and ``states``, a dict of item names and
+    their states, instead of openHAB. Throttling of Scaled scenes is not
+    applied.
+
+    Returns a tuple of the state, or ``None`` if the light would be left
+    alone, and a note describing how the state was found.
+    """
+    light_type = LIGHT_TYPE_MAP.get(item["type"].lower(), None)
+    if light_type is None:
+        return None, "couldn't get light type"
+
+    def _setting(key):
+        return get_scene_setting(scene, light_type, key, data)
+
+    def _level(key):
+        # returns the level source state, or None if it has no value
+        level_value = resolve_type(states.get(_setting(key), "NULL"))
+        if isinstance(level_value, str) and level_value.lower() in ["null", "undef"]:
+            return None
+        return level_value
+
+    notes = []
+    state = None
+
+    alias_scene = _setting(META_KEY_ALIAS_SCENE)
+    if alias_scene is not None:
+        notes.append("alias of '{}'".format(alias_scene))
+        scene = alias_scene
+
+    motion_source = _setting(META_KEY_MOTION_SOURCE)
+    if motion_source in states:
+        motion_active = _setting(META_KEY_MOTION_ACTIVE)
+        motion_state = _setting(META_KEY_MOTION_STATE)
+        motion_scene = _setting(META_KEY_MOTION_SCENE)
+        if motion_active is not None and (motion_state is not None or motion_scene):
+            if str(states[motion_source]) == str(motion_active):
+                if motion_state is not None:
+                    notes.append("motion active")
+                    state = motion_state
+                elif motion_scene:
+                    notes.append("motion scene '{}'".format(motion_scene))
+                    scene = motion_scene
+
+    scene_type = get_scene_type(scene, light_type, data)
+    if scene_type not in [SCENE_TYPE_FIXED, SCENE_TYPE_THRESHOLD, SCENE_TYPE_SCALED]:
+        return None, "couldn't get scene type"
+    notes.insert(0, scene_type)
+
+    def _no_level(key):
+        if _setting(key) not in states:
+            return None, "level source '{}' does not exist".format(_setting(key))
+        return None, "level source '{}' has no value".format(_setting(key))
+
+    def _missing(key):
+        return None, "{type} type scenes require '{key}' setting".format(
+            type=scene_type.capitalize(), key=key
+        )
+
+    if scene_type == SCENE_TYPE_FIXED and state is None:
+        state = _setting(META_KEY_STATE)
+        if state is None:
+            return _missing(META_KEY_STATE)
+
+    elif scene_type == SCENE_TYPE_THRESHOLD and state is None:
+        for key in [
+            META_KEY_LEVEL_SOURCE,
+            META_KEY_LEVEL_THRESHOLD,
+            META_KEY_STATE_ABOVE,
+            META_KEY_STATE_BELOW,
+        ]:
+            if _setting(key) is None:
+                return _missing(key)
+        level_value = _level(META_KEY_LEVEL_SOURCE)
+        if level_value is None:
+            return _no_level(META_KEY_LEVEL_SOURCE)
+        notes.append("level {}".format(level_value))
+        state = (
+            _setting(META_KEY_STATE_ABOVE)
+            if level_value > _setting(META_KEY_LEVEL_THRESHOLD)
+            else _setting(META_KEY_STATE_BELOW)
+        )
+
+    elif (
+        scene_type == SCENE_TYPE_SCALED
+        and light_type in [LIGHT_TYPE_DIMMER, LIGHT_TYPE_COLOR]
+        and state is None
+    ):
+        for key in [
+            META_KEY_LEVEL_SOURCE,
+            META_KEY_LEVEL_HIGH,
+            META_KEY_STATE_HIGH,
+            META_KEY_STATE_LOW,
+        ]:
+            if _setting(key) is None:
+                return _missing(key)
+        level_value = _level(META_KEY_LEVEL_SOURCE)
+        if level_value is None:
+            return _no_level(META_KEY_LEVEL_SOURCE)
+        notes.append("level {}".format(level_value))
+        level_value = float(level_value)
+        level_high = float(_setting(META_KEY_LEVEL_HIGH))
+        level_low = float(_setting(META_KEY_LEVEL_LOW) or 0.0)
+        state_high = _setting(META_KEY_STATE_HIGH)
+        state_low = _setting(META_KEY_STATE_LOW)
+
+        if level_value > level_high:
+            state = _setting(META_KEY_STATE_ABOVE) or state_high
+        elif level_value < level_low:
+            state = _setting(META_KEY_STATE_BELOW) or state_low
+        else:
+            scaling_factor = (level_value - level_low) / (level_high - level_low)
+
+            def scale(low, high):
+                return int(round(low + (high - low) * scaling_factor))
+
+            if isinstance(state_high, (int, float)):  # Dimmer value
+                state = scale(state_low, state_high)
+            elif isinstance(state_high, list):  # HSV list
+                state = [scale(float(state_low[0]), float(state_high[0]))]
+                state.append(scale(float(state_low[1]), float(state_high[1])))
+                state.append(scale(float(state_low[2]), float(state_high[2])))
+
+    elif state is None:
+        return None, "invalid scene configuration"
+
+    if (
+        light_type == LIGHT_TYPE_SWITCH
+        and isinstance(state, str)
+        and state.upper() in ["ON", "OFF"]
+    ):
+        state = state.upper()
+    elif light_type == LIGHT_TYPE_DIMMER and isinstance(state, (int, float)):
+        state = str(_constrain(int(round(state)), 0, 1000000))
+    elif light_type == LIGHT_TYPE_COLOR and isinstance(state, (int, float, list)):
+        if isinstance(state, (int, float)):
+            old_state = str(states.get(item["name"], "NULL"))
+            if old_state in ["NULL", "UNDEF"]:
+                old_state = "0,0,0"
+            old_state = old_state.split(",")
+            state = ",".join(
+                [
+                    str(old_state[0]),
+                    str(old_state[1]),
+                    str(_constrain(int(round(state)), 0, 100)),
+                ]
+            )
+        else:
+            state = list(state)
+            if state[0] > 359:
+                state[0] -= 359
+            elif state[0] < 0:
+                state[0] += 359
+            state[1] = _constrain(state[1], 0, 100)
+            state[2] = _constrain(state[2], 0, 100)
+            if state[2] == 0:
+                state = "0,0,0"
+            else:
+                state = ",".join([str(i) for i in state])
+    else:
+        return None, "state '{state}' is not valid for item type '{type}'".format(
+            state=state, type=item["type"]
+        )
+
+    return state, ", ".join(notes)
+
+
+def preview_group(group, scene, host):
+    """Computes the state of every light in ``group`` and its Eos groups for
+    ``scene``.
+
+    All metadata is fetched in one batch and states are taken from the item
+    index, so nothing is requested from openHAB when it is loaded. Returns a
+    list of ``(light, group name, state, note)`` tuples.
+    """
+    states = {
+        item["name"]: item.get("state", "NULL")
+        for item in index.get_item_fields(["name", "state"])
+    }
+    global_settings = get_global_settings()
+
+    # collect the lights and the Eos group chain above each of them
+    lights = []
+    chain = []
+    ancestor = get_item_eos_group(group, host)
+    while ancestor:
+        chain.insert(0, ancestor["name"])
+        ancestor = get_item_eos_group(ancestor, host)
+
+    def _collect(group, chain):
+        chain = chain + [group["name"]]
+        for light in get_light_items(group, host):
+            lights.append((light, chain))
+        for child in get_group_items(group):
+            _collect(validate_item(child["name"], host), chain)
+
+    _collect(group, chain)
+
+    names = set([light["name"] for light, chain in lights])
+    for light, chain in lights:
+        names.update(chain)
+    names = sorted(names)
+    configs = {
+        name: metadata.get("config", {})
+        for name, metadata in zip(names, get_metadata_many(names, META_NAME_EOS, host))
+    }
+
+    results = []
+    for light, chain in lights:
+        data = build_scene_data(
+            configs[light["name"]], [configs[name] for name in chain], global_settings
+        )
+        try:
+            state, note = get_state_for_scene(light, scene, data, states)
+        except Exception as ex:
+            state, note = None, "error while evaluating: {}".format(ex)
+        results.append((light, chain[-1], state, note))
+    return results
+
+
+def describe(results):
+    """Returns the lines describing the results of ``preview_group``."""
+    width = max([len(light["name"]) for light, group, state, note in results] + [4])
+    lines = []
+    last_group = None
+    for light, group, state, note in results:
+        if group != last_group:
+            lines.append("{}:".format(group))
+            last_group = group
+        lines.append(
+            "  {name:{width}}  {state:12}  {note}".format(
+                name=light["name"],
+                width=width,
+                state=str(state) if state is not None else "(unchanged)",
+                note=note,
+            )
+        )
+    return lines
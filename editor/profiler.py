@@ -0,0 +1,241 @@
+"""
+Eos Lighting Metadata Editor - Profiler
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import heapq, sys, threading, time
+from click import echo
+from urllib.parse import urlparse
+
+import utils
+from rest import utils as rest_utils
+
+__all__ = ["enable", "is_enabled", "get_stats", "report"]
+
+SLOWEST_COUNT = 10
+
+# Requests by endpoint like 'GET items/{name}' and reads by configuration
+# setting name, each with a count, bytes received and total seconds. Requests
+# are counted by a session response hook, so they include retries, the
+# connection check and the event stream, but not responses reused from the
+# cache. The slowest requests are kept in a heap of ``(seconds, description)``.
+_lock = threading.Lock()
+_enabled = False
+_start = None
+_profile = None
+_requests = {}
+_settings = {}
+_slowest = []
+_not_modified = 0
+_cache_hits = 0
+
+
+def _get_endpoint(method, path):
+    """Returns ``path`` with the item name and namespace replaced, so calls
+    for different items are counted together."""
+    parts = path.strip("/").split("/")
+    if parts[0] == "items" and len(parts) > 1:
+        parts[1] = "{name}"
+        if len(parts) > 3 and parts[2] == "metadata":
+            parts[3] = "{namespace}"
+    return "{method} {path}".format(method=method, path="/".join(parts) or "/")
+
+
+def _add(stats, key, elapsed, size=0):
+    entry = stats.setdefault(key, {"count": 0, "bytes": 0, "time": 0.0})
+    entry["count"] += 1
+    entry["bytes"] += size
+    entry["time"] += elapsed
+
+
+def _on_response(resp, *args, **kwargs):
+    """Session response hook that counts a request to openHAB."""
+    global _not_modified
+    elapsed = resp.elapsed.total_seconds()
+    size = 0
+    if not kwargs.get("stream", False):
+        # read the body now to time it and count the bytes received before
+        # they are decompressed, streamed responses are only counted
+        start = time.perf_counter()
+        resp.content
+        elapsed += time.perf_counter() - start
+        try:
+            size = resp.raw.tell()
+        except Exception:
+            size = len(resp.content or b"")
+    url = urlparse(resp.request.url)
+    # paths relative to the REST API root, like the editor requests them
+    path = url.path[len("/rest/") :] if url.path.startswith("/rest/") else url.path
+    method = resp.request.method
+    with _lock:
+        _add(_requests, _get_endpoint(method, path), elapsed, size)
+        if resp.status_code == 304:
+            _not_modified += 1
+        description = "{method} {path}{query}".format(
+            method=method, path=path or "/", query="?" + url.query if url.query else ""
+        )
+        if len(_slowest) < SLOWEST_COUNT:
+            heapq.heappush(_slowest, (elapsed, description))
+        else:
+            heapq.heappushpop(_slowest, (elapsed, description))
+
+
+def _wrap_setting(function):
+    def wrapper(name, *args, **kwargs):
+        start = time.perf_counter()
+        value = function(name, *args, **kwargs)
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _add(_settings, name, elapsed)
+        return value
+
+    wrapper.__wrapped__ = function
+    return wrapper
+
+
+def _replace(name, function, wrapper):
+    """Replaces ``function`` with ``wrapper`` in every loaded module that
+    imported it, modules loaded later import the wrapper."""
+    for module in list(sys.modules.values()):
+        if getattr(module, name, None) is function:
+            setattr(module, name, wrapper)
+
+
+def enable(profile_path=None):
+    """Starts counting and timing requests to openHAB and reads of
+    ``configuration.py``. If ``profile_path`` is given, all calls are
+    profiled with ``cProfile`` and written there by ``report``."""
+    global _enabled, _start, _profile, _cache_hits
+    if _enabled:
+        return
+    _enabled = True
+    _start = time.perf_counter()
+    _cache_hits = rest_utils.get_cache_hits()
+    rest_utils.add_response_hook(_on_response)
+    _replace(
+        "get_conf_value", utils.get_conf_value, _wrap_setting(utils.get_conf_value)
+    )
+    if profile_path:
+        import cProfile
+
+        _profile = (cProfile.Profile(), profile_path)
+        _profile[0].enable()
+
+
+def is_enabled():
+    return _enabled
+
+
+def get_stats():
+    """Returns a dict with the requests by endpoint, the configuration
+    settings read by name, the slowest requests, slowest first, the number
+    of requests answered with 304 Not Modified and the number of responses
+    reused from the cache without a request."""
+    with _lock:
+        return {
+            "requests": {key: dict(_requests[key]) for key in _requests},
+            "settings": {key: dict(_settings[key]) for key in _settings},
+            "slowest": sorted(_slowest, reverse=True),
+            "not_modified": _not_modified,
+            "cache_hits": rest_utils.get_cache_hits() - _cache_hits,
+        }
+
+
+def report():
+    """Shows the time spent in requests and reading settings and writes the
+    ``cProfile`` dump. Output goes to stderr so it doesn't mix with the
+    output of commands."""
+    if not _enabled:
+        return
+    if _profile is not None:
+        _profile[0].disable()
+        _profile[0].dump_stats(_profile[1])
+    stats = get_stats()
+    total = time.perf_counter() - _start
+
+    def _sum(section, key):
+        return sum([entry[key] for entry in stats[section].values()])
+
+    echo("", err=True)
+    echo(
+        "Profile: {total:.2f}s total, {requests} requests took {request_time:.2f}s "
+        "({not_modified} not modified, {cache_hits} more answered from the cache), "
+        "{settings} settings read in {setting_time:.2f}s".format(
+            total=total,
+            requests=_sum("requests", "count"),
+            request_time=_sum("requests", "time"),
+            not_modified=stats["not_modified"],
+            cache_hits=stats["cache_hits"],
+            settings=_sum("settings", "count"),
+            setting_time=_sum("settings", "time"),
+        ),
+        err=True,
+    )
+    if stats["requests"]:
+        echo(
+            "  {:>6s} {:>12s} {:>10s} {:>9s}  Endpoint".format(
+                "Calls", "Bytes", "Total", "Average"
+            ),
+            err=True,
+        )
+        for key in sorted(
+            stats["requests"], key=lambda key: stats["requests"][key]["time"]
+        )[::-1]:
+            entry = stats["requests"][key]
+            echo(
+                "  {count:6d} {size:>12s} {time:8.0f}ms {average:7.1f}ms  {key}".format(
+                    count=entry["count"],
+                    size="{:,}".format(entry["bytes"]),
+                    time=entry["time"] * 1000,
+                    average=entry["time"] * 1000 / entry["count"],
+                    key=key,
+                ),
+                err=True,
+            )
+    if stats["settings"]:
+        echo("  Settings read:", err=True)
+        for key in sorted(
+            stats["settings"], key=lambda key: stats["settings"][key]["time"]
+        )[::-1]:
+            entry = stats["settings"][key]
+            echo(
+                "  {count:6d} {time:21.1f}ms {average:7.3f}ms  {key}".format(
+                    count=entry["count"],
+                    time=entry["time"] * 1000,
+                    average=entry["time"] * 1000 / entry["count"],
+                    key=key,
+                ),
+                err=True,
+            )
+    if stats["slowest"]:
+        echo("  Slowest requests:", err=True)
+        for elapsed, description in stats["slowest"]:
+            echo(
+                "  {time:8.0f}ms  {description}".format(
+                    time=elapsed * 1000, description=description
+                ),
+                err=True,
+            )
+    if _profile is not None:
+        echo("  cProfile stats written to '{}'".format(_profile[1]), err=True)
@@ -27,6 +27,7 @@ def checkbox(message: Text,
              style: Optional[Style] = None,
              use_pointer: bool = True,
              pointed_at: int = None,
+             max_height: Optional[int] = None,
              **kwargs: Any) -> Question:
     """Ask the user to select from a list of items.
 
@@ -55,6 +56,10 @@ def checkbox(message: Text,
 
         pointed_at: Index of the choice the cursor should start at.
 
+        max_height: Maximum number of choices shown at once. Longer lists
+                    scroll with the cursor and only the visible rows are
+                    rendered.
+
     Returns:
         Question: Question instance, ready to be prompted (using `.ask()`).
     """
@@ -63,7 +68,8 @@ def checkbox(message: Text,
 
     ic = InquirerControl(choices, default,
                          use_pointer=use_pointer,
-                         pointed_at=pointed_at)
+                         pointed_at=pointed_at,
+                         max_height=max_height)
 
     def get_prompt_tokens():
         tokens = []
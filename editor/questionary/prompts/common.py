@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import inspect
+from bisect import bisect_left
 from prompt_toolkit import PromptSession
 from prompt_toolkit.filters import IsDone, Always
 from prompt_toolkit.layout import (
@@ -99,12 +100,20 @@ class InquirerControl(FormattedTextControl):
                  use_shortcuts: bool = False,
                  use_pointer: bool = True,
                  pointed_at: int = None,
+                 max_height: Optional[int] = None,
                  **kwargs):
 
         self.use_indicator = use_indicator
         self.use_shortcuts = use_shortcuts
         self.use_pointer = use_pointer
         self.default = default
+        self.max_height = max_height
+        self.scroll_top = 0
+        self.search_text = ''
+        # stack of filtered choice indexes, one entry per search character,
+        # so typing narrows the previous result and backspace pops it
+        self._search_results = []
+        self._search_index = []
 
         self.pointed_at = pointed_at if pointed_at is not None and pointed_at < (len(choices)) else None
         self.is_answered = False
@@ -163,10 +172,73 @@ class InquirerControl(FormattedTextControl):
 
             self.choices.append(choice)
 
+        self._search_index = [
+            None if isinstance(c, Separator) or c.disabled
+            else _get_title_text(c.title).lower()
+            for c in self.choices]
+
     @property
     def choice_count(self):
         return len(self.choices)
 
+    def get_visible_indexes(self):
+        """Indexes of the choices matching the current search."""
+        if self._search_results:
+            return self._search_results[-1]
+        return range(self.choice_count)
+
+    def has_matches(self):
+        return len(self.get_visible_indexes()) > 0
+
+    def search_append(self, text: Text) -> None:
+        """Narrow the choices to titles containing the search text."""
+        self.search_text += text.lower()
+        self._search_results.append([
+            i for i in self.get_visible_indexes()
+            if self._search_index[i] is not None and
+            self.search_text in self._search_index[i]])
+        self._point_at_visible()
+
+    def search_backspace(self) -> None:
+        if self.search_text:
+            self.search_text = self.search_text[:-1]
+            self._search_results.pop()
+            self._point_at_visible()
+
+    def search_clear(self) -> None:
+        if self.search_text:
+            self.search_text = ''
+            self._search_results = []
+            self._point_at_visible()
+
+    def _point_at_visible(self):
+        visible = self.get_visible_indexes()
+        if not visible:
+            return
+        position = min(bisect_left(visible, self.pointed_at), len(visible) - 1)
+        self.pointed_at = visible[position]
+        if not self.is_selection_valid():
+            self.select_next()
+            while not self.is_selection_valid():
+                self.select_next()
+
+    def _get_viewport(self, visible):
+        """Return the range of `visible` positions that should be drawn,
+        scrolled so the pointer stays on screen."""
+        count = len(visible)
+        if self.max_height is None or count <= self.max_height:
+            self.scroll_top = 0
+            return 0, count
+
+        height = self.max_height
+        position = min(bisect_left(visible, self.pointed_at), count - 1)
+        if position < self.scroll_top:
+            self.scroll_top = position
+        elif position >= self.scroll_top + height:
+            self.scroll_top = position - height + 1
+        self.scroll_top = max(0, min(self.scroll_top, count - height))
+        return self.scroll_top, self.scroll_top + height
+
     def _get_choice_tokens(self):
         tokens = []
 
@@ -240,9 +312,23 @@ class InquirerControl(FormattedTextControl):
 
             tokens.append(("", "\n"))
 
-        # prepare the select choices
-        for i, c in enumerate(self.choices):
-            append(i, c)
+        # prepare the select choices, only tokenizing the rows on screen
+        visible = self.get_visible_indexes()
+        first, last = self._get_viewport(visible)
+        for position in range(first, last):
+            i = visible[position]
+            append(i, self.choices[i])
+
+        if not visible:
+            tokens.append(("class:disabled",
+                           "   No matches for '{}'".format(
+                               self.search_text)))
+            tokens.append(("", "\n"))
+        elif last - first < len(visible):
+            tokens.append(("class:instruction",
+                           "   ({}-{} of {})".format(
+                               first + 1, last, len(visible))))
+            tokens.append(("", "\n"))
 
         if self.use_shortcuts:
             tokens.append(("class:text",
@@ -264,10 +350,26 @@ class InquirerControl(FormattedTextControl):
                 not self.is_selection_a_separator())
 
     def select_previous(self):
-        self.pointed_at = (self.pointed_at - 1) % self.choice_count
+        if self._search_results:
+            self._select_visible(-1)
+        else:
+            self.pointed_at = (self.pointed_at - 1) % self.choice_count
 
     def select_next(self):
-        self.pointed_at = (self.pointed_at + 1) % self.choice_count
+        if self._search_results:
+            self._select_visible(1)
+        else:
+            self.pointed_at = (self.pointed_at + 1) % self.choice_count
+
+    def _select_visible(self, step):
+        visible = self._search_results[-1]
+        if visible:
+            position = bisect_left(visible, self.pointed_at)
+            if position < len(visible) and visible[position] == self.pointed_at:
+                position += step
+            elif step < 0:
+                position -= 1
+            self.pointed_at = visible[position % len(visible)]
 
     def get_pointed_at(self):
         return self.choices[self.pointed_at]
@@ -280,6 +382,12 @@ class InquirerControl(FormattedTextControl):
                     c.value in self.selected_options)]
 
 
+def _get_title_text(title: Union[Text, List[Tuple[Text, Text]]]) -> Text:
+    if isinstance(title, list):
+        return "".join([token[1] for token in title])
+    return title
+
+
 def build_validator(validate: Any) -> Optional[Validator]:
     if validate:
         if inspect.isclass(validate) and issubclass(validate, Validator):
@@ -31,6 +31,8 @@ def select(message: Text,
            use_indicator: bool = False,
            use_pointer: bool = True,
            pointed_at: int = None,
+           max_height: Optional[int] = None,
+           use_search: bool = False,
            **kwargs: Any) -> Question:
     """Prompt the user to select one item from the list of choices.
 
@@ -64,6 +66,14 @@ def select(message: Text,
                      highlighted element.
 
         pointed_at: Index of the choice the cursor should start at.
+
+        max_height: Maximum number of choices shown at once. Longer lists
+                    scroll with the cursor and only the visible rows are
+                    rendered.
+
+        use_search: Allow the user to filter the choices by typing part of
+                    their title. Backspace removes the last character and
+                    escape clears the filter. Disables the `j` and `k` keys.
     Returns:
         Question: Question instance, ready to be prompted (using `.ask()`).
     """
@@ -84,7 +94,8 @@ def select(message: Text,
                          use_indicator=use_indicator,
                          use_shortcuts=use_shortcuts,
                          use_pointer=use_pointer,
-                         pointed_at=pointed_at)
+                         pointed_at=pointed_at,
+                         max_height=max_height)
 
     def get_prompt_tokens():
         # noinspection PyListCreation
@@ -101,6 +112,12 @@ def select(message: Text,
         else:
             if use_shortcuts:
                 tokens.append(("class:instruction", ' (Use shortcuts)'))
+            elif ic.search_text:
+                tokens.append(("class:instruction",
+                               ' (Filter: {})'.format(ic.search_text)))
+            elif use_search:
+                tokens.append(("class:instruction",
+                               ' (Use arrow keys or type to filter)'))
             else:
                 tokens.append(("class:instruction", ' (Use arrow keys)'))
 
@@ -131,29 +148,47 @@ def select(message: Text,
 
             _reg_binding(i, c.shortcut_key)
     else:
-        @bindings.add(Keys.Down, eager=True)
-        @bindings.add("j", eager=True)
         def move_cursor_down(event):
             ic.select_next()
             while not ic.is_selection_valid():
                 ic.select_next()
 
-        @bindings.add(Keys.Up, eager=True)
-        @bindings.add("k", eager=True)
         def move_cursor_up(event):
             ic.select_previous()
             while not ic.is_selection_valid():
                 ic.select_previous()
 
+        bindings.add(Keys.Down, eager=True)(move_cursor_down)
+        bindings.add(Keys.Up, eager=True)(move_cursor_up)
+        if not use_search:
+            bindings.add("j", eager=True)(move_cursor_down)
+            bindings.add("k", eager=True)(move_cursor_up)
+
     @bindings.add(Keys.ControlM, eager=True)
     def set_answer(event):
+        if not ic.has_matches():
+            return
         ic.is_answered = True
         event.app.exit(result=ic.get_pointed_at().value)
 
-    @bindings.add(Keys.Any)
-    def other(event):
-        """Disallow inserting other text. """
-        pass
+    if use_search and not use_shortcuts:
+        @bindings.add(Keys.Backspace, eager=True)
+        def search_backspace(event):
+            ic.search_backspace()
+
+        @bindings.add(Keys.Escape, eager=True)
+        def search_clear(event):
+            ic.search_clear()
+
+        @bindings.add(Keys.Any)
+        def search_append(event):
+            if event.data.isprintable():
+                ic.search_append(event.data)
+    else:
+        @bindings.add(Keys.Any)
+        def other(event):
+            """Disallow inserting other text. """
+            pass
 
     return Question(Application(
         layout=layout,
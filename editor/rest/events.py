@@ -0,0 +1,175 @@
+"""
+REST Based Metadata Editor - Event Stream
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json, threading
+from rest import index
+from rest.utils import get_session, get_timeout, invalidate_cache
+
+__all__ = ["start", "stop", "is_running", "handle_event"]
+
+# openHAB 2 publishes events under 'smarthome/', openHAB 3 under 'openhab/'
+TOPICS = "smarthome/items/*,openhab/items/*,openhab/metadata/*"
+STATE_EVENTS = ["ItemStateEvent", "ItemStateChangedEvent"]
+RECONNECT_DELAY = 1
+RECONNECT_DELAY_MAX = 30
+
+_lock = threading.Lock()
+_thread = None
+_stop = None
+
+
+def _parse_payload(payload):
+    try:
+        return json.loads(payload) if isinstance(payload, str) else payload
+    except ValueError:
+        return None
+
+
+def handle_event(event):
+    """Applies an openHAB item or metadata event to the index.
+
+    Returns ``True`` if the event was applied.
+    """
+    topic = event.get("topic", "").split("/")
+    event_type = event.get("type", "")
+    payload = _parse_payload(event.get("payload", None))
+    if len(topic) < 4 or payload is None:
+        return False
+
+    if event_type.startswith("Metadata"):
+        # topic contains the metadata UID, '{namespace}:{item name}'
+        uids = [part for part in topic if ":" in part]
+        if not uids:
+            return False
+        namespace, item_name = uids[0].split(":", 1)
+        if event_type == "MetadataRemovedEvent":
+            index.remove_metadata(item_name, namespace)
+        elif event_type in ["MetadataAddedEvent", "MetadataUpdatedEvent"]:
+            # updated payload is [new metadata, old metadata]
+            metadata = payload[0] if isinstance(payload, list) else payload
+            index.update_metadata(
+                item_name,
+                namespace,
+                metadata.get("value", None),
+                metadata.get("configuration", metadata.get("config", {})),
+            )
+        else:
+            return False
+        return True
+
+    elif topic[1] == "items":
+        item_name = topic[2]
+        if event_type == "ItemAddedEvent":
+            index.update_item(payload)
+        elif event_type == "ItemUpdatedEvent":
+            # payload is [new item, old item]
+            index.update_item(payload[0] if isinstance(payload, list) else payload)
+        elif event_type == "ItemRemovedEvent":
+            index.remove_item(item_name)
+        elif event_type in STATE_EVENTS:
+            index.update_state(item_name, payload.get("value", None))
+        else:
+            return False
+        return True
+
+    return False
+
+
+def _listen(host, stop_event):
+    delay = RECONNECT_DELAY
+    while not stop_event.is_set():
+        try:
+            resp = get_session().get(
+                "http://{host}/rest/events".format(host=host),
+                params={"topics": TOPICS},
+                headers={"Accept": "text/event-stream"},
+                stream=True,
+                timeout=(get_timeout()[0], None),
+            )
+            delay = RECONNECT_DELAY
+            data = []
+            # read chunks as they arrive instead of waiting to fill a buffer
+            for line in resp.iter_lines(chunk_size=None, decode_unicode=True):
+                if stop_event.is_set():
+                    break
+                elif line is None:
+                    continue
+                elif line.startswith("data:"):
+                    data.append(line[5:].strip())
+                elif not line and data:
+                    event = _parse_payload("\n".join(data))
+                    data = []
+                    # states are read from the index, only changes to items
+                    # or metadata make cached responses stale
+                    if (
+                        isinstance(event, dict)
+                        and handle_event(event)
+                        and event.get("type", "") not in STATE_EVENTS
+                    ):
+                        invalidate_cache(host)
+            resp.close()
+        except Exception:
+            pass
+        if not stop_event.is_set():
+            # connection lost, anything could have changed in the meantime
+            stop_event.wait(delay)
+            delay = min(delay * 2, RECONNECT_DELAY_MAX)
+            if not stop_event.is_set():
+                invalidate_cache(host)
+                index.load(host, index.get_namespace(), quiet=True)
+
+
+def start(host):
+    """Starts listening for item and metadata events from openHAB in the
+    background and applies them to the index."""
+    global _thread, _stop
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _stop = threading.Event()
+        _thread = threading.Thread(
+            target=_listen, args=(host, _stop), name="Eos Editor Events"
+        )
+        _thread.daemon = True
+        _thread.start()
+
+
+def stop():
+    """Stops listening for events.
+
+    The listener thread exits when the next event arrives, events received
+    after this are ignored.
+    """
+    global _thread, _stop
+    with _lock:
+        stop_event = _stop
+        _thread, _stop = None, None
+    if stop_event is not None:
+        stop_event.set()
+
+
+def is_running():
+    return _thread is not None and _thread.is_alive()
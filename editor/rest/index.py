@@ -0,0 +1,273 @@
+"""
+REST Based Metadata Editor - Item Index
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import collections, copy, json, threading
+from click import echo
+from rest.utils import rest_get
+
+__all__ = [
+    "load",
+    "load_items",
+    "is_loaded",
+    "clear",
+    "get_item",
+    "get_item_fields",
+    "get_metadata",
+    "get_namespace",
+    "get_generation",
+    "get_changed_items",
+    "get_group_names",
+    "update_item",
+    "update_state",
+    "remove_item",
+    "update_metadata",
+    "remove_metadata",
+]
+
+# Items are fetched once with all their metadata in ``_namespace``. Lookups
+# are served from here instead of requesting each item, and successful writes
+# (and events from openHAB when watching) are applied here too so the index
+# stays current while editing. ``_generation`` changes with every update to an
+# item or its metadata, and the last ``CHANGE_LOG_SIZE`` updates are kept in
+# ``_changes`` with the name of the item they changed (``None`` if they changed
+# all items). States change far more often and are updated in place without
+# changing ``_generation``, nothing built from the index depends on them.
+CHANGE_LOG_SIZE = 1000
+_lock = threading.RLock()
+_items = None
+_members = {}
+_namespace = None
+_generation = 0
+_changes = collections.deque(maxlen=CHANGE_LOG_SIZE)
+
+
+def _changed(item_name=None):
+    # must be called with _lock held
+    global _generation
+    _generation += 1
+    _changes.append((_generation, item_name))
+
+
+def _strip(item):
+    # member entries do not include their own members, same as the REST API
+    return {key: item[key] for key in item if key != "members"}
+
+
+def _rebuild_members():
+    # must be called with _lock held
+    _members.clear()
+    for name in _items:
+        for group_name in _items[name].get("groupNames", []):
+            _members.setdefault(group_name, []).append(name)
+
+
+def load(host, namespace, quiet=False):
+    """Fetches all items with their ``namespace`` metadata.
+
+    Returns ``True`` if the index was loaded, the existing index is kept if
+    it fails.
+    """
+    if not quiet:
+        echo("Loading items...", nl=False)
+    resp = rest_get(
+        host,
+        "items",
+        "metadata={namespace}&recursive=false".format(namespace=namespace),
+    )
+    if not resp or resp.status_code != 200:
+        if not quiet:
+            echo("Failed")
+        return False
+    load_items(json.loads(resp.text), namespace)
+    if not quiet:
+        echo("OK")
+    return True
+
+
+def load_items(items, namespace):
+    """Replaces the index with ``items``, a list of items like the REST API
+    returns with their ``namespace`` metadata. The index keeps the item
+    dicts, they should not be used by the caller afterwards."""
+    global _items, _namespace
+    with _lock:
+        _items = {item["name"]: item for item in items}
+        _namespace = namespace
+        _rebuild_members()
+        _changed()
+
+
+def is_loaded(namespace=None):
+    """Returns ``True`` if the index is loaded, and if ``namespace`` is given
+    that it holds metadata in that namespace."""
+    return _items is not None and (namespace is None or namespace == _namespace)
+
+
+def clear():
+    global _items, _namespace
+    with _lock:
+        _items = None
+        _namespace = None
+        _members.clear()
+        _changed()
+
+
+def get_namespace():
+    """Returns the metadata namespace held in the index."""
+    return _namespace
+
+
+def get_generation():
+    """Returns a number that changes every time an item or its metadata is
+    updated in the index. State updates don't change it."""
+    return _generation
+
+
+def get_changed_items(generation):
+    """Returns the names of the items that changed since ``generation``, or
+    ``None`` if they are not known because the index was loaded again or too
+    many items changed."""
+    with _lock:
+        if generation == _generation:
+            return set()
+        elif not _changes or _changes[0][0] > generation + 1:
+            return None
+        names = set()
+        for changed_generation, item_name in _changes:
+            if changed_generation <= generation:
+                continue
+            elif item_name is None:
+                return None
+            names.add(item_name)
+        return names
+
+
+def get_group_names(item_name):
+    """Returns the names of the groups ``item_name`` is a member of."""
+    with _lock:
+        item = (_items or {}).get(item_name, None)
+        return list(item.get("groupNames", [])) if item is not None else []
+
+
+def get_item(name):
+    """Returns a copy of item ``name`` with its members, like
+    ``GET items/{name}``, or ``None`` if it does not exist."""
+    with _lock:
+        item = _items.get(name, None)
+        if item is None:
+            return None
+        item = copy.deepcopy(item)
+        if name in _members or item.get("type", "").startswith("Group"):
+            item["members"] = [
+                copy.deepcopy(_strip(_items[member]))
+                for member in _members.get(name, [])
+            ]
+        return item
+
+
+def get_item_fields(keys):
+    """Returns a list with a dict for every item containing only ``keys``,
+    without members or metadata. Returns ``[]`` if the index is not loaded."""
+    with _lock:
+        if _items is None:
+            return []
+        return [
+            {key: copy.deepcopy(item[key]) for key in keys if key in item}
+            for item in _items.values()
+        ]
+
+
+def get_metadata(item_name, namespace):
+    """Returns a copy of the unparsed ``namespace`` metadata for
+    ``item_name``, ``{}`` if the item doesn't have any or doesn't exist.
+
+    Returns ``None`` if ``namespace`` is not indexed.
+    """
+    with _lock:
+        if _items is None or namespace != _namespace:
+            return None
+        item = _items.get(item_name, None)
+        if item is None:
+            return {}
+        return copy.deepcopy(item.get("metadata", {}).get(namespace, {}))
+
+
+def update_item(item):
+    """Adds or replaces ``item`` after it was saved to openHAB."""
+    with _lock:
+        if _items is None:
+            return
+        item = _strip(copy.deepcopy(item))
+        existing = _items.get(item["name"], None)
+        if existing is not None:
+            for key in ["metadata", "state"]:
+                if key in existing:
+                    item.setdefault(key, existing[key])
+        _items[item["name"]] = item
+        if existing is None or existing.get("groupNames", []) != item.get(
+            "groupNames", []
+        ):
+            _rebuild_members()
+        _changed(item["name"])
+
+
+def update_state(item_name, state):
+    """Sets the state of ``item_name``, without changing the generation."""
+    with _lock:
+        if _items is None or item_name not in _items:
+            return
+        _items[item_name]["state"] = state
+
+
+def remove_item(item_name):
+    """Removes ``item_name`` after it was removed from openHAB."""
+    with _lock:
+        if _items is None or _items.pop(item_name, None) is None:
+            return
+        _rebuild_members()
+        _changed(item_name)
+
+
+def update_metadata(item_name, namespace, value, configuration):
+    """Sets ``namespace`` metadata for ``item_name`` after it was saved to
+    openHAB."""
+    with _lock:
+        if _items is None or namespace != _namespace or item_name not in _items:
+            return
+        metadata = {"value": value}
+        if configuration:
+            metadata["config"] = copy.deepcopy(configuration)
+        _items[item_name].setdefault("metadata", {})[namespace] = metadata
+        _changed(item_name)
+
+
+def remove_metadata(item_name, namespace):
+    """Removes ``namespace`` metadata for ``item_name`` after it was removed
+    from openHAB."""
+    with _lock:
+        if _items is None or namespace != _namespace or item_name not in _items:
+            return
+        _items[item_name].get("metadata", {}).pop(namespace, None)
+        _changed(item_name)
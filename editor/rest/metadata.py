@@ -24,28 +24,56 @@ REST Based Metadata Editor - Metadata
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import json
+import json, threading
 from ast import literal_eval
-from rest.utils import rest_get, rest_put, rest_delete
+from rest.utils import rest_get, rest_put, rest_delete, map_concurrent
+from rest import index, pending
 
 
-def get_metadata(item_name, namespace, host):
-    """Fetches metadata namespace for item.
+_lock = threading.Lock()
+_saved_requests = 0
 
-    Returns ``{}`` if item or namespace don't exist.
-    """
 
-    def parse(data):
-        for key in data:
+def _count_saved(count):
+    global _saved_requests
+    with _lock:
+        _saved_requests += count
+
+
+def get_saved_requests():
+    """Returns the number of requests that did not need to be sent to
+    openHAB when saving metadata."""
+    return _saved_requests
+
+
+def parse_metadata(data):
+    """Converts the values in ``data``, metadata like the REST API returns
+    it, to Python types in place."""
+    for key in data:
+        try:
+            data[key] = json.loads(data[key])
+            parse_metadata(data[key])
+        except:
             try:
-                data[key] = json.loads(data[key])
-                parse(data[key])
+                data[key] = literal_eval(str(data[key]))
+                parse_metadata(data[key])
             except:
-                try:
-                    data[key] = literal_eval(str(data[key]))
-                    parse(data[key])
-                except:
-                    pass
+                pass
+
+
+def get_metadata(item_name, namespace, host, raw=False):
+    """Fetches metadata namespace for item.
+
+    Values are parsed with ``parse_metadata`` unless ``raw`` is ``True``.
+    Returns ``{}`` if item or namespace don't exist.
+    """
+    metadata = pending.get_metadata(item_name, namespace)
+    if metadata is None:
+        metadata = index.get_metadata(item_name, namespace)
+    if metadata is not None:
+        if not raw:
+            parse_metadata(metadata)
+        return metadata
 
     resp = rest_get(
         host,
@@ -55,12 +83,25 @@ def get_metadata(item_name, namespace, host):
     if resp:
         resp_json = json.loads(resp.text)
         metadata = resp_json.get("metadata", {}).get(namespace, {})
-        parse(metadata)
+        if not raw:
+            parse_metadata(metadata)
         return metadata
     else:
         return {}
 
 
+def get_metadata_many(item_names, namespace, host):
+    """Fetches metadata namespace for several items, requests are made
+    concurrently if the items are not in the index.
+
+    Returns a list in the same order as ``item_names``.
+    """
+    item_names = list(item_names)
+    if index.is_loaded(namespace):
+        return [get_metadata(name, namespace, host) for name in item_names]
+    return map_concurrent(lambda name: get_metadata(name, namespace, host), item_names)
+
+
 def set_metadata(
     item_name, namespace, host, configuration, value=None, overwrite=False
 ):
@@ -83,9 +124,15 @@ def set_metadata(
         overwrite (bool): if ``True``, existing namespace data will be
             discarded
     """
+    # PUT replaces the whole namespace, so overwriting doesn't need a DELETE
+    # or the existing metadata, and merging can use the index if it is loaded.
+    # The requests saved are only counted if the save succeeds.
     if overwrite:
-        remove_metadata(item_name, namespace, host)  # may not need for REST
-    metadata = get_metadata(item_name, namespace, host)
+        saved = 2
+        metadata = {}
+    else:
+        saved = 1 if index.is_loaded(namespace) else 0
+        metadata = get_metadata(item_name, namespace, host)
     if not metadata or overwrite:
         # log.debug("set_metadata: adding or overwriting metadata namespace with [value: {}, configuration: {}]: Item [{}], namespace [{}]".format(value, configuration, item_name, namespace))
         resp = rest_put(
@@ -95,8 +142,10 @@ def set_metadata(
             ),
             {"value": value, "config": configuration},
         )
-        if resp:
-            return resp if resp.status_code in [200, 201] else None
+        if resp and resp.status_code in [200, 201]:
+            _count_saved(saved)
+            index.update_metadata(item_name, namespace, value, configuration)
+            return resp
         else:
             return None  # raise error?
     else:
@@ -112,8 +161,10 @@ def set_metadata(
             ),
             {"value": value, "config": new_configuration},
         )
-        if resp:
-            return resp if resp.status_code in [200, 201] else None
+        if resp and resp.status_code in [200, 201]:
+            _count_saved(saved)
+            index.update_metadata(item_name, namespace, value, new_configuration)
+            return resp
         else:
             return None  # raise error?
 
@@ -126,8 +177,9 @@ def remove_metadata(item_name, namespace, host):
                 item_name=item_name, namespace=namespace
             ),
         )
-        if resp:
-            return True if resp.status_code == 200 else False
+        if resp and resp.status_code == 200:
+            index.remove_metadata(item_name, namespace)
+            return True
         else:
             return False
 
@@ -139,3 +191,14 @@ def get_value(item_name, namespace, host):
     """
     metadata = get_metadata(item_name, namespace, host)
     return metadata.get("value", None)
+
+
+def get_value_many(item_names, namespace, host):
+    """Fetches metadata namespace values for several items.
+
+    Returns a list in the same order as ``item_names``.
+    """
+    return [
+        metadata.get("value", None)
+        for metadata in get_metadata_many(item_names, namespace, host)
+    ]
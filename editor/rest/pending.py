@@ -0,0 +1,246 @@
+"""
+REST Based Metadata Editor - Pending Changes
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import copy, json, os, threading
+from click import echo
+from rest.utils import map_concurrent
+
+__all__ = [
+    "enable",
+    "is_enabled",
+    "queue_metadata",
+    "queue_item",
+    "get_metadata",
+    "get_item",
+    "is_pending",
+    "count",
+    "set_changeset",
+    "read_changeset",
+    "write_changeset",
+    "flush",
+]
+
+CHANGESET_VERSION = 1
+
+# When enabled, metadata and item saves are kept here instead of being sent
+# to openHAB immediately, and sent together when ``flush`` is called. Reads
+# of queued items return the queued data so the editor shows unsaved edits.
+_lock = threading.Lock()
+_enabled = False
+_metadata = {}
+_items = {}
+_changeset_path = None
+
+
+def enable(enabled=True):
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled():
+    return _enabled
+
+
+def queue_metadata(item_name, namespace, host, configuration, value=None):
+    """Queues ``namespace`` metadata to replace the existing metadata for
+    ``item_name``, any change already queued for it is replaced."""
+    with _lock:
+        _metadata[(item_name, namespace)] = {
+            "host": host,
+            "value": value,
+            "config": copy.deepcopy(configuration),
+        }
+
+
+def queue_item(item, host):
+    """Queues an item definition to be saved."""
+    item = copy.deepcopy(item)
+    item.pop("members", None)
+    with _lock:
+        _items[item["name"]] = {"host": host, "item": item}
+
+
+def get_metadata(item_name, namespace):
+    """Returns a copy of the queued ``namespace`` metadata for ``item_name``
+    or ``None`` if there is none."""
+    with _lock:
+        change = _metadata.get((item_name, namespace), None)
+        if change is None:
+            return None
+        return {"value": change["value"], "config": copy.deepcopy(change["config"])}
+
+
+def get_item(item):
+    """Returns ``item`` with any queued changes applied."""
+    with _lock:
+        change = _items.get(item["name"], None)
+        if change is None:
+            return item
+        queued = copy.deepcopy(change["item"])
+    if "members" in item:
+        queued["members"] = item["members"]
+    return queued
+
+
+def is_pending(item_name):
+    """Returns ``True`` if ``item_name`` has unsaved changes."""
+    with _lock:
+        return item_name in _items or any(key[0] == item_name for key in _metadata)
+
+
+def count():
+    """Returns the number of items with unsaved changes."""
+    with _lock:
+        return len(set(_items) | set([key[0] for key in _metadata]))
+
+
+def set_changeset(path):
+    """Records queued changes in the changeset file ``path`` instead of
+    sending them to openHAB. Changes already in the file are queued."""
+    global _changeset_path
+    _changeset_path = path
+    if os.path.isfile(path):
+        read_changeset(path)
+
+
+def read_changeset(path, host=None):
+    """Queues the changes in the changeset file ``path``.
+
+    Returns the number of items with changes.
+    """
+    with open(path, "r") as file:
+        changeset = json.load(file)
+    if changeset.get("version", None) != CHANGESET_VERSION:
+        raise ValueError("'{path}' is not an Eos changeset".format(path=path))
+    for change in changeset.get("metadata", []):
+        queue_metadata(
+            change["name"],
+            change["namespace"],
+            host,
+            change.get("config", {}),
+            value=change.get("value", None),
+        )
+    for item in changeset.get("items", []):
+        queue_item(item, host)
+    return len(
+        set([change["name"] for change in changeset.get("metadata", [])])
+        | set([item["name"] for item in changeset.get("items", [])])
+    )
+
+
+def write_changeset(path):
+    """Writes all queued changes to the changeset file ``path``."""
+    with _lock:
+        changeset = {
+            "version": CHANGESET_VERSION,
+            "metadata": [
+                {
+                    "name": key[0],
+                    "namespace": key[1],
+                    "value": _metadata[key]["value"],
+                    "config": _metadata[key]["config"],
+                }
+                for key in sorted(_metadata)
+            ],
+            "items": [_items[name]["item"] for name in sorted(_items)],
+        }
+    with open(path, "w") as file:
+        json.dump(changeset, file, indent=2)
+
+
+def flush(host=None):
+    """Sends all queued changes to openHAB concurrently, to ``host`` if given
+    otherwise the host they were queued for.
+
+    Changes that fail stay queued. Returns a dict of item names that failed
+    and the reason. If a changeset file is set the changes are written to it
+    instead and stay queued.
+    """
+    from rest.metadata import set_metadata
+    from rest.utils import update_item
+
+    with _lock:
+        metadata = dict(_metadata)
+        items = dict(_items)
+    if not metadata and not items:
+        return {}
+    elif _changeset_path is not None:
+        try:
+            write_changeset(_changeset_path)
+        except (IOError, OSError) as ex:
+            echo("ERROR: Failed to write changeset: {}".format(ex), err=True)
+            return {name: str(ex) for name in set(items) | set(k[0] for k in metadata)}
+        echo(
+            "Saved changes for {count} items to '{path}'".format(
+                count=count(), path=_changeset_path
+            )
+        )
+        return {}
+
+    def _send(kind, key, change):
+        try:
+            if kind == "metadata":
+                resp = set_metadata(
+                    key[0],
+                    key[1],
+                    host or change["host"],
+                    configuration=change["config"],
+                    value=change["value"],
+                    overwrite=True,
+                )
+            else:
+                resp = update_item(change["item"], host or change["host"])
+        except Exception as ex:
+            return str(ex)
+        if not resp:
+            return "openHAB did not accept the {}".format(
+                "metadata" if kind == "metadata" else "item"
+            )
+        with _lock:
+            # only remove if it wasn't queued again while sending
+            queue = _metadata if kind == "metadata" else _items
+            if queue.get(key, None) is change:
+                queue.pop(key)
+        return None
+
+    changes = [("metadata", key, metadata[key]) for key in metadata] + [
+        ("item", key, items[key]) for key in items
+    ]
+    echo("Saving {} changes...".format(len(changes)), nl=False)
+    results = map_concurrent(_send, *zip(*changes))
+    failed = {}
+    for (kind, key, change), error in zip(changes, results):
+        if error is not None:
+            failed[key[0] if kind == "metadata" else key] = error
+    echo("Failed" if failed else "OK")
+    for name in sorted(failed):
+        echo(
+            "ERROR: Failed to save '{name}': {error}".format(
+                name=name, error=failed[name]
+            ),
+            err=True,
+        )
+    return failed
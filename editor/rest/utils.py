@@ -26,23 +26,231 @@ REST Based Metadata Editor - Utilities
 
 import sys
 from click import echo, BadParameter
-import requests as http
 from urllib.parse import urlparse
-import json
+import json, threading, time
+from collections import OrderedDict
 
 if sys.version_info[0] < 3:  # Python 2.x
     str = basestring
 else:  # Python 3.x
     pass
 
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 30
+RETRIES = 3
+RETRY_BACKOFF = 0.3
+POOL_SIZE = 10
+MAX_WORKERS = 8
+# seconds to reuse a response that can't be revalidated with an ETag or
+# Last-Modified header, responses that can are revalidated on every request
+CACHE_TTL = 2
+# enough to keep a response for every item in a large Eos group tree
+CACHE_SIZE = 4096
+
+_session = None
+_lock = threading.Lock()
+_call_counts = {}
+_cache = OrderedDict()
+_cache_hits = 0
+_response_hooks = []
+
+
+def configure(
+    connect_timeout=None,
+    read_timeout=None,
+    retries=None,
+    retry_backoff=None,
+    pool_size=None,
+    max_workers=None,
+    cache_ttl=None,
+):
+    """Changes the HTTP connection settings, arguments that are ``None`` are
+    left unchanged. The session is recreated and the response cache cleared
+    on the next request."""
+    global CONNECT_TIMEOUT, READ_TIMEOUT, RETRIES, RETRY_BACKOFF, POOL_SIZE, MAX_WORKERS
+    global CACHE_TTL, _session
+    with _lock:
+        if connect_timeout is not None:
+            CONNECT_TIMEOUT = connect_timeout
+        if read_timeout is not None:
+            READ_TIMEOUT = read_timeout
+        if retries is not None:
+            RETRIES = retries
+        if retry_backoff is not None:
+            RETRY_BACKOFF = retry_backoff
+        if pool_size is not None:
+            POOL_SIZE = pool_size
+        if max_workers is not None:
+            MAX_WORKERS = max(1, max_workers)
+        if cache_ttl is not None:
+            CACHE_TTL = max(0, cache_ttl)
+        if _session is not None:
+            _session.close()
+        _session = None
+        _cache.clear()
+
+
+def get_session():
+    """Returns the shared ``requests.Session``, connections to openHAB are
+    pooled and kept alive between requests. Idempotent requests are retried
+    with backoff on connection errors and 502, 503 and 504 responses."""
+    global _session
+    with _lock:
+        if _session is None:
+            # requests takes a while to import, only load it when needed
+            import requests as http
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=RETRIES,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False,
+            )
+            # keep a connection for every worker making concurrent requests
+            pool_size = max(POOL_SIZE, MAX_WORKERS)
+            adapter = HTTPAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+            )
+            _session = http.Session()
+            _session.headers["Accept-Encoding"] = "gzip"
+            _session.hooks["response"].extend(_response_hooks)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def add_response_hook(hook):
+    """Calls ``hook`` with every response received from openHAB, like a
+    ``requests`` response hook. Hooks are kept when the session is
+    recreated."""
+    with _lock:
+        _response_hooks.append(hook)
+        if _session is not None:
+            _session.hooks["response"].append(hook)
+
+
+def get_timeout():
+    """Returns the ``(connect, read)`` timeout tuple for requests."""
+    return (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+
+def _count(method):
+    with _lock:
+        _call_counts[method] = _call_counts.get(method, 0) + 1
+
+
+def get_call_counts():
+    """Returns the number of requests sent to openHAB by method."""
+    with _lock:
+        return dict(_call_counts)
+
+
+def reset_call_counts():
+    with _lock:
+        _call_counts.clear()
+
+
+def get_cache_hits():
+    """Returns the number of GET requests answered from the response cache
+    without asking openHAB."""
+    return _cache_hits
+
+
+def map_concurrent(function, *iterables):
+    """Calls ``function`` with each set of arguments from ``iterables`` using
+    up to ``MAX_WORKERS`` threads.
+
+    Returns a list of the results in the same order as the arguments.
+    """
+    args = list(zip(*iterables))
+    if len(args) < 2 or MAX_WORKERS < 2:
+        return [function(*arg) for arg in args]
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(args))) as executor:
+        return list(executor.map(lambda arg: function(*arg), args))
+
+
+def _get_cached(url):
+    """Returns the cache entry for ``url`` and moves it to the end of the
+    cache so the least recently used entries are dropped first."""
+    with _lock:
+        entry = _cache.get(url, None)
+        if entry is not None:
+            _cache.move_to_end(url)
+        return entry
+
+
+def _set_cached(url, resp):
+    """Remembers a successful response for ``url`` with its validators"""
+    headers = {}
+    if resp.headers.get("ETag"):
+        headers["If-None-Match"] = resp.headers["ETag"]
+    if resp.headers.get("Last-Modified"):
+        headers["If-Modified-Since"] = resp.headers["Last-Modified"]
+    if not headers and CACHE_TTL <= 0:
+        return
+    resp.content  # read the body now so it can be returned again later
+    with _lock:
+        _cache[url] = {"response": resp, "headers": headers, "time": time.time()}
+        _cache.move_to_end(url)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def invalidate_cache(host=None):
+    """Drops cached responses that would be reused without asking openHAB,
+    for ``host`` or all hosts. Call after anything could have changed items
+    on the server, responses with validators are checked on every request."""
+    prefix = "http://{host}/".format(host=host) if host is not None else ""
+    with _lock:
+        for url in [
+            url
+            for url, entry in _cache.items()
+            if not entry["headers"] and url.startswith(prefix)
+        ]:
+            del _cache[url]
+
+
+def clear_cache():
+    """Drops all cached responses"""
+    with _lock:
+        _cache.clear()
+
 
 def rest_get(host, path, query=""):
+    """Sends a GET request, responses are cached by URL.
+
+    A cached response is revalidated with ``If-None-Match`` or
+    ``If-Modified-Since`` if openHAB sent an ``ETag`` or ``Last-Modified``
+    header and returned again if it has not changed, otherwise it is reused
+    for ``CACHE_TTL`` seconds without a request.
+    """
+    global _cache_hits
+    url = "http://{host}/rest/{path}?{query}".format(host=host, path=path, query=query)
+    entry = _get_cached(url)
+    if (
+        entry is not None
+        and not entry["headers"]
+        and time.time() - entry["time"] < CACHE_TTL
+    ):
+        with _lock:
+            _cache_hits += 1
+        return entry["response"]
     try:
-        resp = http.get(
-            "http://{host}/rest/{path}?{query}".format(
-                host=host, path=path, query=query
-            )
+        _count("GET")
+        resp = get_session().get(
+            url,
+            headers=entry["headers"] if entry is not None else None,
+            timeout=get_timeout(),
         )
+        if resp.status_code == 304 and entry is not None:
+            entry["time"] = time.time()
+            return entry["response"]
+        elif resp.status_code == 200:
+            _set_cached(url, resp)
         return resp
         # if resp.status_code == http.codes.ok:
         #    return resp
@@ -62,11 +270,14 @@ def rest_get(host, path, query=""):
 
 def rest_post(host, path, payload):
     try:
-        resp = http.post(
+        _count("POST")
+        resp = get_session().post(
             "http://{host}/rest/{path}".format(host=host, path=path),
             data=str(payload),
             headers={"Accept": "application/json", "Content-Type": "text/plain"},
+            timeout=get_timeout(),
         )
+        invalidate_cache(host)
         return resp
         # if resp.status_code == http.codes.ok:
         #    return resp
@@ -86,11 +297,14 @@ def rest_post(host, path, payload):
 
 def rest_put(host, path, payload):
     try:
-        resp = http.put(
+        _count("PUT")
+        resp = get_session().put(
             "http://{host}/rest/{path}".format(host=host, path=path),
             data=json.dumps(payload),
             headers={"Accept": "application/json", "Content-Type": "application/json"},
+            timeout=get_timeout(),
         )
+        invalidate_cache(host)
         return resp
         # if resp.status_code == http.codes.ok:
         #    return resp
@@ -110,7 +324,12 @@ def rest_put(host, path, payload):
 
 def rest_delete(host, path):
     try:
-        resp = http.delete("http://{host}/rest/{path}".format(host=host, path=path))
+        _count("DELETE")
+        resp = get_session().delete(
+            "http://{host}/rest/{path}".format(host=host, path=path),
+            timeout=get_timeout(),
+        )
+        invalidate_cache(host)
         return resp
         # if resp.status_code == http.codes.ok:
         #    return resp
@@ -128,6 +347,13 @@ def rest_delete(host, path):
         return False
 
 
+def get_status_description(status_code):
+    """Returns the name of an HTTP status code like 'Not found'"""
+    from requests import status_codes
+
+    return status_codes._codes[status_code][0].replace("_", " ").capitalize()
+
+
 def validate_hostname(ctz, param, value):
     """Validates openHAB hostname
 
@@ -151,27 +377,28 @@ def validate_hostname(ctz, param, value):
             "Hostname invalid, must be like 'hostname[:port]' or 'ip_address[:port]'"
         )
     try:
-        echo("Testing connection to openHAB...", nl=False)
-        resp = http.get("http://{host}/rest/".format(host=host))
+        echo("Testing connection to openHAB...", nl=False, err=True)
+        _count("GET")
+        resp = get_session().get(
+            "http://{host}/rest/".format(host=host), timeout=get_timeout()
+        )
     except Exception as ex:
-        echo("Failed")
+        echo("Failed", err=True)
         raise BadParameter(
             "Error while trying to connect to openHAB host '{host}': {error}".format(
                 host=host, error=str(ex).split(":")[-1:][0].strip("',)").strip()
             )
         )
-    if resp.status_code == http.codes.ok:
-        echo("OK")
+    if resp.status_code == 200:
+        echo("OK", err=True)
         return host
     else:
-        echo("Failed")
+        echo("Failed", err=True)
         raise BadParameter(
             "Error when connecting to '{host}': HTTP Response: {code} - {doc}".format(
                 host=host,
                 code=resp.status_code,
-                doc=http.status_codes._codes[resp.status_code][0]
-                .replace("_", " ")
-                .capitalize(),
+                doc=get_status_description(resp.status_code),
             )
         )
 
@@ -179,14 +406,19 @@ def validate_hostname(ctz, param, value):
 def validate_item(item_or_item_name, host, query=""):
     """Checks if item exists and fetches it if it does, returns ``None`` if
     item does not exist"""
-    if isinstance(item_or_item_name, str):
+    from rest import index, pending
+
+    if isinstance(item_or_item_name, str) and index.is_loaded():
+        item = index.get_item(item_or_item_name)
+        return pending.get_item(item) if item else None
+    elif isinstance(item_or_item_name, str):
         resp = rest_get(
             host, "items/{name}".format(name=item_or_item_name), query=query
         )
         if not resp:
             return None
-        elif resp.status_code == http.codes.ok:
-            return json.loads(resp.text)
+        elif resp.status_code == 200:
+            return pending.get_item(json.loads(resp.text))
         else:
             return None
     elif isinstance(item_or_item_name, dict):
@@ -197,9 +429,12 @@ def validate_item(item_or_item_name, host, query=""):
 
 
 def update_item(item, host):
+    from rest import index
+
     resp = rest_put(host, "items/{item_name}".format(item_name=item["name"]), item)
-    if resp:
+    if resp and resp.status_code in [200, 201]:
         # 200 means item created, should do a check?
-        return resp if resp.status_code == [200, 201] else None
+        index.update_item(item)
+        return resp
     else:
         return None  # raise error?
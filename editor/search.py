@@ -0,0 +1,216 @@
+"""
+Eos Lighting Metadata Editor - Item Search
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import heapq, re
+from bisect import bisect_left
+from collections import Counter
+from prompt_toolkit.completion import Completer, Completion
+
+from rest import index
+
+__all__ = ["build", "search", "get_entry", "ItemCompleter"]
+
+SEARCH_KEYS = ["name", "type", "label", "groupNames"]
+SEARCH_LIMIT = 20
+SEARCH_MIN_MATCH = 0.5
+
+# Trigram index of the items in ``rest.index``. Each entry is searched by its
+# name, label and group names, ``_trigrams`` maps every trigram to the set of
+# entry positions containing it. Rebuilt when items are added or removed or
+# their searched fields change, not for changes to their metadata.
+_entries = []
+_names = {}
+_name_prefixes = []
+_label_prefixes = []
+_trigrams = {}
+_generation = None
+
+
+def _normalize(text):
+    # words in item names are usually separated by "_", match them as spaces
+    return re.sub(r"[^0-9a-z]+", " ", text.lower()).strip()
+
+
+def _get_trigrams(text, pad=" "):
+    # the end of the query is not padded, so it matches as a prefix while typing
+    text = " {}{}".format(_normalize(text), pad)
+    return set([text[i : i + 3] for i in range(len(text) - 2)])
+
+
+def _make_entry(item):
+    return {
+        "name": item["name"],
+        "type": item.get("type", ""),
+        "label": item.get("label", ""),
+        "groupNames": item.get("groupNames", []),
+        "name_lower": item["name"].lower(),
+        "label_lower": item.get("label", "").lower(),
+    }
+
+
+def build():
+    """Builds the search index from the item index."""
+    global _entries, _names, _name_prefixes, _label_prefixes, _trigrams
+    global _generation
+    generation = index.get_generation()
+    # shorter names first, so a lower position is a better match in any tier
+    entries = sorted(
+        [_make_entry(item) for item in index.get_item_fields(SEARCH_KEYS)],
+        key=lambda entry: (len(entry["name"]), entry["name_lower"]),
+    )
+    trigrams = {}
+    for position, entry in enumerate(entries):
+        for text in [entry["name_lower"], entry["label_lower"]] + [
+            name.lower() for name in entry["groupNames"]
+        ]:
+            for trigram in _get_trigrams(text):
+                trigrams.setdefault(trigram, set()).add(position)
+    _entries = entries
+    _names = {entry["name"]: position for position, entry in enumerate(entries)}
+    _name_prefixes = sorted(
+        [(entry["name_lower"], position) for position, entry in enumerate(entries)]
+    )
+    _label_prefixes = sorted(
+        [
+            (entry["label_lower"], position)
+            for position, entry in enumerate(entries)
+            if entry["label_lower"]
+        ]
+    )
+    _trigrams = trigrams
+    _generation = generation
+
+
+def _is_changed(name):
+    # ``True`` if the searched fields of item ``name`` differ from its entry
+    item = index.get_item(name)
+    position = _names.get(name, None)
+    if item is None or position is None:
+        return item is not None or position is not None
+    return _make_entry(item) != _entries[position]
+
+
+def _ensure_built():
+    global _generation
+    generation = index.get_generation()
+    if _generation == generation:
+        return
+    changed = index.get_changed_items(_generation) if _generation is not None else None
+    if changed is None or any([_is_changed(name) for name in changed]):
+        build()
+    else:
+        _generation = generation
+
+
+def get_entry(name):
+    """Returns the search entry for item ``name``, or ``None`` if it is not
+    in the item index."""
+    _ensure_built()
+    position = _names.get(name, None)
+    return _entries[position] if position is not None else None
+
+
+def _get_prefixed(prefixes, query):
+    # positions of all entries in ``prefixes`` starting with ``query``, sorted
+    start = bisect_left(prefixes, (query,))
+    stop = bisect_left(prefixes, (query + "\uffff",))
+    return sorted([position for text, position in prefixes[start:stop]])
+
+
+def search(query, limit=SEARCH_LIMIT):
+    """Returns up to ``limit`` entries best matching ``query``, best first.
+
+    Matches are ranked by tier: names starting with ``query``, then names
+    and labels containing it, then entries containing all or at least half
+    of its trigrams in their name, label or group names. Shorter names rank
+    first within a tier. Queries shorter than 3 characters, or without any
+    trigram once normalized, only match name and label prefixes.
+    """
+    _ensure_built()
+    query = query.strip().lower()
+    if not query:
+        return []
+
+    results = []
+    seen = set()
+
+    def _add(positions):
+        for position in positions:
+            if len(results) >= limit:
+                return
+            elif position not in seen:
+                seen.add(position)
+                results.append(position)
+
+    _add(_get_prefixed(_name_prefixes, query))
+    postings = []
+    if len(query) >= 3:
+        postings = [
+            _trigrams.get(trigram, set()) for trigram in _get_trigrams(query, pad="")
+        ]
+    if not postings:
+        # short queries, or ones normalizing to less than a trigram like "a.."
+        _add(_get_prefixed(_label_prefixes, query))
+    elif len(results) < limit:
+        full = sorted(set.intersection(*postings))
+        _add(position for position in full if query in _entries[position]["name_lower"])
+        _add(
+            position for position in full if query in _entries[position]["label_lower"]
+        )
+        _add(full)
+        if len(results) < limit:
+            counts = Counter()
+            for posting in postings:
+                counts.update(posting)
+            required = max(1, int(round(len(postings) * SEARCH_MIN_MATCH)))
+            _add(
+                position
+                for matched, position in heapq.nsmallest(
+                    limit - len(results),
+                    [
+                        (-matched, position)
+                        for position, matched in counts.items()
+                        if required <= matched < len(postings)
+                    ],
+                )
+            )
+    return [_entries[position] for position in results]
+
+
+class ItemCompleter(Completer):
+    """Completes item names with the best search matches for the input."""
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor
+        for entry in search(text):
+            yield Completion(
+                entry["name"],
+                start_position=-len(text),
+                display_meta="{type}{label}".format(
+                    type=entry["type"],
+                    label=' "{}"'.format(entry["label"]) if entry["label"] else "",
+                ),
+            )
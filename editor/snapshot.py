@@ -0,0 +1,265 @@
+"""
+Eos Lighting Metadata Editor - Snapshots
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# The Eos Editor includes software from questionary (https://github.com/tmbo/questionary),
+# under the MIT License.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import sys
+
+if sys.version_info[0] < 3:  # Python 2.x
+    str = basestring
+else:  # Python 3.x
+    pass
+
+import os, copy, json
+
+from constants import *
+from utils import get_group_items, get_global_settings
+from rest.utils import validate_item, map_concurrent
+from rest.metadata import (
+    get_metadata,
+    parse_metadata,
+    set_metadata,
+    remove_metadata,
+)
+
+__all__ = [
+    "SNAPSHOT_VERSION",
+    "collect",
+    "get_missing_sources",
+    "read",
+    "write",
+    "diff",
+    "describe",
+    "apply",
+]
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_ITEM_KEYS = ["name", "type", "label", "category", "tags", "groupNames"]
+
+
+def _is_yaml(path):
+    return os.path.splitext(path)[1].lower() in [".yaml", ".yml"]
+
+
+def _get_yaml():
+    # PyYAML is optional and only needed for YAML files
+    try:
+        import yaml
+    except ImportError:
+        raise RuntimeError("PyYAML must be installed to use YAML files")
+    return yaml
+
+
+def _get_source_names(config):
+    # names of the level and motion source items used anywhere in ``config``
+    names = set()
+    for key in config:
+        if isinstance(config[key], dict):
+            names.update(_get_source_names(config[key]))
+        elif key in [META_KEY_LEVEL_SOURCE, META_KEY_MOTION_SOURCE] and isinstance(
+            config[key], str
+        ):
+            names.add(config[key])
+    return names
+
+
+def collect(master_group_name, host):
+    """Builds a snapshot of all items in the Eos group tree under
+    ``master_group_name`` and their Eos metadata, and the level and motion
+    source items they use.
+
+    Items and metadata are stored like the openHAB REST API returns them,
+    with only the fields needed to rebuild the tree and their state.
+    """
+    items = {}
+    groups = set()
+
+    def _add(item):
+        if item["name"] in items:
+            return
+        entry = {key: item[key] for key in SNAPSHOT_ITEM_KEYS if key in item}
+        if "state" in item:
+            entry["state"] = item["state"]
+        items[item["name"]] = entry
+
+    def _collect_group(group_name):
+        group = validate_item(group_name, host)
+        if group is None or group["name"] in groups:
+            return
+        groups.add(group["name"])
+        _add(group)
+        for member in group.get("members", []):
+            _add(member)
+        for child in get_group_items(group):
+            _collect_group(child["name"])
+
+    _collect_group(master_group_name)
+    names = sorted(items)
+    sources = _get_source_names(get_global_settings())
+    for name, metadata in zip(
+        names,
+        map_concurrent(
+            lambda name: get_metadata(name, META_NAME_EOS, host, raw=True), names
+        ),
+    ):
+        if metadata:
+            items[name]["metadata"] = {META_NAME_EOS: metadata}
+            config = copy.deepcopy(metadata.get("config", {}))
+            parse_metadata(config)
+            sources.update(_get_source_names(config))
+    sources = sorted(sources - set(items))
+    for source in map_concurrent(lambda name: validate_item(name, host), sources):
+        if source is not None:
+            _add(source)
+    names = sorted(items)
+    return {
+        "version": SNAPSHOT_VERSION,
+        "master_group": master_group_name,
+        "items": [items[name] for name in names],
+    }
+
+
+def get_missing_sources(snapshot):
+    """Returns the names of level and motion source items used by the Eos
+    metadata in ``snapshot`` that it doesn't include. Snapshots exported
+    by older versions of the editor don't include any."""
+    names = _get_source_names(get_global_settings())
+    for item in snapshot["items"]:
+        config = copy.deepcopy(
+            item.get("metadata", {}).get(META_NAME_EOS, {}).get("config", {})
+        )
+        parse_metadata(config)
+        names.update(_get_source_names(config))
+    return sorted(names - set([item["name"] for item in snapshot["items"]]))
+
+
+def write(snapshot, path):
+    """Writes ``snapshot`` to ``path`` as YAML if it ends with ``.yaml`` or
+    ``.yml``, otherwise as JSON."""
+    yaml = _get_yaml() if _is_yaml(path) else None
+    with open(path, "w") as file:
+        if yaml is not None:
+            yaml.safe_dump(snapshot, file, default_flow_style=False, sort_keys=False)
+        else:
+            json.dump(snapshot, file, indent=2)
+
+
+def read(path):
+    """Reads a snapshot written by ``write``."""
+    yaml = _get_yaml() if _is_yaml(path) else None
+    with open(path, "r") as file:
+        snapshot = yaml.safe_load(file) if yaml is not None else json.load(file)
+    if not isinstance(snapshot, dict) or not isinstance(
+        snapshot.get("items", None), list
+    ):
+        raise ValueError("'{path}' is not an Eos snapshot".format(path=path))
+    elif snapshot.get("version", None) != SNAPSHOT_VERSION:
+        raise ValueError(
+            "'{path}' is snapshot version {version}, expected {expected}".format(
+                path=path,
+                version=snapshot.get("version", None),
+                expected=SNAPSHOT_VERSION,
+            )
+        )
+    return snapshot
+
+
+def diff(snapshot, host):
+    """Compares the Eos metadata in ``snapshot`` with openHAB.
+
+    Returns a list of changes as ``(item name, metadata)`` tuples, where
+    ``metadata`` is ``None`` if it should be removed, and a list of the
+    names of items in the snapshot that do not exist in openHAB.
+    """
+    names = [item["name"] for item in snapshot["items"]]
+    existing = map_concurrent(lambda name: validate_item(name, host), names)
+    current = map_concurrent(
+        lambda name, item: get_metadata(name, META_NAME_EOS, host, raw=True)
+        if item
+        else {},
+        names,
+        existing,
+    )
+    changes = []
+    missing = []
+    for item, exists, metadata in zip(snapshot["items"], existing, current):
+        if not exists:
+            missing.append(item["name"])
+            continue
+        new_metadata = item.get("metadata", {}).get(META_NAME_EOS, {})
+        if new_metadata == metadata:
+            continue
+        changes.append((item["name"], new_metadata or None))
+    return changes, missing
+
+
+def describe(name, metadata, host):
+    """Returns a line describing what a change from ``diff`` will do."""
+    if metadata is None:
+        return "Remove metadata from '{name}'".format(name=name)
+    current = get_metadata(name, META_NAME_EOS, host, raw=True).get("config", {})
+    new = metadata.get("config", {})
+    added = sorted([key for key in new if key not in current])
+    removed = sorted([key for key in current if key not in new])
+    changed = sorted(
+        [key for key in new if key in current and new[key] != current[key]]
+    )
+    details = [
+        "{label}: {keys}".format(label=label, keys=", ".join(keys))
+        for label, keys in [("add", added), ("change", changed), ("remove", removed)]
+        if keys
+    ]
+    return "Update '{name}'{details}".format(
+        name=name, details=" ({})".format("; ".join(details)) if details else ""
+    )
+
+
+def apply(changes, host):
+    """Writes changes from ``diff`` to openHAB concurrently.
+
+    Returns a list of the names of items that failed.
+    """
+
+    def _write(name, metadata):
+        try:
+            if metadata is None:
+                return remove_metadata(name, META_NAME_EOS, host)
+            return set_metadata(
+                name,
+                META_NAME_EOS,
+                host,
+                configuration=metadata.get("config", {}),
+                # older snapshots hold parsed values, openHAB needs a string
+                value=None
+                if metadata.get("value", None) is None
+                else str(metadata["value"]),
+                overwrite=True,
+            )
+        except Exception:
+            return None
+
+    results = map_concurrent(
+        _write, [change[0] for change in changes], [change[1] for change in changes]
+    )
+    return [change[0] for change, result in zip(changes, results) if not result]
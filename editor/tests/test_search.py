@@ -0,0 +1,43 @@
+"""
+Eos Lighting Metadata Editor - Item Search Tests
+
+Run from the ``editor`` directory with ``python -m unittest discover tests``.
+"""
+
+import unittest
+
+import search
+from rest import index
+
+
+class SearchTest(unittest.TestCase):
+    def setUp(self):
+        index.load_items(
+            [
+                {"name": "Kitchen_Light", "type": "Dimmer", "label": "Kitchen"},
+                {"name": "Xmas_Tree", "type": "Switch", "label": "x.. lights"},
+            ],
+            "eos",
+        )
+
+    def tearDown(self):
+        index.clear()
+
+    def test_query_without_trigrams(self):
+        # these normalize to fewer than 2 characters and have no trigrams
+        for query in ["x__", "a..", "...", "x  "]:
+            self.assertIsInstance(search.search(query), list)
+
+    def test_query_without_trigrams_matches_prefixes(self):
+        self.assertEqual(
+            [entry["name"] for entry in search.search("x..")], ["Xmas_Tree"]
+        )
+
+    def test_query_with_trigrams(self):
+        self.assertEqual(
+            [entry["name"] for entry in search.search("kitchen")], ["Kitchen_Light"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -31,13 +31,13 @@ if sys.version_info[0] < 3:  # Python 2.x
 else:  # Python 3.x
     pass
 
-import os, json, copy, collections, six
+import os, json, copy, six
 from ast import literal_eval
 import importlib.util
 from click import echo
 
 from constants import *
-from rest.metadata import get_metadata, get_value
+from rest.metadata import get_value_many
 from rest.utils import validate_item
 
 conf_path = os.path.realpath(
@@ -49,6 +49,8 @@ conf_path = os.path.realpath(
 
 __all__ = [
     "conf_path",
+    "load_configuration",
+    "reload_configuration",
     "get_conf_value",
     "validate_item_name",
     "get_scene_item",
@@ -59,20 +61,44 @@ __all__ = [
     "get_other_items",
     "update_dict",
     "get_global_settings",
+    "build_scene_data",
     "get_source_group",
     "get_scene_setting",
     "get_scene_type",
 ]
 
 
+_conf_cache = {}
+
+
+def load_configuration(reload=False):
+    """Loads ``configuration.py`` from ``conf_path``
+
+    The module is only executed again if ``conf_path`` or the file's
+    modification time changed since it was last loaded, or if ``reload`` is
+    ``True``.
+    """
+    mtime = os.path.getmtime(conf_path)
+    cached = _conf_cache.get(conf_path, None)
+    if reload or cached is None or cached[0] != mtime:
+        spec = importlib.util.spec_from_file_location("*", conf_path)
+        configuration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(configuration)
+        cached = _conf_cache[conf_path] = (mtime, configuration)
+    return cached[1]
+
+
+def reload_configuration():
+    """Forces ``configuration.py`` to be loaded again"""
+    return load_configuration(reload=True)
+
+
 def get_conf_value(name, valid_types=None, default=None):
     """Get ``name`` from ``configuration.py``
 
     Returns ``default`` if not present or not one of types in ``valid_types``
     """
-    spec = importlib.util.spec_from_file_location("*", conf_path)
-    configuration = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(configuration)
+    configuration = load_configuration()
 
     if hasattr(configuration, name):
         value = getattr(configuration, name)
@@ -95,14 +121,12 @@ def get_scene_item(group):
 
     Returns the scene item or ``None`` if it does not find exactly one match.
     """
+    prefix = get_conf_value(CONF_KEY_SCENE_PREFIX, default="")
+    suffix = get_conf_value(CONF_KEY_SCENE_SUFFIX, default="")
     items = [
         item
         for item in group.get("members", {})
-        if validate_item_name(
-            item["name"],
-            get_conf_value(CONF_KEY_SCENE_PREFIX, default=""),
-            get_conf_value(CONF_KEY_SCENE_SUFFIX, default=""),
-        )
+        if validate_item_name(item["name"], prefix, suffix)
     ]
     if not items:
         return None
@@ -119,18 +143,20 @@ def get_light_items(group, host):
 
     Returns a list of valid Eos lights.
     """
-    return (
-        [
-            item
-            for item in group["members"]
-            if item["type"] not in itemtypesGroup
-            and item["type"] in itemtypesLight
-            and item["name"] != get_scene_item(group)["name"]
-            and resolve_type(get_value(item["name"], META_NAME_EOS, host)) is not None
-        ]
-        if "members" in group
-        else []
-    )
+    if "members" not in group:
+        return []
+    scene_item_name = (get_scene_item(group) or {}).get("name", None)
+    items = [
+        item
+        for item in group["members"]
+        if item["type"] not in itemtypesGroup
+        and item["type"] in itemtypesLight
+        and item["name"] != scene_item_name
+    ]
+    values = get_value_many([item["name"] for item in items], META_NAME_EOS, host)
+    return [
+        item for item, value in zip(items, values) if resolve_type(value) is not None
+    ]
 
 
 def get_group_items(group):
@@ -155,6 +181,9 @@ def resolve_type(value):
     It will return ``value`` as the python type if possible, otherwise will
     return value as string.
     """
+    if value is None or isinstance(value, (bool, int, float)):
+        # already resolved, str() and back would give the same value
+        return value
     value = str(value).strip()
     if str(value).lower() == "true":
         return True
@@ -162,6 +191,9 @@ def resolve_type(value):
         return False
     elif str(value).lower() == "none":
         return None
+    elif value.isidentifier() and value.lower() not in ["inf", "infinity", "nan"]:
+        # a plain word like "ON" can't be parsed or cast
+        return value
     else:
         # attempt to parse
         try:
@@ -219,7 +251,7 @@ def get_other_items(group, host):
     for item in [others[key] for key in others]:
         if item["type"] not in itemtypesLight and item["type"] != itemtypesGroup:
             others.pop(item["name"], None)
-    others.pop(get_scene_item(group)["name"], None)
+    others.pop((get_scene_item(group) or {}).get("name", None), None)
     return [others[key] for key in others]
 
 
@@ -229,9 +261,9 @@ def update_dict(d, u):
     """
     for k in u:
         dv = d.get(k, {})
-        if not isinstance(dv, collections.Mapping):
+        if not isinstance(dv, six.moves.collections_abc.Mapping):
             d[k] = u[k]
-        elif isinstance(u[k], collections.Mapping):
+        elif isinstance(u[k], six.moves.collections_abc.Mapping):
             d[k] = update_dict(dv, u[k])
         else:
             d[k] = u[k]
@@ -247,6 +279,20 @@ def get_global_settings():
     )
 
 
+def build_scene_data(item_config, group_configs, global_settings):
+    """Builds the settings used to evaluate a scene for a light, like
+    ``build_data`` in Eos.
+
+    ``group_configs`` are the Eos configurations of the light's Eos group and
+    its ancestors, top level group first. Settings in lower groups override
+    those in their ancestors.
+    """
+    group_data = {}
+    for config in group_configs:
+        group_data = update_dict(group_data, copy.deepcopy(config))
+    return {"item": item_config, "group": group_data, "global": global_settings}
+
+
 def get_source_group(key, light_type, scene, item_name, data):
     # get the group name that a setting is inherited from
     raw_data = data["raw_groups"]
@@ -3,7 +3,7 @@ Eos Lighting System
 """
 
 from core.log import log_traceback
-from community.eos import log
+from community.eos import log, stats, trace
 from community.eos.system import init, uninit
 from community.eos.update import update_light, update_group, update_scene, update_eos
 from community.eos.util import get_item_eos_group
@@ -20,6 +20,8 @@ def eos_rule_reinit(event):
         eos_rule_light_update,
         eos_rule_level_source_update,
         eos_rule_motion_source_changed,
+        eos_rule_trace_command,
+        eos_rule_stats_publish,
     )
 
 
@@ -30,7 +32,10 @@ def eos_rule_scene_command(event):
             rule=RULE_SCENE_COMMAND_NAME, name=event.itemName, scene=event.itemCommand
         )
     )
-    update_scene(itemRegistry.get(event.itemName), scene=str(event.itemCommand).lower())
+    with stats.rule(RULE_SCENE_COMMAND_NAME):
+        update_scene(
+            itemRegistry.get(event.itemName), scene=str(event.itemCommand).lower()
+        )
 
 
 def eos_rule_scene_changed(event):
@@ -40,10 +45,11 @@ def eos_rule_scene_changed(event):
             rule=RULE_SCENE_CHANGED_NAME, name=event.itemName, scene=event.itemState
         )
     )
-    update_group(
-        get_item_eos_group(itemRegistry.get(event.itemName)),
-        scene=str(event.itemState).lower(),
-    )
+    with stats.rule(RULE_SCENE_CHANGED_NAME):
+        update_group(
+            get_item_eos_group(itemRegistry.get(event.itemName)),
+            scene=str(event.itemState).lower(),
+        )
 
 
 def eos_rule_light_update(event):
@@ -53,7 +59,8 @@ def eos_rule_light_update(event):
             rule=RULE_LIGHT_NAME, name=event.itemName, state=event.itemState
         )
     )
-    update_light(itemRegistry.get(event.itemName))
+    with stats.rule(RULE_LIGHT_NAME):
+        update_light(itemRegistry.get(event.itemName))
 
 
 def eos_rule_level_source_update(event):
@@ -63,7 +70,8 @@ def eos_rule_level_source_update(event):
             rule=RULE_LEVEL_SOURCE_NAME, name=event.itemName, state=event.itemState
         )
     )
-    update_eos()
+    with stats.rule(RULE_LEVEL_SOURCE_NAME):
+        update_eos()
 
 
 def eos_rule_motion_source_changed(event):
@@ -73,7 +81,23 @@ def eos_rule_motion_source_changed(event):
             rule=RULE_MOTION_SOURCE_NAME, name=event.itemName, state=event.itemState
         )
     )
-    update_eos()
+    with stats.rule(RULE_MOTION_SOURCE_NAME):
+        update_eos()
+
+
+def eos_rule_trace_command(event):
+    """Eos Trace item received command Rule"""
+    log.debug(
+        "{rule} triggered by '{name}' with command '{command}'".format(
+            rule=RULE_TRACE_NAME, name=event.itemName, command=event.itemCommand
+        )
+    )
+    trace.handle_command(event.itemCommand)
+
+
+def eos_rule_stats_publish(event):
+    """Eos Statistics publish Rule"""
+    stats.publish()
 
 
 @log_traceback
@@ -85,6 +109,8 @@ def scriptLoaded(*args):
         eos_rule_light_update,
         eos_rule_level_source_update,
         eos_rule_motion_source_changed,
+        eos_rule_trace_command,
+        eos_rule_stats_publish,
     )
 
 
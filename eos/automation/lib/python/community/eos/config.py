@@ -92,6 +92,11 @@ def load():
     this.scene_item_suffix = _get_conf_value(CONF_KEY_SCENE_SUFFIX, str, "")
     this.reinit_item_name = _get_conf_value(CONF_KEY_REINIT_ITEM, str, "")
     this.log_trace = _get_conf_value(CONF_KEY_LOG_TRACE, None, False)
+    this.trace_targets = _get_conf_value(CONF_KEY_TRACE_TARGETS, (list, bool), [])
+    this.trace_size = _get_conf_value(CONF_KEY_TRACE_SIZE, int, 100)
+    this.trace_item_name = _get_conf_value(CONF_KEY_TRACE_ITEM, str, "")
+    this.stats_item_prefix = _get_conf_value(CONF_KEY_STATS_PREFIX, str, "")
+    this.stats_interval = _get_conf_value(CONF_KEY_STATS_INTERVAL, int, 1)
     this.global_settings = update_dict(
         copy.deepcopy(constants._global_settings),
         _get_conf_value(CONF_KEY_GLOBAL_SETTINGS, dict, {}),
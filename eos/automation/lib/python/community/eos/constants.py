@@ -39,6 +39,12 @@ RULE_LEVEL_SOURCE_DESC = (
 )
 RULE_MOTION_SOURCE_NAME = "Eos Motion Source Rule"
 RULE_MOTION_SOURCE_DESC = "This rule is triggered when any Motion Source changes"
+RULE_TRACE_NAME = "Eos Trace Rule"
+RULE_TRACE_DESC = (
+    "This rule dumps the Eos trace buffer when the trace item receives a command"
+)
+RULE_STATS_NAME = "Eos Statistics Rule"
+RULE_STATS_DESC = "This rule periodically publishes Eos statistics to items"
 
 CONF_KEY_MASTER_GROUP = "eos_master_group"
 CONF_KEY_SCENE_PREFIX = "eos_scene_item_prefix"
@@ -46,6 +52,11 @@ CONF_KEY_SCENE_SUFFIX = "eos_scene_item_suffix"
 CONF_KEY_GLOBAL_SETTINGS = "eos_global_settings"
 CONF_KEY_REINIT_ITEM = "eos_reload_item_name"
 CONF_KEY_LOG_TRACE = "eos_log_trace"
+CONF_KEY_TRACE_TARGETS = "eos_trace_targets"
+CONF_KEY_TRACE_SIZE = "eos_trace_size"
+CONF_KEY_TRACE_ITEM = "eos_trace_item_name"
+CONF_KEY_STATS_PREFIX = "eos_stats_item_prefix"
+CONF_KEY_STATS_INTERVAL = "eos_stats_interval"
 
 META_NAME_EOS = "eos"
 META_STRING_FALSE = ["false", "disabled", "off", "no"]
@@ -64,6 +75,9 @@ META_KEY_MOTION_SOURCE = "motion_source"
 META_KEY_MOTION_ACTIVE = "motion_active"
 META_KEY_MOTION_STATE = "motion_state"
 META_KEY_MOTION_SCENE = "motion_scene"
+META_KEY_SCALED_MIN_DELTA = "scaled_min_delta"
+META_KEY_SCALED_MIN_INTERVAL = "scaled_min_interval"
+META_KEY_TRANSITION_TIME = "transition_time"
 META_KEY_DEPTH_MAP = {
     META_KEY_ALIAS_SCENE: [1, 2, 3, 4, 5],
     META_KEY_LEVEL_SOURCE: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
@@ -79,6 +93,9 @@ META_KEY_DEPTH_MAP = {
     META_KEY_MOTION_ACTIVE: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
     META_KEY_MOTION_STATE: [1, 2, 4, 6, 7, 9],
     META_KEY_MOTION_SCENE: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    META_KEY_SCALED_MIN_DELTA: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    META_KEY_SCALED_MIN_INTERVAL: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    META_KEY_TRANSITION_TIME: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
 }
 
 LIGHT_TYPE_SWITCH = "switch"
@@ -218,12 +235,21 @@ __all__ = [
     "RULE_LEVEL_SOURCE_DESC",
     "RULE_MOTION_SOURCE_NAME",
     "RULE_MOTION_SOURCE_DESC",
+    "RULE_TRACE_NAME",
+    "RULE_TRACE_DESC",
+    "RULE_STATS_NAME",
+    "RULE_STATS_DESC",
     "CONF_KEY_MASTER_GROUP",
     "CONF_KEY_SCENE_PREFIX",
     "CONF_KEY_SCENE_SUFFIX",
     "CONF_KEY_GLOBAL_SETTINGS",
     "CONF_KEY_REINIT_ITEM",
     "CONF_KEY_LOG_TRACE",
+    "CONF_KEY_TRACE_TARGETS",
+    "CONF_KEY_TRACE_SIZE",
+    "CONF_KEY_TRACE_ITEM",
+    "CONF_KEY_STATS_PREFIX",
+    "CONF_KEY_STATS_INTERVAL",
     "META_NAME_EOS",
     "META_STRING_FALSE",
     "META_KEY_FOLLOW_PARENT",
@@ -241,6 +267,9 @@ __all__ = [
     "META_KEY_MOTION_ACTIVE",
     "META_KEY_MOTION_STATE",
     "META_KEY_MOTION_SCENE",
+    "META_KEY_SCALED_MIN_DELTA",
+    "META_KEY_SCALED_MIN_INTERVAL",
+    "META_KEY_TRANSITION_TIME",
     "META_KEY_DEPTH_MAP",
     "LIGHT_TYPE_SWITCH",
     "LIGHT_TYPE_DIMMER",
@@ -0,0 +1,192 @@
+"""
+Eos Lighting
+
+Evaluation and command statistics
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from community.eos import log, config
+from community.eos.util import get_item_eos_group
+
+from core.jsr223.scope import itemRegistry
+from core.utils import postUpdate
+
+import re, threading
+from contextlib import contextmanager
+
+__all__ = [
+    "STAT_EVALUATIONS",
+    "STAT_SENT",
+    "STAT_SKIPPED",
+    "STAT_FADED",
+    "STAT_INVALID",
+    "STAT_LATENCY",
+    "rule",
+    "begin",
+    "record",
+    "invalid",
+    "command",
+    "publish",
+    "reset",
+]
+
+STAT_EVALUATIONS = "evaluations"
+STAT_SENT = "sent"
+STAT_SKIPPED = "skipped"
+STAT_FADED = "faded"
+STAT_INVALID = "invalid"
+STAT_LATENCY = "latency"
+
+_lock = threading.Lock()
+_local = threading.local()
+_counters = {}
+_item_groups = {}
+
+
+def _enabled():
+    return bool(config.stats_item_prefix)
+
+
+@contextmanager
+def rule(name):
+    """Attributes statistics recorded inside the ``with`` block to rule
+    ``name``."""
+    _local.rule = name
+    try:
+        yield
+    finally:
+        _local.rule = None
+
+
+def _scopes(item):
+    # returns the counter keys an event for ``item`` is recorded against
+    scopes = []
+    rule_name = getattr(_local, "rule", None)
+    if rule_name:
+        scopes.append(rule_name)
+    group_name = _item_groups.get(item.name, None)
+    if group_name is None:
+        group = get_item_eos_group(item)
+        group_name = group.name if group else ""
+        _item_groups[item.name] = group_name
+    if group_name:
+        scopes.append(group_name)
+    return scopes
+
+
+def _new_counters():
+    return {
+        STAT_EVALUATIONS: 0,
+        STAT_SENT: 0,
+        STAT_SKIPPED: 0,
+        STAT_FADED: 0,
+        STAT_INVALID: 0,
+        STAT_LATENCY: 0.0,
+    }
+
+
+def _add(scopes, key, latency=None):
+    with _lock:
+        for scope in scopes:
+            counters = _counters.get(scope, None)
+            if counters is None:
+                counters = _counters[scope] = _new_counters()
+            counters[key] += 1
+            if latency is not None:
+                counters[STAT_EVALUATIONS] += 1
+                counters[STAT_LATENCY] += latency
+
+
+def begin():
+    """Starts an evaluation on this thread, ended by ``record``."""
+    _local.invalid = False
+
+
+def record(item, result, latency):
+    """Records an evaluation of ``item`` that took ``latency`` seconds.
+
+    ``result`` is ``STAT_SENT`` if a command was sent, ``STAT_FADED`` if a
+    fade was started, ``STAT_SKIPPED`` if the light was already in (or
+    fading to) the new state, or ``STAT_INVALID``. It is recorded as
+    ``STAT_INVALID`` if ``invalid`` was called during the evaluation.
+    """
+    if getattr(_local, "invalid", False):
+        result = STAT_INVALID
+    _local.invalid = False
+    if _enabled():
+        _add(_scopes(item), result, latency)
+
+
+def invalid():
+    """Marks the current evaluation as having found an invalid
+    configuration."""
+    _local.invalid = True
+
+
+def command(item):
+    """Records a command sent to ``item`` outside of an evaluation, like
+    the steps of a fade."""
+    if _enabled():
+        _add(_scopes(item), STAT_SENT)
+
+
+def publish():
+    """Posts the counters collected since the last call to the statistics
+    items and resets them.
+
+    Items are named ``{prefix}{rule or group}_{counter}``, characters that
+    are not valid in item names are replaced with ``_``. Items that don't
+    exist are skipped. Latency is the average in milliseconds.
+    """
+    if not _enabled():
+        return
+    with _lock:
+        counters = {}
+        for scope in _counters:
+            counters[scope] = _counters[scope]
+            _counters[scope] = _new_counters()
+    for scope in counters:
+        values = counters[scope]
+        values[STAT_LATENCY] = (
+            round(values[STAT_LATENCY] / values[STAT_EVALUATIONS] * 1000.0, 2)
+            if values[STAT_EVALUATIONS]
+            else 0
+        )
+        for key in values:
+            item_name = re.sub(
+                r"\W",
+                "_",
+                "{prefix}{scope}_{key}".format(
+                    prefix=config.stats_item_prefix, scope=scope, key=key
+                ),
+            )
+            if itemRegistry.getItems(item_name):
+                postUpdate(item_name, str(values[key]))
+        log.debug(
+            "Statistics for '{scope}': {values}".format(scope=scope, values=values)
+        )
+
+
+def reset():
+    """Clears all counters and cached group lookups."""
+    with _lock:
+        _counters.clear()
+        _item_groups.clear()
@@ -24,7 +24,7 @@ System init and uninit
 # SOFTWARE.
 
 from community import eos
-from community.eos import log, config
+from community.eos import log, config, stats, throttle, trace, transition, validate
 from community.eos.update import update_eos
 from community.eos.util import *
 from community.eos.constants import *
@@ -51,6 +51,8 @@ def init(
     rule_light_update,
     rule_level_source_update,
     rule_motion_source_changed,
+    rule_trace_command=None,
+    rule_stats_publish=None,
 ):
     """Initialize Eos.
 
@@ -168,6 +170,10 @@ def init(
     log.info("Eos Version {} initializing...".format(eos.__version__))
 
     config.load()
+    throttle.reset()
+    transition.stop()
+    trace.configure(config.trace_size, config.trace_targets)
+    stats.reset()
 
     if not config.master_group_name:
         log.error(
@@ -211,6 +217,8 @@ def init(
         log.error("Eos failed to initialize")
         return
 
+    validate.validate_all(master_group_item)
+
     for objRule in [
         objRule
         for objRule in ruleRegistry.getAll()
@@ -222,6 +230,8 @@ def init(
             RULE_LIGHT_NAME,
             RULE_LEVEL_SOURCE_NAME,
             RULE_MOTION_SOURCE_NAME,
+            RULE_TRACE_NAME,
+            RULE_STATS_NAME,
         ]
     ]:
         log.debug(
@@ -248,6 +258,10 @@ def init(
         delattr(rule_level_source_update, "triggers")
     if hasattr(rule_motion_source_changed, "triggers"):
         delattr(rule_motion_source_changed, "triggers")
+    if hasattr(rule_trace_command, "triggers"):
+        delattr(rule_trace_command, "triggers")
+    if hasattr(rule_stats_publish, "triggers"):
+        delattr(rule_stats_publish, "triggers")
 
     # add rule to reload Eos if item exists
     if config.reinit_item_name:
@@ -264,6 +278,43 @@ def init(
         else:
             log.error("Failed to create {rule}".format(rule=RULE_REINIT_NAME))
 
+    # add rule to dump the trace buffer if item exists
+    if config.trace_item_name and rule_trace_command is not None:
+        if validate_item(config.trace_item_name) is None:
+            log.warn(
+                "Trace item '{name}' does not exist".format(name=config.trace_item_name)
+            )
+        else:
+            when("Item {name} received command".format(name=config.trace_item_name))(
+                rule_trace_command
+            )
+            rule(RULE_TRACE_NAME, RULE_TRACE_DESC)(rule_trace_command)
+            if hasattr(rule_trace_command, "UID"):
+                log.debug(
+                    "Created {rule} with UID '{uid}'".format(
+                        rule=RULE_TRACE_NAME, uid=rule_trace_command.UID
+                    )
+                )
+            else:
+                log.error("Failed to create {rule}".format(rule=RULE_TRACE_NAME))
+
+    # add rule to publish statistics if enabled
+    if config.stats_item_prefix and rule_stats_publish is not None:
+        when(
+            "Time cron 0 0/{interval} * * * ?".format(
+                interval=max(1, min(59, config.stats_interval))
+            )
+        )(rule_stats_publish)
+        rule(RULE_STATS_NAME, RULE_STATS_DESC)(rule_stats_publish)
+        if hasattr(rule_stats_publish, "UID"):
+            log.debug(
+                "Created {rule} with UID '{uid}'".format(
+                    rule=RULE_STATS_NAME, uid=rule_stats_publish.UID
+                )
+            )
+        else:
+            log.error("Failed to create {rule}".format(rule=RULE_STATS_NAME))
+
     # generate triggers for all scene, light, level source, and motion source items
     levelTriggers = {}
     motionTriggers = {}
@@ -363,6 +414,17 @@ def uninit():
     """
     log.info("Eos uninitializing...")
 
+    transition.stop()
+
+    counts = throttle.get_counts()
+    if counts["sent"] or counts["suppressed"]:
+        log.info(
+            "Scaled scene commands sent: {sent}, suppressed: {suppressed}".format(
+                **counts
+            )
+        )
+    throttle.reset()
+
     for objRule in [
         objRule
         for objRule in ruleRegistry.getAll()
@@ -374,6 +436,8 @@ def uninit():
             RULE_LIGHT_NAME,
             RULE_LEVEL_SOURCE_NAME,
             RULE_MOTION_SOURCE_NAME,
+            RULE_TRACE_NAME,
+            RULE_STATS_NAME,
         ]
     ]:
         log.info(
@@ -0,0 +1,180 @@
+"""
+Eos Lighting
+
+Scaled scene output filter
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from community.eos import log
+
+import time, threading
+
+__all__ = ["allow", "sent", "get_counts", "reset"]
+
+_lock = threading.Lock()
+_last_sent = {}
+_allowed = {}
+_retries = {}
+_counts = {}
+
+
+def _parse_state(state):
+    """Splits a Dimmer or HSB state string into a list of floats.
+
+    Returns ``None`` if the state can't be parsed (``NULL``, ``UNDEF``, etc).
+    """
+    try:
+        return [float(part) for part in str(state).split(",")]
+    except ValueError:
+        return None
+
+
+def _delta(old_state, new_state):
+    """Returns the largest change between components of two states in
+    percent or ``None`` if they can't be compared.
+
+    Hue is measured the short way around the colour wheel and scaled to
+    percent of a full turn so it compares like saturation and brightness.
+    """
+    old_parts = _parse_state(old_state)
+    new_parts = _parse_state(new_state)
+    if old_parts is None or new_parts is None or len(old_parts) != len(new_parts):
+        return None
+    deltas = [abs(new - old) for old, new in zip(old_parts, new_parts)]
+    if len(deltas) == 3:
+        hue = deltas[0] % 360
+        deltas[0] = min(hue, 360 - hue) * 100.0 / 360
+    return max(deltas)
+
+
+def _schedule_retry(item_name, delay, retry):
+    # only one trailing evaluation is kept per light, later suppressed
+    # commands are covered by it
+    def _run():
+        with _lock:
+            if _retries.get(item_name, None) is not timer:
+                return
+            _retries.pop(item_name)
+        try:
+            retry()
+        except:
+            log.warn(
+                "Failed to update '{name}' after throttling".format(name=item_name)
+            )
+
+    with _lock:
+        if item_name in _retries:
+            return
+        timer = threading.Timer(delay, _run)
+        timer.setDaemon(True)
+        _retries[item_name] = timer
+    timer.start()
+
+
+def allow(item, new_state, min_delta=None, min_interval=None, retry=None):
+    """Checks if a Scaled scene command should be sent to ``item``.
+
+    Commands are suppressed if the largest component change from the current
+    state is less than ``min_delta`` or if the last command sent to ``item``
+    was less than ``min_interval`` seconds ago. In the latter case
+    ``retry`` is called once the interval has passed, so the light still
+    ends up in its latest state.
+
+    Returns ``True`` if the command should be sent. Call ``sent`` once it
+    has been.
+    """
+    old_state = str(item.state)
+    if str(new_state) == old_state:
+        return True
+
+    now = time.time()
+    reason = None
+    if min_delta:
+        delta = _delta(old_state, new_state)
+        if delta is not None and delta < float(min_delta):
+            reason = "change of {delta} is less than {min}".format(
+                delta=round(delta, 2), min=min_delta
+            )
+    if reason is None and min_interval:
+        with _lock:
+            last = _last_sent.get(item.name, None)
+        if last is not None and now - last < float(min_interval):
+            reason = "last command was {elapsed:.1f}s ago".format(elapsed=now - last)
+            if retry is not None:
+                _schedule_retry(item.name, last + float(min_interval) - now, retry)
+
+    with _lock:
+        if reason is None:
+            _allowed[item.name] = str(new_state)
+        else:
+            _allowed.pop(item.name, None)
+            counts = _counts.setdefault(item.name, {"sent": 0, "suppressed": 0})
+            counts["suppressed"] += 1
+
+    if reason is not None:
+        log.debug(
+            "Suppressed command '{state}' for '{name}', {reason}".format(
+                state=new_state, name=item.name, reason=reason
+            )
+        )
+    return reason is None
+
+
+def sent(item_name, state):
+    """Records that ``state`` was sent to ``item_name``.
+
+    Only commands that were checked with ``allow`` are counted and start a
+    new ``min_interval``.
+    """
+    with _lock:
+        if _allowed.get(item_name, None) != str(state):
+            return
+        _allowed.pop(item_name)
+        _last_sent[item_name] = time.time()
+        counts = _counts.setdefault(item_name, {"sent": 0, "suppressed": 0})
+        counts["sent"] += 1
+
+
+def get_counts(item_name=None):
+    """Returns sent and suppressed command counts.
+
+    If ``item_name`` is given only the counts for that light are returned,
+    otherwise the totals for all lights.
+    """
+    with _lock:
+        if item_name is not None:
+            return dict(_counts.get(item_name, {"sent": 0, "suppressed": 0}))
+        totals = {"sent": 0, "suppressed": 0}
+        for counts in _counts.values():
+            totals["sent"] += counts["sent"]
+            totals["suppressed"] += counts["suppressed"]
+        return totals
+
+
+def reset():
+    """Clears all command history and counts and cancels pending
+    evaluations."""
+    with _lock:
+        for timer in _retries.values():
+            timer.cancel()
+        _retries.clear()
+        _last_sent.clear()
+        _allowed.clear()
+        _counts.clear()
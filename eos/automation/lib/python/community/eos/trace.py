@@ -0,0 +1,210 @@
+"""
+Eos Lighting
+
+Evaluation trace buffer
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from community.eos import log, config
+
+from core.utils import validate_item
+
+import time, threading, collections
+
+__all__ = [
+    "configure",
+    "begin",
+    "setting",
+    "note",
+    "end",
+    "dump",
+    "clear",
+    "handle_command",
+]
+
+TRACE_COMMAND_ALL = "ALL"
+TRACE_COMMAND_CLEAR = "CLEAR"
+
+_lock = threading.Lock()
+_local = threading.local()
+_buffer = collections.deque(maxlen=100)
+_targets = set()
+_trace_all = False
+_sampled = {}
+
+
+def configure(size, targets):
+    """Sets up the trace buffer.
+
+    ``size`` is the number of evaluations kept. ``targets`` is a list of
+    light or group names to trace, lights in a traced group (or any of its
+    subgroups) are traced too. Pass ``True`` to trace every light. Every light
+    is also traced, and each trace logged, if ``eos_log_trace`` is enabled.
+    """
+    global _buffer, _targets, _trace_all
+    with _lock:
+        _buffer = collections.deque(_buffer, maxlen=max(int(size), 1))
+        _trace_all = targets is True
+        _targets = set(targets) if isinstance(targets, (list, tuple, set)) else set()
+        _sampled.clear()
+
+
+def _is_sampled(item):
+    """Returns ``True`` if ``item`` or one of its ancestor groups is a trace
+    target."""
+    if _trace_all or config.log_trace:
+        return True
+    elif not _targets:
+        return False
+
+    def _check(name, seen):
+        if name in _targets:
+            return True
+        seen.add(name)
+        parent = validate_item(name)
+        if parent is None:
+            return False
+        for group_name in parent.groupNames:
+            if group_name not in seen and _check(group_name, seen):
+                return True
+        return False
+
+    result = _sampled.get(item.name, None)
+    if result is None:
+        result = _check(item.name, set())
+        _sampled[item.name] = result
+    return result
+
+
+def begin(item, scene):
+    """Starts recording an evaluation of ``scene`` for ``item`` if it is being
+    traced."""
+    _local.record = (
+        {
+            "time": time.time(),
+            "light": item.name,
+            "groups": list(item.groupNames),
+            "scene": scene,
+            "settings": collections.OrderedDict(),
+            "notes": [],
+            "state": None,
+            "duration": None,
+        }
+        if _is_sampled(item)
+        else None
+    )
+
+
+def setting(key, source, depth, value):
+    """Records where a setting was resolved from for the current evaluation."""
+    record = getattr(_local, "record", None)
+    if record is not None:
+        record["settings"][key] = (source, depth, value)
+
+
+def note(message):
+    """Records a step in the current evaluation."""
+    record = getattr(_local, "record", None)
+    if record is not None:
+        record["notes"].append(message)
+
+
+def end(state):
+    """Finishes the current evaluation and adds it to the buffer."""
+    record = getattr(_local, "record", None)
+    if record is None:
+        return
+    _local.record = None
+    record["state"] = state
+    record["duration"] = (time.time() - record["time"]) * 1000.0
+    with _lock:
+        _buffer.append(record)
+    if config.log_trace:
+        log.debug(_format(record))
+
+
+def _format(record):
+    return "[{time}.{ms:03d}] '{light}' scene '{scene}' -> '{state}' in {duration:.1f}ms{notes}{settings}".format(
+        time=time.strftime("%H:%M:%S", time.localtime(record["time"])),
+        ms=int(record["time"] * 1000) % 1000,
+        light=record["light"],
+        scene=record["scene"],
+        state=record["state"],
+        duration=record["duration"],
+        notes="; {}".format(", ".join(record["notes"])) if record["notes"] else "",
+        settings="; settings: {}".format(
+            ", ".join(
+                [
+                    "{key}={value} ({source}, depth {depth})".format(
+                        key=key, source=source, depth=depth, value=value
+                    )
+                    for key, (source, depth, value) in record["settings"].items()
+                ]
+            )
+        )
+        if record["settings"]
+        else "",
+    )
+
+
+def dump(name=None):
+    """Logs all traces in the buffer.
+
+    If ``name`` is given only traces for that light, or lights that are
+    direct members of that group, are logged.
+    """
+    with _lock:
+        records = [
+            record
+            for record in _buffer
+            if name is None or record["light"] == name or name in record["groups"]
+        ]
+    log.info(
+        "Dumping {count} Eos trace{s}{name}".format(
+            count=len(records),
+            s="" if len(records) == 1 else "s",
+            name=" for '{}'".format(name) if name else "",
+        )
+    )
+    for record in records:
+        log.info(_format(record))
+
+
+def clear():
+    """Removes all traces from the buffer."""
+    with _lock:
+        _buffer.clear()
+
+
+def handle_command(command):
+    """Handles a command sent to the trace item.
+
+    ``CLEAR`` empties the buffer, ``ALL`` (or an empty command) dumps every
+    trace, anything else is treated as a light or group name to dump.
+    """
+    command = str(command).strip()
+    if command.upper() == TRACE_COMMAND_CLEAR:
+        clear()
+        log.info("Eos trace buffer cleared")
+    elif not command or command.upper() == TRACE_COMMAND_ALL:
+        dump()
+    else:
+        dump(command)
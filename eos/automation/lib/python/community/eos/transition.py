@@ -0,0 +1,261 @@
+"""
+Eos Lighting
+
+Scheduled transitions (fades)
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from community.eos import log, stats
+from community.eos.constants import *
+
+from core.utils import sendCommand
+
+import time, math, threading
+
+__all__ = ["start", "cancel", "stop", "get_target", "active_count"]
+
+# All fading lights share one timer wheel serviced by a single thread. Each
+# wheel slot holds the fades due to step on that tick. Fades are rescheduled
+# further apart as more lights are active and new fades are put in the least
+# busy of the upcoming slots. Fades due beyond ``MAX_STEPS_PER_TICK`` wait for
+# the next tick, so the number of commands sent per tick stays bounded no
+# matter how many lights are fading.
+TICK_INTERVAL = 0.1  # seconds per wheel slot
+WHEEL_SLOTS = 64
+MAX_STEPS_PER_TICK = 20
+
+_lock = threading.Lock()
+_wake = threading.Event()
+_wheel = [[] for slot in range(WHEEL_SLOTS)]
+_fades = {}
+_tick = 0
+_thread = None
+_stop = None
+
+
+class _Fade(object):
+    """Progress of a single light towards a target state."""
+
+    def __init__(self, item, start, target, target_state, duration):
+        self.item = item
+        self.name = item.name
+        self.start = start
+        self.target = target
+        self.target_state = target_state
+        self.start_time = time.time()
+        self.duration = float(duration)
+        self.last_sent = None
+        self.cancelled = False
+
+    def value_at(self, now):
+        """Returns the command for ``now`` and whether the fade is complete."""
+        progress = (now - self.start_time) / self.duration
+        if progress >= 1.0:
+            return self.target_state, True
+        values = [
+            start + (target - start) * progress
+            for start, target in zip(self.start, self.target)
+        ]
+        if len(values) == 3:
+            values[0] = values[0] % 360
+        return ",".join([str(int(round(value))) for value in values]), False
+
+
+def _parse_state(state, light_type):
+    """Returns a Dimmer or Color state as a list of floats, or ``None``."""
+    try:
+        values = [float(part) for part in str(state).split(",")]
+    except ValueError:
+        return None
+    if len(values) == (3 if light_type == LIGHT_TYPE_COLOR else 1):
+        return values
+    return None
+
+
+def _schedule(fade, ticks, spread=1):
+    # must be called with _lock held, the fade goes in the least busy of the
+    # ``spread`` slots starting ``ticks`` ahead
+    slots = [
+        (_tick + ticks + offset) % WHEEL_SLOTS
+        for offset in range(max(1, min(spread, WHEEL_SLOTS - ticks)))
+    ]
+    _wheel[min(slots, key=lambda slot: len(_wheel[slot]))].append(fade)
+
+
+def _stride():
+    # must be called with _lock held
+    return max(
+        1,
+        min(
+            WHEEL_SLOTS - 1,
+            int(math.ceil(len(_fades) / float(MAX_STEPS_PER_TICK))),
+        ),
+    )
+
+
+def _process_tick():
+    global _tick
+    now = time.time()
+    commands = []
+    with _lock:
+        _tick = (_tick + 1) % WHEEL_SLOTS
+        due = [fade for fade in _wheel[_tick] if not fade.cancelled]
+        _wheel[_tick] = []
+        if len(due) > MAX_STEPS_PER_TICK:
+            following = (_tick + 1) % WHEEL_SLOTS
+            _wheel[following] = due[MAX_STEPS_PER_TICK:] + _wheel[following]
+            due = due[:MAX_STEPS_PER_TICK]
+        stride = _stride()
+        for fade in due:
+            command, done = fade.value_at(now)
+            if done:
+                _fades.pop(fade.name, None)
+            else:
+                _schedule(fade, stride)
+            if command != fade.last_sent:
+                fade.last_sent = command
+                commands.append((fade.item, command))
+
+    for item, command in commands:
+        try:
+            sendCommand(item.name, command)
+        except:
+            log.warn(
+                "Failed to send transition command '{command}' to '{name}'".format(
+                    command=command, name=item.name
+                )
+            )
+        else:
+            stats.command(item)
+
+
+def _run(stop_event):
+    next_time = time.time()
+    while not stop_event.is_set():
+        with _lock:
+            idle = not _fades
+        if idle:
+            _wake.wait()
+            _wake.clear()
+            next_time = time.time()
+            continue
+        next_time += TICK_INTERVAL
+        delay = next_time - time.time()
+        if delay > 0:
+            stop_event.wait(delay)
+        else:
+            # we fell behind, skip ahead rather than bursting commands
+            next_time = time.time()
+        if not stop_event.is_set():
+            _process_tick()
+
+
+def _ensure_running():
+    # must be called with _lock held
+    global _thread, _stop
+    if _thread is None or not _thread.is_alive():
+        _stop = threading.Event()
+        _thread = threading.Thread(target=_run, args=(_stop,), name="Eos Transitions")
+        _thread.setDaemon(True)
+        _thread.start()
+
+
+def start(item, target_state, transition_time):
+    """Starts fading ``item`` to ``target_state`` over ``transition_time``
+    seconds.
+
+    A fade already running towards the same target is left alone, any other
+    fade for ``item`` is replaced.
+
+    Returns ``False`` if the light can't be faded (Switch lights, non numeric
+    states, or already at the target) and should be commanded directly.
+    """
+    light_type = LIGHT_TYPE_MAP.get(item.type.lower(), None)
+    if light_type not in [LIGHT_TYPE_DIMMER, LIGHT_TYPE_COLOR]:
+        return False
+    if str(item.state) == str(target_state):
+        cancel(item.name)
+        return False
+    target = _parse_state(target_state, light_type)
+    if target is None:
+        return False
+    start = _parse_state(item.state, light_type)
+    if start is None:
+        # no usable current state, fade up from off
+        start = [0.0] if light_type == LIGHT_TYPE_DIMMER else target[:2] + [0.0]
+    elif light_type == LIGHT_TYPE_COLOR:
+        # fade hue the short way around the colour wheel
+        if target[0] - start[0] > 180:
+            start[0] += 360
+        elif start[0] - target[0] > 180:
+            start[0] -= 360
+
+    with _lock:
+        existing = _fades.get(item.name, None)
+        if existing is not None and existing.target_state == str(target_state):
+            return True
+        elif existing is not None:
+            existing.cancelled = True
+        fade = _Fade(item, start, target, str(target_state), transition_time)
+        _fades[item.name] = fade
+        _schedule(fade, 1, _stride())
+        _ensure_running()
+    _wake.set()
+    return True
+
+
+def cancel(item_name):
+    """Stops any fade running for ``item_name``."""
+    with _lock:
+        fade = _fades.pop(item_name, None)
+        if fade is not None:
+            fade.cancelled = True
+
+
+def get_target(item_name):
+    """Returns the state ``item_name`` is fading to, or ``None`` if it isn't
+    fading."""
+    with _lock:
+        fade = _fades.get(item_name, None)
+        return fade.target_state if fade is not None else None
+
+
+def active_count():
+    """Returns the number of lights currently fading."""
+    with _lock:
+        return len(_fades)
+
+
+def stop():
+    """Cancels all fades and stops the transition thread."""
+    global _thread, _stop
+    with _lock:
+        for fade in _fades.values():
+            fade.cancelled = True
+        _fades.clear()
+        for slot in range(WHEEL_SLOTS):
+            _wheel[slot] = []
+        thread, stop_event = _thread, _stop
+        _thread, _stop = None, None
+    if thread is not None:
+        stop_event.set()
+        _wake.set()
+        thread.join(1.0)
@@ -23,7 +23,7 @@ Process Light and Group updates
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from community.eos import log, config
+from community.eos import log, config, stats, throttle, trace, transition, validate
 from community.eos.util import *
 from community.eos.constants import *
 
@@ -31,6 +31,8 @@ from core.log import log_traceback
 from core.metadata import get_value
 from core.utils import sendCommand, sendCommandCheckFirst, validate_item
 
+import time
+
 __all__ = ["update_eos", "update_scene", "update_light", "update_group"]
 
 
@@ -104,21 +106,58 @@ def update_light(item, scene=None):
             "Got scene '{scene}' for item '{name}'".format(scene=scene, name=item.name)
         )
 
-    if scene != SCENE_MANUAL:
-        newState = get_state_for_scene(item, scene)
+    started = time.time()
+    if scene != SCENE_MANUAL and validate.get_invalid(item, scene):
+        # already reported when validated at init
+        stats.record(item, stats.STAT_INVALID, time.time() - started)
+        return
+    elif scene != SCENE_MANUAL:
+        data = build_data(item)
+        newState = get_state_for_scene(item, scene, data=data)
+        transition_time = get_scene_setting(
+            item, scene, META_KEY_TRANSITION_TIME, data=data
+        )
+        fading = transition.get_target(item.name) == str(newState)
+        if (
+            isinstance(transition_time, (int, float))
+            and transition_time > 0
+            and transition.start(item, newState, transition_time)
+        ):
+            if fading:
+                # evaluated again by a step of the fade
+                log.debug(
+                    "Light '{name}' scene is '{scene}', already fading to '{command}'".format(
+                        name=item.name, scene=scene, command=newState
+                    )
+                )
+                stats.record(item, stats.STAT_SKIPPED, time.time() - started)
+                return
+            log.debug(
+                "Light '{name}' scene is '{scene}', fading to '{command}' over {time}s".format(
+                    name=item.name, scene=scene, command=newState, time=transition_time
+                )
+            )
+            throttle.sent(item.name, newState)
+            stats.record(item, stats.STAT_FADED, time.time() - started)
+            return
+        transition.cancel(item.name)
         if sendCommandCheckFirst(item.name, newState, floatPrecision=3):
+            throttle.sent(item.name, newState)
             log.debug(
                 "Light '{name}' scene is '{scene}', sent command '{command}'".format(
                     name=item.name, scene=scene, command=newState
                 )
             )
+            stats.record(item, stats.STAT_SENT, time.time() - started)
         else:
             log.debug(
                 "Light '{name}' scene is '{scene}', state is already '{command}'".format(
                     name=item.name, scene=scene, command=newState
                 )
             )
+            stats.record(item, stats.STAT_SKIPPED, time.time() - started)
     else:
+        transition.cancel(item.name)
         log.debug(
             "Light '{name}' scene is '{scene}', no action taken".format(
                 name=item.name, scene=scene
@@ -155,10 +194,25 @@ def update_group(target, only_if_scene_parent=False, scene=None, parent_scene=No
         update_group(group_item, only_if_scene_parent, parent_scene=scene)
 
 
-def get_state_for_scene(item, scene):
+def get_state_for_scene(item, scene, data=None):
     """
     Returns state for scene for item.
+
+    ``data`` is the result of ``build_data`` for ``item``, it will be built if
+    not provided. The evaluation is recorded in the trace buffer if ``item``
+    is being traced.
     """
+    state = None
+    trace.begin(item, scene)
+    stats.begin()
+    try:
+        state = _get_state_for_scene(item, scene, data)
+        return state
+    finally:
+        trace.end(state)
+
+
+def _get_state_for_scene(item, scene, data):
 
     def constrain(value, min, max):
         return max if value > max else min if value < min else value
@@ -167,30 +221,13 @@ def get_state_for_scene(item, scene):
     light_type = LIGHT_TYPE_MAP.get(item.type.lower(), None)
     if light_type is None:
         log.error("Couldn't get light type for '{name}'".format(name=item.name))
+        stats.invalid()
         return str(item.state)
-    elif config.log_trace:
-        log.debug(
-            "Got light type '{type}' for '{name}'".format(
-                type=light_type, name=item.name
-            )
-        )
+    trace.note("light type '{type}'".format(type=light_type))
 
     state = None
-    data = build_data(item)
-    if config.log_trace:
-        log.debug(
-            "Got Item data for '{name}': {data}".format(
-                name=item.name, data=data["item"]
-            )
-        )
-        log.debug(
-            "Got Group data for '{name}': {data}".format(
-                name=get_item_eos_group(item).name, data=data["group"]
-            )
-        )
-        log.debug(
-            "Got Global data: {data}".format(name=light_type, data=data["global"])
-        )
+    scaled = False
+    data = data if data is not None else build_data(item)
 
     # check for a scene alias setting
     alias_scene = get_scene_setting(item, scene, META_KEY_ALIAS_SCENE, data=data)
@@ -200,6 +237,7 @@ def get_state_for_scene(item, scene):
                 alias=alias_scene, name=item.name, scene=scene
             )
         )
+        trace.note("alias scene '{alias}'".format(alias=alias_scene))
         scene = alias_scene
 
     # check for Motion settings
@@ -230,6 +268,7 @@ def get_state_for_scene(item, scene):
                             motion=motion_state, name=item.name, scene=scene
                         )
                     )
+                    trace.note("motion state '{motion}'".format(motion=motion_state))
                     state = motion_state
                 elif motion_scene:
                     log.debug(
@@ -237,6 +276,7 @@ def get_state_for_scene(item, scene):
                             motion=motion_scene, name=item.name, scene=scene
                         )
                     )
+                    trace.note("motion scene '{motion}'".format(motion=motion_scene))
                     scene = motion_scene
             else:
                 log.debug(
@@ -264,13 +304,9 @@ def get_state_for_scene(item, scene):
     scene_type = get_scene_type(item, scene, light_type, data=data)
     if scene_type is None:
         log.error("Couldn't get scene type for '{name}'".format(name=item.name))
+        stats.invalid()
         return str(item.state)
-    elif config.log_trace:
-        log.debug(
-            "Got scene type '{type}' for '{name}'".format(
-                type=scene_type, name=item.name
-            )
-        )
+    trace.note("scene type '{type}'".format(type=scene_type))
 
     # Fixed State type
     if scene_type == SCENE_TYPE_FIXED and state is None:
@@ -281,6 +317,7 @@ def get_state_for_scene(item, scene):
                     key=META_KEY_STATE, name=item.name, scene=scene
                 )
             )
+            stats.invalid()
             return str(item.state)
 
     # Threshold type
@@ -291,6 +328,7 @@ def get_state_for_scene(item, scene):
                     key=META_KEY_LEVEL_SOURCE, name=item.name, scene=scene
                 )
             )
+            stats.invalid()
             return str(item.state)
         level_value = resolve_type(
             validate_item(
@@ -318,6 +356,7 @@ def get_state_for_scene(item, scene):
                     key=META_KEY_LEVEL_THRESHOLD, name=item.name, scene=scene
                 )
             )
+            stats.invalid()
             return str(item.state)
 
         state_above = get_scene_setting(item, scene, META_KEY_STATE_ABOVE, data=data)
@@ -327,6 +366,7 @@ def get_state_for_scene(item, scene):
                     key=META_KEY_STATE_ABOVE, name=item.name, scene=scene
                 )
             )
+            stats.invalid()
             return str(item.state)
 
         state_below = get_scene_setting(item, scene, META_KEY_STATE_BELOW, data=data)
@@ -336,6 +376,7 @@ def get_state_for_scene(item, scene):
                     key=META_KEY_STATE_BELOW, name=item.name, scene=scene
                 )
             )
+            stats.invalid()
             return str(item.state)
 
         state = state_above if level_value > level_threshold else state_below
@@ -352,6 +393,7 @@ def get_state_for_scene(item, scene):
                     key=META_KEY_LEVEL_SOURCE, name=item.name, scene=scene
                 )
             )
+            stats.invalid()
             return str(item.state)
         level_value = resolve_type(
             validate_item(
@@ -378,6 +420,7 @@ def get_state_for_scene(item, scene):
                     key=META_KEY_LEVEL_HIGH, name=item.name, scene=scene
                 )
             )
+            stats.invalid()
             return str(item.state)
         level_high = float(level_high)
 
@@ -398,6 +441,7 @@ def get_state_for_scene(item, scene):
                     key=META_KEY_STATE_HIGH, name=item.name, scene=scene
                 )
             )
+            stats.invalid()
             return str(item.state)
 
         state_low = get_scene_setting(item, scene, META_KEY_STATE_LOW, data=data)
@@ -407,6 +451,7 @@ def get_state_for_scene(item, scene):
                     key=META_KEY_STATE_LOW, name=item.name, scene=scene
                 )
             )
+            stats.invalid()
             return str(item.state)
 
         state_above = (
@@ -427,6 +472,8 @@ def get_state_for_scene(item, scene):
             def scale(low, high):
                 return int(round(low + (high - low) * scaling_factor))
 
+            scaled = True
+
             if isinstance(state_high, (int, float)):  # Dimmer value
                 state = scale(state_low, state_high)
             elif isinstance(state_high, list):  # HSV list
@@ -440,6 +487,7 @@ def get_state_for_scene(item, scene):
                 name=item.name, scene=scene
             )
         )
+        stats.invalid()
         return str(item.state)
 
     if (
@@ -480,6 +528,26 @@ def get_state_for_scene(item, scene):
                 state=state, name=item.name, scene=scene, type=item.type
             )
         )
+        stats.invalid()
+        return str(item.state)
+
+    # lights that are fading are stepped towards their target outside the
+    # throttle, the state they report along the way isn't a new command
+    if (
+        scaled
+        and transition.get_target(item.name) is None
+        and not throttle.allow(
+            item,
+            state,
+            min_delta=get_scene_setting(
+                item, scene, META_KEY_SCALED_MIN_DELTA, data=data
+            ),
+            min_interval=get_scene_setting(
+                item, scene, META_KEY_SCALED_MIN_INTERVAL, data=data
+            ),
+            retry=lambda: update_light(item),
+        )
+    ):
         return str(item.state)
 
     log.debug(
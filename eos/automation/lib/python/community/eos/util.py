@@ -23,7 +23,7 @@ Utilities
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from community.eos import log, config
+from community.eos import log, config, trace
 from community.eos.constants import *
 
 from core.utils import validate_item
@@ -322,6 +322,7 @@ def get_scene_setting(item, scene, key, data=None, max_depth=10):
         and item_data.get(scene, {}).get(key, None) is not None
     ):
         source = "Scene in Item"
+        depth = 1
         value = item_data.get(scene, {}).get(key, None)
     elif (
         max_depth >= 2
@@ -329,6 +330,7 @@ def get_scene_setting(item, scene, key, data=None, max_depth=10):
         and group_data.get(light_type, {}).get(scene, {}).get(key, None) is not None
     ):
         source = "Scene in Light Type in Group"
+        depth = 2
         value = group_data.get(light_type, {}).get(scene, {}).get(key, None)
     elif (
         max_depth >= 3
@@ -336,6 +338,7 @@ def get_scene_setting(item, scene, key, data=None, max_depth=10):
         and group_data.get(scene, {}).get(key, None) is not None
     ):
         source = "Scene in Group"
+        depth = 3
         value = group_data.get(scene, {}).get(key, None)
     elif (
         max_depth >= 4
@@ -343,6 +346,7 @@ def get_scene_setting(item, scene, key, data=None, max_depth=10):
         and global_data.get(light_type, {}).get(scene, {}).get(key, None) is not None
     ):
         source = "Scene in Light Type in Global"
+        depth = 4
         value = global_data.get(light_type, {}).get(scene, {}).get(key, None)
     elif (
         max_depth >= 5
@@ -350,6 +354,7 @@ def get_scene_setting(item, scene, key, data=None, max_depth=10):
         and global_data.get(scene, {}).get(key, None) is not None
     ):
         source = "Scene in Global"
+        depth = 5
         value = global_data.get(scene, {}).get(key, None)
     elif (
         max_depth >= 6
@@ -357,6 +362,7 @@ def get_scene_setting(item, scene, key, data=None, max_depth=10):
         and item_data.get(key, None) is not None
     ):
         source = "Item"
+        depth = 6
         value = item_data.get(key, None)
     elif (
         max_depth >= 7
@@ -364,6 +370,7 @@ def get_scene_setting(item, scene, key, data=None, max_depth=10):
         and group_data.get(light_type, {}).get(key, None) is not None
     ):
         source = "Light Type in Group"
+        depth = 7
         value = group_data.get(light_type, {}).get(key, None)
     elif (
         max_depth >= 8
@@ -371,6 +378,7 @@ def get_scene_setting(item, scene, key, data=None, max_depth=10):
         and group_data.get(key, None) is not None
     ):
         source = "Group"
+        depth = 8
         value = group_data.get(key, None)
     elif (
         max_depth >= 9
@@ -378,6 +386,7 @@ def get_scene_setting(item, scene, key, data=None, max_depth=10):
         and global_data.get(light_type, {}).get(key, None) is not None
     ):
         source = "Light Type in Global"
+        depth = 9
         value = global_data.get(light_type, {}).get(key, None)
     elif (
         max_depth >= 10
@@ -385,21 +394,11 @@ def get_scene_setting(item, scene, key, data=None, max_depth=10):
         and global_data.get(key, None) is not None
     ):
         source = "Global"
+        depth = 10
         value = global_data.get(key, None)
     else:
-        if config.log_trace:
-            log.debug(
-                "No value found for key '{key}' for scene '{scene}' for item '{name}' at depth {depth}".format(
-                    key=key, scene=scene, name=item.name, depth=depth
-                )
-            )
         return None
-    if config.log_trace:
-        log.debug(
-            "Got setting '{key}' for scene '{scene}' for item '{name}' from {source}: {value}".format(
-                key=key, scene=scene, name=item.name, source=source, value=value
-            )
-        )
+    trace.setting(key, source, depth, value)
     return resolve_type(value)
 
 
@@ -0,0 +1,231 @@
+"""
+Eos Lighting
+
+Configuration validation
+"""
+# Copyright (c) 2020 Eos Lighting contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from community.eos import log
+from community.eos.util import *
+from community.eos.constants import *
+
+from core.metadata import get_value
+from core.utils import validate_item
+
+__all__ = ["validate_all", "check_scene", "get_invalid", "reset"]
+
+_invalid = {}
+
+
+def _get_declared_scenes(data, light_type):
+    """Returns the names of all scenes that have settings for a light of
+    ``light_type`` in ``data``."""
+    scenes = set()
+    for source in [data["item"], data["group"], data["global"]]:
+        for key in source:
+            if not isinstance(source[key], dict):
+                continue
+            elif key in LIGHT_TYPE_MAP.values():
+                if key != light_type:
+                    continue
+                scenes.update(
+                    [
+                        scene
+                        for scene in source[key]
+                        if isinstance(source[key][scene], dict)
+                    ]
+                )
+            else:
+                scenes.add(key)
+    return scenes
+
+
+def check_scene(item, scene, data):
+    """Checks that ``scene`` can be evaluated for ``item`` without looking at
+    any item states.
+
+    Returns a description of the problem or ``None`` if the scene is valid.
+    Scenes with a motion source are only checked for a scene type, because an
+    active motion state can replace the rest of the scene settings.
+    """
+
+    def _missing(key):
+        return "{type} type scenes require '{key}' setting".format(
+            type=scene_type.capitalize(), key=key
+        )
+
+    def _setting(key):
+        return get_scene_setting(item, scene, key, data=data)
+
+    light_type = LIGHT_TYPE_MAP.get(item.type.lower(), None)
+    if light_type is None:
+        return "couldn't get light type"
+
+    alias_scene = _setting(META_KEY_ALIAS_SCENE)
+    if alias_scene is not None:
+        scene = alias_scene
+
+    scene_type = get_scene_type(item, scene, light_type, data=data)
+    if scene_type is None:
+        return "couldn't get scene type"
+    elif validate_item(_setting(META_KEY_MOTION_SOURCE)) is not None:
+        return None
+
+    if scene_type == SCENE_TYPE_FIXED:
+        state = _setting(META_KEY_STATE)
+        if state is None:
+            return _missing(META_KEY_STATE)
+        elif light_type == LIGHT_TYPE_SWITCH and not (
+            isinstance(state, str) and state.upper() in ["ON", "OFF"]
+        ):
+            return "state '{state}' is not valid for a Switch light".format(
+                state=state
+            )
+        elif light_type == LIGHT_TYPE_DIMMER and not isinstance(state, (int, float)):
+            return "state '{state}' is not valid for a Dimmer light".format(
+                state=state
+            )
+        elif light_type == LIGHT_TYPE_COLOR and not (
+            isinstance(state, (int, float))
+            or (isinstance(state, list) and len(state) == 3)
+        ):
+            return "state '{state}' is not valid for a Color light".format(
+                state=state
+            )
+
+    elif scene_type == SCENE_TYPE_THRESHOLD:
+        for key in [
+            META_KEY_LEVEL_SOURCE,
+            META_KEY_LEVEL_THRESHOLD,
+            META_KEY_STATE_ABOVE,
+            META_KEY_STATE_BELOW,
+        ]:
+            if _setting(key) is None:
+                return _missing(key)
+        if validate_item(_setting(META_KEY_LEVEL_SOURCE)) is None:
+            return "level source '{name}' does not exist".format(
+                name=_setting(META_KEY_LEVEL_SOURCE)
+            )
+
+    elif scene_type == SCENE_TYPE_SCALED:
+        if light_type not in [LIGHT_TYPE_DIMMER, LIGHT_TYPE_COLOR]:
+            return "Scaled scenes are not valid for Switch lights"
+        for key in [
+            META_KEY_LEVEL_SOURCE,
+            META_KEY_LEVEL_HIGH,
+            META_KEY_STATE_HIGH,
+            META_KEY_STATE_LOW,
+        ]:
+            if _setting(key) is None:
+                return _missing(key)
+        if validate_item(_setting(META_KEY_LEVEL_SOURCE)) is None:
+            return "level source '{name}' does not exist".format(
+                name=_setting(META_KEY_LEVEL_SOURCE)
+            )
+        for key in [META_KEY_STATE_HIGH, META_KEY_STATE_LOW]:
+            value = _setting(key)
+            if isinstance(value, list) and len(value) != 3:
+                return "'{key}' must be a number or a list of 3 HSV values".format(
+                    key=key
+                )
+            elif not isinstance(value, (int, float, list)):
+                return "'{key}' must be a number or a list of 3 HSV values".format(
+                    key=key
+                )
+
+    return None
+
+
+def validate_all(master_group):
+    """Checks every scene declared for every enabled light under
+    ``master_group`` and remembers the invalid combinations.
+
+    Each problem is logged once, followed by a summary. Returns the number
+    of invalid light and scene combinations found.
+    """
+
+    def _validate_group(group):
+        if str(get_value(group.name, META_NAME_EOS)).lower() in META_STRING_FALSE:
+            return
+        elif not get_scene_item(group):
+            return
+        for light in get_light_items(group):
+            if str(get_value(light.name, META_NAME_EOS)).lower() in META_STRING_FALSE:
+                continue
+            counts["lights"] += 1
+            data = build_data(light)
+            light_type = LIGHT_TYPE_MAP.get(light.type.lower(), None)
+            for scene in _get_declared_scenes(data, light_type):
+                counts["scenes"] += 1
+                try:
+                    reason = check_scene(light, scene, data)
+                except Exception as ex:
+                    reason = "error while checking: {}".format(ex)
+                if reason is not None:
+                    _invalid[(light.name, scene)] = reason
+                    log.warn(
+                        "Invalid configuration for '{name}' scene '{scene}': {reason}".format(
+                            name=light.name, scene=scene, reason=reason
+                        )
+                    )
+        for child in get_group_items(group):
+            _validate_group(child)
+
+    reset()
+    counts = {"lights": 0, "scenes": 0}
+    _validate_group(master_group)
+    log.info(
+        "Validated {scenes} scenes for {lights} lights, found {invalid} invalid configurations".format(
+            scenes=counts["scenes"], lights=counts["lights"], invalid=len(_invalid)
+        )
+    )
+    return len(_invalid)
+
+
+def get_invalid(item, scene):
+    """Returns the reason ``scene`` is invalid for ``item``, or ``None`` if it
+    is valid or was not checked.
+
+    Invalid combinations are checked again with the current metadata and
+    items, and forgotten once they are valid, so fixing them does not need
+    Eos to be reloaded.
+    """
+    key = (item.name, scene)
+    if key not in _invalid:
+        return None
+    try:
+        reason = check_scene(item, scene, build_data(item))
+    except Exception as ex:
+        reason = "error while checking: {}".format(ex)
+    if reason is not None:
+        _invalid[key] = reason
+    elif _invalid.pop(key, None) is not None:
+        log.info(
+            "Configuration for '{name}' scene '{scene}' is now valid".format(
+                name=item.name, scene=scene
+            )
+        )
+    return reason
+
+
+def reset():
+    """Forgets all invalid combinations."""
+    _invalid.clear()